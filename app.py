@@ -204,7 +204,7 @@
 #         AES is the modern, secure standard for symmetric encryption. It is a block cipher that operates on 128-bit blocks of data (16 bytes) using a "State" matrix. It performs multiple rounds of substitution and permutation.
 #         - **Block Size:** 128 bits (16 bytes)
 #         - **Key Sizes:** 128, 192, or 256 bits (16, 24, or 32 characters)
-#         - **Mode:** Using AES-GCM (Galois/Counter Mode) for authenticated encryption.
+#         - **Mode:** AES-GCM (Galois/Counter Mode) for authenticated encryption by default; CTR, CBC, SIV and OCB can also be chosen.
 #         - **Secure:** This is the modern, recommended standard.
 #         """)
         
@@ -370,6 +370,7 @@ from utils import normalize_text, string_to_matrix, mod_inverse, gcd
 from ciphers import substitution, polyalphabetic, transposition, rotormachine
 from ciphers import des
 from ciphers import aes  # <-- IMPORT FOR AES
+from ciphers import aes_core
 
 # --- Page Configuration ---
 st.set_page_config(
@@ -406,6 +407,7 @@ ALGORITHMS = {
     ],
     "Modern Block Ciphers": [
         "DES (Data Encryption Standard)",
+        "Triple-DES (3DES)",
         "AES (Advanced Encryption Standard)"
     ]
 }
@@ -541,22 +543,55 @@ try:
         - **Rounds:** 16
         - ** Security Warning:** DES is no longer secure. This implementation is for educational purposes only.
         """)
+        des_mode_options = {
+            "ECB - Text (space padding)": None,
+            "ECB - Bytes (PKCS#7, Base64 output)": "ECB",
+            "CBC - Bytes (PKCS#7, Base64 output)": "CBC",
+            "CTR - Bytes (no padding, Base64 output)": "CTR"
+        }
+        selected_des_mode = st.radio("Mode of Operation", list(des_mode_options.keys()), horizontal=True)
+        key_inputs['des_mode'] = des_mode_options[selected_des_mode]
+        if key_inputs['des_mode']:
+            explanation_area.markdown("""
+            #### Modes of Operation
+            - **ECB:** Each block is encrypted on its own. Identical blocks give identical ciphertext.
+            - **CBC:** Each block is XORed with the previous ciphertext block (a random IV for the first) before encryption.
+            - **CTR:** A counter (random nonce + block number) is encrypted to make a keystream that is XORed with the data. Blocks are independent, so they can be processed in parallel.
+            
+            The text is encoded as UTF-8 bytes, so trailing spaces and any characters round-trip exactly. The IV or nonce is stored in front of the ciphertext.
+            """)
         key_inputs['key'] = st.text_input("Key (MUST be 8 characters)", value="mysecret", max_chars=8)
         if len(key_inputs['key']) != 8:
             st.error("Key must be exactly 8 characters long.")
         else:
             try:
-                # Show the "working" part - the 16 round keys
-                key_bits = des.text_to_bits(key_inputs['key'])
-                _, hex_keys = des.des_process("", key_inputs['key'], 'encrypt') # Get keys
-                
+                # Show the "working" part - the 16 round keys.
+                # Streamlit runs expander contents on every rerun, so the keys are
+                # only generated (and then cached per key) once the user asks for them.
                 with explanation_area.expander("Show 16 Generated Round Keys (48-bit each)"):
-                    keys_data = [{"Round": i+1, "Round Key (Hex)": hex_keys[i]} for i in range(16)]
-                    st.dataframe(keys_data, use_container_width=True)
+                    if st.checkbox("Generate round keys", key="des_show_round_keys"):
+                        hex_keys = des.DESKeySchedule.for_key(key_inputs['key'].encode('latin-1')).hex_keys
+                        keys_data = [{"Round": i+1, "Round Key (Hex)": hex_keys[i]} for i in range(16)]
+                        st.dataframe(keys_data, use_container_width=True)
                 key_inputs['key_for_des'] = key_inputs['key'] # Pass the valid key
             except Exception as e:
                 st.error(f"Error generating keys: {e}")
 
+    elif cipher_name == "Triple-DES (3DES)":
+        explanation_area.markdown("""
+        Triple-DES applies DES three times to each block: encrypt with K1, decrypt with K2, encrypt with K3 (EDE). It was the standard way to extend the life of DES hardware and is still found in legacy systems.
+        - **Block Size:** 64 bits (8 bytes)
+        - **Key Size:** 16 characters (EDE2, K3 = K1) or 24 characters (EDE3)
+        - **Rounds:** 3 x 16
+        - ** Security Warning:** Triple-DES is deprecated. Use it only to read or produce legacy data.
+        """)
+        key_inputs['des_mode'] = st.radio("Mode of Operation", ("CBC", "CTR"), horizontal=True)
+        key_inputs['key'] = st.text_input("Key (16 or 24 characters)", value="mysecretkey12345", max_chars=24)
+        if len(key_inputs['key']) not in (16, 24):
+            st.error("Key must be exactly 16 or 24 characters long.")
+        else:
+            key_inputs['key_for_3des'] = key_inputs['key'].encode('latin-1')
+
     # --- UPDATED AES BLOCK ---
     elif cipher_name == "AES (Advanced Encryption Standard)":
         explanation_area.markdown("""
@@ -564,6 +599,7 @@ try:
         - **Block Size:** 128 bits (16 bytes)
         - **Key Sizes:** 128, 192, or 256 bits (16, 24, or 32 characters)
         - **Mode:** Using AES-GCM (Galois/Counter Mode) for authenticated encryption.
+        - **Output:** A compact binary container (header, nonce, ciphertext, tag) with one Base64 or Base85 text layer.
         - ** Secure:** This is the modern, recommended standard.
         """)
         
@@ -576,15 +612,47 @@ try:
         selected_size_label = st.radio("Select Key Size", list(key_size_options.keys()), horizontal=True)
         key_len = key_size_options[selected_size_label]
         
-        # Key Input
-        key_inputs['key'] = st.text_input(f"Key (MUST be {key_len} characters)", value="a" * key_len, max_chars=key_len)
-        
-        # Key Validation
-        if len(key_inputs['key']) != key_len:
-            st.error(f"Key must be exactly {key_len} characters long.")
+        # Key Type: a raw key of exact length, or a passphrase stretched with scrypt
+        key_inputs['key_type'] = st.radio("Key Type", ("Raw key", "Passphrase"), horizontal=True)
+        key_inputs['key_len'] = key_len
+
+        if key_inputs['key_type'] == "Passphrase":
+            key_inputs['passphrase'] = st.text_input("Passphrase", value="correct horse battery staple", type="password",
+                                                     help="Stretched into a key with scrypt. The salt and KDF settings are stored with the ciphertext.")
+            if not key_inputs['passphrase']:
+                st.error("Passphrase cannot be empty.")
         else:
-            # Convert key to bytes for the cipher
-            key_inputs['key_bytes'] = key_inputs['key'].encode('utf-8')
+            # Key Input
+            key_inputs['key'] = st.text_input(f"Key (MUST be {key_len} characters)", value="a" * key_len, max_chars=key_len)
+
+            # Key Validation
+            if len(key_inputs['key']) != key_len:
+                st.error(f"Key must be exactly {key_len} characters long.")
+            else:
+                # Convert key to bytes for the cipher
+                key_inputs['key_bytes'] = key_inputs['key'].encode('utf-8')
+
+        # Mode of Operation (stored in the container header, so decryption detects it)
+        aes_mode_options = {
+            "GCM (authenticated, default)": "GCM",
+            "CTR (seekable, + HMAC)": "CTR",
+            "CBC (padded, + HMAC)": "CBC",
+            "SIV (deterministic)": "SIV",
+            "OCB (single pass)": "OCB",
+        }
+        selected_aes_mode = st.selectbox("Mode of Operation", list(aes_mode_options.keys()))
+        key_inputs['aes_mode'] = aes_mode_options[selected_aes_mode]
+
+        # Optional compression before encryption (skipped automatically when it would not help)
+        compression_options = {"None": None, "zlib (fast)": "zlib", "lzma (smallest)": "lzma", "bz2": "bz2"}
+        selected_compression = st.selectbox("Compress Before Encrypting", list(compression_options.keys()),
+                                            help="Recorded in the container, so decryption needs no setting.")
+        key_inputs['compression'] = compression_options[selected_compression]
+
+        # Output Encoding (decryption detects it, and also reads the legacy JSON format)
+        armor_options = {"Base64": "base64", "Base85 (shorter)": "base85"}
+        selected_armor = st.radio("Output Encoding", list(armor_options.keys()), horizontal=True)
+        key_inputs['armor'] = armor_options[selected_armor]
         
         # --- AES Visualizer (Text Only) ---
         explanation_area.subheader("How an AES Round Works (Visualized)")
@@ -637,6 +705,33 @@ try:
             """)
             # st.image(...) REMOVED TO PREVENT ERROR
 
+        # Real states for the tabs: the first 16 bytes of the input, run through the
+        # in-repo NumPy AES engine (ciphers/aes_core.py) with the raw key
+        if mode == "Encrypt" and input_text and 'key_bytes' in key_inputs:
+            aes_trace = aes_core.AESRoundTrace(block_index=0)
+            first_block = input_text.encode('utf-8')[:16].ljust(16, b'\0')
+            aes_core.encrypt_blocks(first_block, key_inputs['key_bytes'], aes_trace)
+            trace_round = explanation_area.slider("Round to show in the tabs (first block of your text)",
+                                                  1, len(aes_trace.rounds) - 1, 1)
+            step = aes_trace.rounds[trace_round]
+            before_key = 'shift_rows' if step['mix_columns'] is None else 'mix_columns'
+            tab_steps = ((tab1, 'start', 'sub_bytes'), (tab2, 'sub_bytes', 'shift_rows'),
+                         (tab3, 'shift_rows', 'mix_columns'), (tab4, before_key, 'end'))
+            for tab, before, after in tab_steps:
+                with tab:
+                    if step[after] is None:
+                        st.info("The last round has no MixColumns step.")
+                        continue
+                    st.markdown(f"**Round {trace_round}** (state bytes in hex, `state[row][column]`)")
+                    panels = [("Before", step[before]), ("After", step[after])]
+                    if tab is tab4:
+                        panels.insert(1, ("Round Key", step['round_key']))
+                    for column, (label, state) in zip(st.columns(len(panels)), panels):
+                        column.caption(label)
+                        column.table([[f'{b:02x}' for b in row] for row in state])
+        else:
+            explanation_area.caption("Enter text and a raw key in Encrypt mode to see the real state of each round.")
+
 except Exception as e:
     st.error(f"An unexpected UI error occurred: {e}")
     st.exception(e) # Show full error for debugging
@@ -647,6 +742,7 @@ if st.button(f" {mode} Text", use_container_width=True, type="primary"):
         st.warning("Please enter some text to process.")
     else:
         output_text = ""
+        des_tracer = None
         try:
             # Call the correct function based on user selections
             if mode == "Encrypt":
@@ -667,14 +763,24 @@ if st.button(f" {mode} Text", use_container_width=True, type="primary"):
                 elif cipher_name == "Rotor Machine (Enigma-like)":
                     output_text = rotormachine.rotor_machine_process(input_text, key_inputs['rotor_names'], key_inputs['initial_positions'], key_inputs['plugboard_settings'])
                 elif cipher_name == "DES (Data Encryption Standard)":
-                    if 'key_for_des' in key_inputs:
-                        output_text, _ = des.des_process(input_text, key_inputs['key_for_des'], mode='encrypt')
+                    if 'key_for_des' in key_inputs and key_inputs['des_mode']:
+                        output_text = base64.b64encode(des.des_encrypt(input_text.encode('utf-8'), key_inputs['key_for_des'].encode('latin-1'), key_inputs['des_mode'])).decode('ascii')
+                    elif 'key_for_des' in key_inputs:
+                        des_tracer = des.DESTraceRecorder(max_blocks=1)
+                        output_text, _ = des.des_process(input_text, key_inputs['key_for_des'], mode='encrypt', tracer=des_tracer)
                     else:
                         output_text = "Error: Key is not 8 characters."
+                elif cipher_name == "Triple-DES (3DES)":
+                    if 'key_for_3des' in key_inputs:
+                        output_text = base64.b64encode(des.triple_des_encrypt(input_text.encode('utf-8'), key_inputs['key_for_3des'], key_inputs['des_mode'])).decode('ascii')
+                    else:
+                        output_text = "Error: Key is not 16 or 24 characters."
                 # --- NEW CALL FOR AES ---
                 elif cipher_name == "AES (Advanced Encryption Standard)":
-                    if 'key_bytes' in key_inputs:
-                        output_text = aes.aes_encrypt(input_text, key_inputs['key_bytes'])
+                    if key_inputs.get('passphrase'):
+                        output_text = aes.aes_encrypt_passphrase(input_text, key_inputs['passphrase'], key_inputs['key_len'], key_inputs['armor'], key_inputs['aes_mode'], key_inputs['compression'])
+                    elif 'key_bytes' in key_inputs:
+                        output_text = aes.aes_encrypt(input_text, key_inputs['key_bytes'], key_inputs['armor'], key_inputs['aes_mode'], key_inputs['compression'])
                     else:
                         output_text = "Error: Key is not the correct length."
             
@@ -696,19 +802,43 @@ if st.button(f" {mode} Text", use_container_width=True, type="primary"):
                 elif cipher_name == "Rotor Machine (Enigma-like)":
                     output_text = rotormachine.rotor_machine_process(input_text, key_inputs['rotor_names'], key_inputs['initial_positions'], key_inputs['plugboard_settings'])
                 elif cipher_name == "DES (Data Encryption Standard)":
-                    if 'key_for_des' in key_inputs:
-                        output_text, _ = des.des_process(input_text, key_inputs['key_for_des'], mode='decrypt')
+                    if 'key_for_des' in key_inputs and key_inputs['des_mode']:
+                        try:
+                            output_text = des.des_decrypt(base64.b64decode(input_text), key_inputs['key_for_des'].encode('latin-1'), key_inputs['des_mode']).decode('utf-8')
+                        except ValueError as e:
+                            # Bad Base64, bad padding or non-UTF-8 output: usually the wrong key or mode
+                            st.error(f"Decryption failed (check the key and mode): {e}")
+                    elif 'key_for_des' in key_inputs:
+                        des_tracer = des.DESTraceRecorder(max_blocks=1)
+                        output_text, _ = des.des_process(input_text, key_inputs['key_for_des'], mode='decrypt', tracer=des_tracer)
                     else:
                         output_text = "Error: Key is not 8 characters."
+                elif cipher_name == "Triple-DES (3DES)":
+                    if 'key_for_3des' in key_inputs:
+                        try:
+                            output_text = des.triple_des_decrypt(base64.b64decode(input_text), key_inputs['key_for_3des'], key_inputs['des_mode']).decode('utf-8')
+                        except ValueError as e:
+                            # Bad Base64, bad padding or non-UTF-8 output: usually the wrong key or mode
+                            st.error(f"Decryption failed (check the key and mode): {e}")
+                    else:
+                        output_text = "Error: Key is not 16 or 24 characters."
                 # --- NEW CALL FOR AES ---
                 elif cipher_name == "AES (Advanced Encryption Standard)":
-                    if 'key_bytes' in key_inputs:
+                    if key_inputs.get('passphrase'):
+                        output_text = aes.aes_decrypt_passphrase(input_text, key_inputs['passphrase'])
+                    elif 'key_bytes' in key_inputs:
                         output_text = aes.aes_decrypt(input_text, key_inputs['key_bytes'])
                     else:
                         output_text = "Error: Key is not the correct length."
             
             output_area.text_area("Result", value=output_text, height=250, label_visibility="collapsed", disabled=True)
 
+            # Show the DES internals for the first block (text mode only)
+            if des_tracer is not None and des_tracer.blocks:
+                with st.expander("DES Round Trace (first block, values in hex)"):
+                    st.markdown("`L`/`R` are the halves after each round; `expanded` is E(R) before the key XOR, `xored` is after it, and `sbox_output` is the 32-bit S-box result before the P-box gives `f_output`.")
+                    st.dataframe(des_tracer.hex_rows(0), use_container_width=True)
+
         except Exception as e:
             st.error(f"An error occurred during processing: {e}")
             st.exception(e) # Show full error for debugging
@@ -0,0 +1,51 @@
+# Helpers shared by the benchmark scripts: timing, and the comparison of an
+# original per-character loop with its optimized replacement.
+
+import time
+
+TEXT_CHARACTERS = "abcdefghijklmnopqrstuvwxyz  ,."
+MAX_LOOP_SIZE = 1_000_000  # The loops are too slow to time on larger inputs
+CHECK_SIZE = 10_000  # Characters both implementations must agree on before timing
+
+def time_call(func, *args, repeat=3):
+    """Return the best wall-clock time (seconds) of `repeat` calls."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def random_text(rng, size, block_size=1_000_000):
+    """
+    `size` characters of lowercase letters, spaces and punctuation. Large
+    inputs repeat a random block of at most `block_size` characters, which
+    is quicker to build and makes no difference to the ciphers timed here.
+    """
+    block = "".join(rng.choice(TEXT_CHARACTERS) for _ in range(min(size, block_size)))
+    return block * (size // len(block)) + block[:size % len(block)]
+
+def compare_loop(rng, sizes, cases, fast_label):
+    """
+    Time the original loop against the optimized implementation and print
+    one row per size and cipher: MB/s of each, the optimized time and the speedup.
+
+    Args:
+        rng (random.Random): Source of the input text.
+        sizes (tuple): Input sizes in characters.
+        cases (list): (name, loop, fast, key args) tuples; both functions are
+            called as func(text, *key_args) and must give the same result.
+        fast_label (str): Column title for the optimized implementation.
+    """
+    print(f"{'Size':>11} {'Cipher':>9} {'loop (MB/s)':>12} {f'{fast_label} (MB/s)':>15} "
+          f"{f'{fast_label} (s)':>12} {'speedup':>9}")
+    for size in sizes:
+        text = random_text(rng, size)
+        mb = size / 1e6
+        for name, loop, fast, key in cases:
+            assert loop(text[:CHECK_SIZE], *key) == fast(text[:CHECK_SIZE], *key)
+            t_loop = time_call(loop, text, *key, repeat=1) if size <= MAX_LOOP_SIZE else None
+            t_fast = time_call(fast, text, *key)
+            loop_rate = f"{mb / t_loop:>12.2f}" if t_loop else f"{'-':>12}"
+            speedup = f"{t_loop / t_fast:>8.0f}x" if t_loop else f"{'-':>9}"
+            print(f"{size:>11} {name:>9} {loop_rate} {mb / t_fast:>15.1f} {t_fast:>12.3f} {speedup}")
@@ -0,0 +1,31 @@
+# Benchmark: records per second for many small records under one key,
+# aes_encrypt in a loop vs. AESContext.encrypt_many / decrypt_many.
+# Run from the project root with:  python -m benchmarks.aes_context [n_records]
+
+import os
+import sys
+
+from benchmarks._common import time_call
+from ciphers import aes
+
+KEY = b"k" * 16
+
+def main():
+    n_records = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    print(f"{'Record size':>12} {'aes_encrypt/s':>14} {'bytes loop/s':>13} {'encrypt_many/s':>15} {'decrypt_many/s':>15}")
+    for size in (16, 128, 1024):
+        text = "x" * size
+        records = [os.urandom(size) for _ in range(n_records)]
+        context = aes.AESContext(KEY)
+
+        t_str = time_call(lambda: [aes.aes_encrypt(text, KEY) for _ in range(n_records)], repeat=1)
+        t_bytes = time_call(lambda: [aes.aes_encrypt_bytes(r, KEY) for r in records], repeat=1)
+        sealed = context.encrypt_many(records)
+        t_many = time_call(context.encrypt_many, records, repeat=1)
+        t_open = time_call(context.decrypt_many, sealed, repeat=1)
+        assert context.decrypt_many(sealed) == records
+        print(f"{size:>12} {n_records / t_str:>14,.0f} {n_records / t_bytes:>13,.0f} "
+              f"{n_records / t_many:>15,.0f} {n_records / t_open:>15,.0f}")
+
+if __name__ == "__main__":
+    main()
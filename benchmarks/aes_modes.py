@@ -0,0 +1,27 @@
+# Benchmark: AES container throughput (MB/s) per mode and key size.
+# CTR and CBC include their HMAC-SHA256 tag, so every row is authenticated.
+# Run from the project root with:  python -m benchmarks.aes_modes [size_mb]
+
+import os
+import sys
+
+from benchmarks._common import time_call
+from ciphers import aes
+
+def main():
+    size_mb = float(sys.argv[1]) if len(sys.argv) > 1 else 16
+    data = os.urandom(int(size_mb * 1024 * 1024))
+    mb = len(data) / (1024 * 1024)
+    print(f"{'Mode':>5} {'Key':>5} {'encrypt (MB/s)':>15} {'decrypt (MB/s)':>15}")
+    for mode in aes.AES_MODES:
+        for key_size in (16, 24, 32):
+            key = os.urandom(key_size)
+            blob = aes.aes_encrypt_bytes(data, key, mode)
+            assert aes.aes_decrypt_bytes(blob, key) == data
+
+            t_enc = time_call(aes.aes_encrypt_bytes, data, key, mode)
+            t_dec = time_call(aes.aes_decrypt_bytes, blob, key)
+            print(f"{mode:>5} {key_size * 8:>5} {mb / t_enc:>15.1f} {mb / t_dec:>15.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+# Benchmark: parallel segmented AES-GCM throughput from 1 to N workers.
+# Run from the project root with:  python -m benchmarks.aes_parallel [size_mb]
+
+import os
+import sys
+from collections import deque
+
+from benchmarks._common import time_call
+from ciphers import aes, aes_parallel
+
+KEY = b"k" * 32
+
+def throughput(func, data, **kwargs):
+    """MB/s of consuming one run of a generator-based cipher over `data`."""
+    seconds = time_call(lambda: deque(func(data, KEY, **kwargs), maxlen=0), repeat=1)
+    return len(data) / (1024 * 1024) / seconds
+
+def main():
+    size_mb = int(sys.argv[1]) if len(sys.argv) > 1 else 64
+    data = os.urandom(size_mb * 1024 * 1024)
+    sealed = b"".join(aes.aes_stream_encrypt(data, KEY))
+    print(f"Input: {size_mb} MB, segment size {aes.DEFAULT_SEGMENT_SIZE // 1024} KB")
+    print(f"Single-threaded stream: {throughput(aes.aes_stream_encrypt, data):.1f} MB/s")
+    print()
+    print(f"{'Pool':>8} {'Workers':>8} {'Encrypt MB/s':>13} {'Decrypt MB/s':>13} {'Scaling':>8}")
+    for use_processes in (False, True):
+        baseline = None
+        for workers in range(1, (os.cpu_count() or 1) + 1):
+            enc = throughput(aes_parallel.aes_parallel_encrypt, data, workers=workers, use_processes=use_processes)
+            dec = throughput(aes_parallel.aes_parallel_decrypt, sealed, workers=workers, use_processes=use_processes)
+            baseline = baseline or enc
+            pool = "process" if use_processes else "thread"
+            print(f"{pool:>8} {workers:>8} {enc:>13.1f} {dec:>13.1f} {enc / baseline:>7.2f}x")
+
+if __name__ == "__main__":
+    main()
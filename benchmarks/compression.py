@@ -0,0 +1,50 @@
+# Benchmark: AES container size and throughput for each compression codec.
+# Inputs: JSON records, English-like text, and random bytes (which sampling
+# should leave uncompressed). Run from the project root with:
+#   python -m benchmarks.compression [size_mb]
+
+import json
+import os
+import random
+import sys
+
+from benchmarks._common import time_call
+from ciphers import aes
+
+KEY = b"k" * 32
+WORDS = "the of and to in is that for it as was with be by on not he this are or his from at which but".split()
+
+def sample_inputs(size):
+    rng = random.Random(0)
+    records = []
+    while sum(len(r) for r in records) < size:
+        records.append(json.dumps({"id": len(records), "user": f"user{rng.randrange(10000)}",
+                                   "score": rng.random(), "tags": rng.sample(WORDS, 3)}))
+    text = " ".join(rng.choice(WORDS) for _ in range(size // 3))
+    return {
+        "JSON": ("[" + ",".join(records) + "]").encode()[:size],
+        "text": text.encode()[:size],
+        "random": os.urandom(size),
+    }
+
+def main():
+    size = int(float(sys.argv[1]) * 1024 * 1024) if len(sys.argv) > 1 else 4 * 1024 * 1024
+    mb = size / (1024 * 1024)
+    print(f"{'Input':>7} {'Codec':>6} {'Container bytes':>16} {'Ratio':>7} {'encrypt (MB/s)':>15} {'decrypt (MB/s)':>15}")
+    for name, data in sample_inputs(size).items():
+        for codec in (None,) + aes.CODECS:
+            blob = aes.aes_encrypt_bytes(data, KEY, compression=codec)
+            assert aes.aes_decrypt_bytes(blob, KEY) == data
+
+            t_enc = time_call(aes.aes_encrypt_bytes, data, KEY, 'GCM', codec)
+            t_dec = time_call(aes.aes_decrypt_bytes, blob, KEY)
+            fields = aes.unpack_container(blob)
+            label = codec or "none"
+            if codec and fields['codec'] is None:
+                label += "*"  # Sampling decided to store the data as is
+            print(f"{name:>7} {label:>6} {len(blob):>16,} {len(blob) / len(data):>7.3f} "
+                  f"{mb / t_enc:>15.1f} {mb / t_dec:>15.1f}")
+    print("* skipped: the sample did not compress well enough")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,26 @@
+# Benchmark: original bit-list DES pipeline vs. the table-driven integer engine.
+# Run from the project root with:  python -m benchmarks.des_engine
+
+import random
+
+from benchmarks._common import time_call
+from ciphers import des
+
+KEY = "mysecret"
+
+def main():
+    rng = random.Random(0)
+    print(f"{'Size':>10} {'bits (KB/s)':>14} {'integer (KB/s)':>16} {'speedup':>9}")
+    for size in (1024, 8 * 1024, 64 * 1024):
+        text = "".join(chr(rng.randrange(32, 127)) for _ in range(size))
+
+        # Both engines must agree before their speed is worth comparing
+        assert des.des_process(text, KEY, engine='bits') == des.des_process(text, KEY)
+
+        t_bits = time_call(des.des_process, text, KEY, 'encrypt', 'bits', repeat=1)
+        t_int = time_call(des.des_process, text, KEY, 'encrypt', 'integer')
+        kb = size / 1024
+        print(f"{size:>10} {kb / t_bits:>14.1f} {kb / t_int:>16.1f} {t_bits / t_int:>8.1f}x")
+
+if __name__ == "__main__":
+    main()
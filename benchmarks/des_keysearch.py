@@ -0,0 +1,29 @@
+# Benchmark: multi-core reduced-keyspace DES key search.
+# Scans a full 2**FREE_BITS keyspace (no key matches) with 1..N worker
+# processes and reports keys per second per core.
+# Run from the project root with:  python -m benchmarks.des_keysearch [free_bits]
+
+import os
+import sys
+
+from ciphers import des_keysearch
+
+FREE_BITS = 20
+
+def main():
+    free_bits = int(sys.argv[1]) if len(sys.argv) > 1 else FREE_BITS
+    plaintext = b"knownpt!"
+    ciphertext = os.urandom(8)  # Almost certainly unreachable, so the whole keyspace is scanned
+    base_key = os.urandom(8)
+
+    print(f"Keyspace: 2^{free_bits} keys")
+    print(f"{'Workers':>8} {'Seconds':>9} {'Keys/s':>12} {'Keys/s/core':>13} {'Scaling':>8}")
+    baseline = None
+    for workers in range(1, (os.cpu_count() or 1) + 1):
+        result = des_keysearch.search_key(plaintext, ciphertext, base_key, free_bits, workers=workers)
+        baseline = baseline or result['keys_per_second']
+        print(f"{workers:>8} {result['seconds']:>9.2f} {result['keys_per_second']:>12,.0f} "
+              f"{result['keys_per_second_per_core']:>13,.0f} {result['keys_per_second'] / baseline:>7.2f}x")
+
+if __name__ == "__main__":
+    main()
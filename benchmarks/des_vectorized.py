@@ -0,0 +1,39 @@
+# Benchmark: scalar integer DES vs. the vectorized NumPy engine.
+# Prints the per-block crossover and ECB/CTR throughput as the input grows.
+# Run from the project root with:  python -m benchmarks.des_vectorized
+
+import os
+
+import numpy as np
+
+from benchmarks._common import time_call
+from ciphers import des
+
+KEY = b"mysecret"
+
+def scalar_blocks(blocks, round_keys):
+    return [des.des_crypt_block(int(b), round_keys) for b in blocks]
+
+def main():
+    round_keys = des.generate_round_keys_int(KEY)
+
+    print("Crossover (microseconds per block)")
+    print(f"{'Blocks':>8} {'scalar':>10} {'numpy':>10}")
+    for n_blocks in (1, 4, 8, 16, 32, 64, 256, 1024, 4096):
+        blocks = np.frombuffer(os.urandom(n_blocks * 8), dtype=np.uint64)
+        t_scalar = time_call(scalar_blocks, blocks, round_keys)
+        t_numpy = time_call(des.des_crypt_array, blocks, round_keys)
+        print(f"{n_blocks:>8} {t_scalar / n_blocks * 1e6:>10.2f} {t_numpy / n_blocks * 1e6:>10.2f}")
+
+    print()
+    print("Throughput (MB/s)")
+    print(f"{'Size':>10} {'ECB':>8} {'CTR':>8}")
+    for size in (64 * 1024, 1024 * 1024, 8 * 1024 * 1024):
+        data = os.urandom(size)
+        mb = size / (1024 * 1024)
+        t_ecb = time_call(des.des_encrypt, data, KEY, 'ECB')
+        t_ctr = time_call(des.des_encrypt, data, KEY, 'CTR')
+        print(f"{size:>10} {mb / t_ecb:>8.2f} {mb / t_ctr:>8.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+# Benchmark: envelope decryption of "hot" objects with and without the data-key cache.
+# Accesses follow a skewed (Zipf-like) distribution, so a few objects are read often.
+# Run from the project root with:  python -m benchmarks.envelope [n_objects] [n_reads]
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+from ciphers import aes, envelope
+
+def main():
+    n_objects = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    n_reads = int(sys.argv[2]) if len(sys.argv) > 2 else 20000
+    rng = random.Random(0)
+    weights = [1 / (rank + 1) for rank in range(n_objects)]
+    reads = rng.choices(range(n_objects), weights, k=n_reads)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        keystore = envelope.KeyStore.create(os.path.join(tmp, "keystore.json"))
+        print(f"{'Wrap':>5} {'Cache':>8} {'reads/s':>10} {'hit rate':>9} {'hit ms':>8} {'miss ms':>8}")
+        for wrap in envelope.WRAP_IDS:
+            writer = envelope.EnvelopeCipher(keystore, wrap)
+            objects = [writer.encrypt(os.urandom(256)) for _ in range(n_objects)]
+            # maxsize=0 keeps nothing, so every read pays the unwrap
+            for label, cache in (("off", aes.KeyCache(maxsize=0)), ("256 keys", aes.KeyCache(maxsize=256))):
+                reader = envelope.EnvelopeCipher(keystore, wrap, cache)
+                start = time.perf_counter()
+                for index in reads:
+                    reader.decrypt(objects[index])
+                seconds = time.perf_counter() - start
+                stats = cache.stats()
+                print(f"{wrap:>5} {label:>8} {n_reads / seconds:>10,.0f} {stats['hit_rate']:>9.1%} "
+                      f"{stats['avg_hit_ms']:>8.4f} {stats['avg_miss_ms']:>8.4f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+# Benchmark: memory-mapped file encryption vs. reading the whole file into a string.
+# Each run happens in a fresh process so its peak RSS can be reported on its own.
+# Run from the project root with:  python -m benchmarks.filecrypt [size_mb ...]
+
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from ciphers import aes, des, filecrypt
+
+AES_KEY = b"k" * 32
+DES_KEY = b"mysecret"
+
+def _aes_read_all(src, dst):
+    with open(src, encoding='latin-1') as f:
+        text = f.read()
+    with open(dst, 'w') as f:
+        f.write(aes.aes_encrypt(text, AES_KEY))
+
+def _des_read_all(src, dst):
+    with open(src, encoding='latin-1') as f:
+        text = f.read()
+    with open(dst, 'wb') as f:
+        f.write(des.des_encrypt(text.encode('latin-1'), DES_KEY, 'CTR'))
+
+VARIANTS = {
+    "AES read-all": _aes_read_all,
+    "AES mmap": lambda src, dst: filecrypt.aes_encrypt_file(src, dst, AES_KEY),
+    "DES read-all": _des_read_all,
+    "DES mmap": lambda src, dst: filecrypt.des_encrypt_file(src, dst, DES_KEY, 'CTR'),
+}
+
+def _run(name, src, dst):
+    """Run one variant and return (seconds, peak RSS in MB) for this process."""
+    start = time.perf_counter()
+    VARIANTS[name](src, dst)
+    seconds = time.perf_counter() - start
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return seconds, peak_kb / 1024
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [16, 64]
+    spawn = multiprocessing.get_context('spawn')  # A clean process, so RSS is not inherited
+    with tempfile.TemporaryDirectory() as tmp:
+        src, dst = os.path.join(tmp, "plain.bin"), os.path.join(tmp, "out.bin")
+        print(f"{'Size MB':>8} {'Variant':>14} {'Seconds':>9} {'MB/s':>8} {'Peak RSS MB':>12}")
+        for size_mb in sizes:
+            with open(src, 'wb') as f:
+                for _ in range(size_mb):
+                    f.write(os.urandom(1024 * 1024))
+            for name in VARIANTS:
+                with ProcessPoolExecutor(max_workers=1, mp_context=spawn) as pool:
+                    seconds, peak_mb = pool.submit(_run, name, src, dst).result()
+                print(f"{size_mb:>8} {name:>14} {seconds:>9.2f} {size_mb / seconds:>8.1f} {peak_mb:>12.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+# Benchmark: the original Playfair loop (matrix scan per letter, string +=)
+# vs. the cached digraph tables applied with a NumPy gather.
+# Run from the project root with:  python -m benchmarks.playfair
+
+import random
+
+from benchmarks._common import compare_loop
+from ciphers import polyalphabetic
+from utils import normalize_text
+
+def playfair_loop(text, key, mode='encrypt'):
+    """The original implementation: rebuilds the matrix and scans it for every letter."""
+    matrix = polyalphabetic.generate_playfair_matrix(key)
+    text = normalize_text(text).replace('J', 'I')
+    digraphs = []
+    i = 0
+    while i < len(text):
+        if i + 1 == len(text) or text[i] == text[i + 1]:
+            digraphs.append(text[i] + 'X')
+            i += 1
+        else:
+            digraphs.append(text[i] + text[i + 1])
+            i += 2
+    result = ""
+    shift = 1 if mode == 'encrypt' else -1
+    for pair in digraphs:
+        r1, c1 = polyalphabetic.find_char_coords(matrix, pair[0])
+        r2, c2 = polyalphabetic.find_char_coords(matrix, pair[1])
+        if r1 == r2:
+            result += matrix[r1][(c1 + shift) % 5] + matrix[r2][(c2 + shift) % 5]
+        elif c1 == c2:
+            result += matrix[(r1 + shift) % 5][c1] + matrix[(r2 + shift) % 5][c2]
+        else:
+            result += matrix[r1][c2] + matrix[r2][c1]
+    return result
+
+def main():
+    compare_loop(random.Random(0), (10_000, 1_000_000, 20_000_000),
+                 [("Playfair", playfair_loop, polyalphabetic.playfair_process, ("PLAYFAIR EXAMPLE",))], "tables")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+# Benchmark: the original per-character Caesar/Affine loops vs. the cached translate tables.
+# Run from the project root with:  python -m benchmarks.substitution
+
+import random
+
+from benchmarks._common import compare_loop
+from ciphers import substitution
+from utils import ALPHABET, normalize_text
+
+def caesar_loop(plaintext, shift):
+    """The original implementation: ALPHABET.index per character and string +=."""
+    ciphertext = ""
+    for char in normalize_text(plaintext):
+        ciphertext += ALPHABET[(ALPHABET.index(char) + shift) % 26]
+    return ciphertext
+
+def affine_loop(plaintext, a, b):
+    ciphertext = ""
+    for char in normalize_text(plaintext):
+        ciphertext += ALPHABET[(a * ALPHABET.index(char) + b) % 26]
+    return ciphertext
+
+def main():
+    compare_loop(random.Random(0), (10_000, 1_000_000, 8_000_000),
+                 [("Caesar", caesar_loop, substitution.caesar_encrypt, (3,)),
+                  ("Affine", affine_loop, substitution.affine_encrypt, (5, 8))], "table")
+
+if __name__ == "__main__":
+    main()
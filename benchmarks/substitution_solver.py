@@ -0,0 +1,55 @@
+# Benchmark: cracking batches of Caesar/Affine ciphertexts.
+# A per-ciphertext Python loop (decrypt with every key, chi-squared of each
+# result) vs. the batched bincount + matrix scoring, with top-1 accuracy.
+# Run from the project root with:  python -m benchmarks.substitution_solver [batch] [length]
+
+import random
+import sys
+import time
+from collections import Counter
+
+from ciphers import substitution, substitution_solver
+from utils import ALPHABET, ENGLISH_FREQUENCIES
+
+WORDS = ("the of and to in is that for it as was with be by on not he this are or his from at which "
+         "but have an they you were her she there been one all we their has would when if so no what").split()
+
+def loop_crack(ciphertext, keys, decrypt):
+    """Try every key in Python and keep the one with the lowest chi-squared."""
+    best = None
+    for key in keys:
+        plaintext = decrypt(ciphertext, *key)
+        counts = Counter(plaintext)
+        n = max(len(plaintext), 1)
+        chi2 = sum((counts[letter] - n * f) ** 2 / (n * f) for letter, f in zip(ALPHABET, ENGLISH_FREQUENCIES))
+        if best is None or chi2 < best[1]:
+            best = (key, chi2)
+    return best[0]
+
+def main():
+    batch = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    length = int(sys.argv[2]) if len(sys.argv) > 2 else 40
+    rng = random.Random(0)
+    texts = [" ".join(rng.choice(WORDS) for _ in range(length // 3)) for _ in range(batch)]
+    print(f"{'Cipher':>7} {'Keys':>5} {'loop (texts/s)':>15} {'batch (texts/s)':>16} {'speedup':>9} {'accuracy':>9}")
+    for name, keys, encrypt, decrypt in (
+            ("Caesar", substitution_solver.CAESAR_KEYS, substitution.affine_encrypt, substitution.affine_decrypt),
+            ("Affine", substitution_solver.AFFINE_KEYS, substitution.affine_encrypt, substitution.affine_decrypt)):
+        true_keys = [rng.choice(keys) for _ in texts]
+        ciphertexts = [encrypt(text, *key) for text, key in zip(texts, true_keys)]
+
+        sample = ciphertexts[:max(1, 2000 // len(keys))]  # The loop is too slow for the whole batch
+        start = time.perf_counter()
+        for ciphertext in sample:
+            loop_crack(ciphertext, keys, decrypt)
+        loop_rate = len(sample) / (time.perf_counter() - start)
+
+        start = time.perf_counter()
+        ranked = substitution_solver.rank_keys(ciphertexts, keys, top=1)
+        batch_rate = batch / (time.perf_counter() - start)
+        accuracy = sum(r[0][0] == key for r, key in zip(ranked, true_keys)) / batch
+        print(f"{name:>7} {len(keys):>5} {loop_rate:>15,.0f} {batch_rate:>16,.0f} "
+              f"{batch_rate / loop_rate:>8.0f}x {accuracy:>9.1%}")
+
+if __name__ == "__main__":
+    main()
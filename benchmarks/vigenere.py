@@ -0,0 +1,27 @@
+# Benchmark: the original per-character Vigenere loop vs. the NumPy uint8 engine.
+# Run from the project root with:  python -m benchmarks.vigenere
+
+import random
+
+from benchmarks._common import compare_loop
+from ciphers import polyalphabetic
+from utils import ALPHABET, normalize_text
+
+def vigenere_loop(plaintext, key):
+    """The original implementation: ALPHABET.index twice per character and string +=."""
+    normalized_text = normalize_text(plaintext)
+    normalized_key = normalize_text(key)
+    ciphertext = ""
+    key_index = 0
+    for char in normalized_text:
+        encrypted_index = (ALPHABET.index(char) + ALPHABET.index(normalized_key[key_index])) % 26
+        ciphertext += ALPHABET[encrypted_index]
+        key_index = (key_index + 1) % len(normalized_key)
+    return ciphertext
+
+def main():
+    compare_loop(random.Random(0), (10_000, 1_000_000, 100_000_000),
+                 [("Vigenere", vigenere_loop, polyalphabetic.vigenere_encrypt, ("LEMONADE",))], "numpy")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+# Benchmark: Vigenere key recovery without the key.
+# Accuracy and ciphertexts per second by ciphertext length, from 1 to N
+# worker processes, and the time to crack one large ciphertext.
+# Run from the project root with:  python -m benchmarks.vigenere_solver [batch]
+
+import os
+import random
+import sys
+import time
+
+from benchmarks.substitution_solver import WORDS
+from ciphers import polyalphabetic, vigenere_solver
+from utils import ALPHABET
+
+def random_text(rng, letters):
+    words, count = [], 0
+    while count < letters:
+        words.append(rng.choice(WORDS))
+        count += len(words[-1])
+    return " ".join(words)
+
+def main():
+    batch = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+    rng = random.Random(0)
+    worker_counts = sorted({1, os.cpu_count() or 1})
+    header = " ".join(f"{f'{w} proc (texts/s)':>17}" for w in worker_counts)
+    print(f"{'Letters':>8} {header} {'accuracy':>9}")
+    for letters in (200, 500, 2000, 20000):
+        keys = ["".join(rng.choices(ALPHABET, k=rng.randint(3, 16))) for _ in range(batch)]
+        ciphertexts = [polyalphabetic.vigenere_encrypt(random_text(rng, letters), key) for key in keys]
+        rates = []
+        for workers in worker_counts:
+            start = time.perf_counter()
+            solved = vigenere_solver.crack_vigenere_batch(ciphertexts, workers=workers)
+            rates.append(batch / (time.perf_counter() - start))
+        accuracy = sum(bool(s) and s[0].key == key for s, key in zip(solved, keys)) / batch
+        columns = " ".join(f"{rate:>17,.1f}" for rate in rates)
+        print(f"{letters:>8} {columns} {accuracy:>9.1%}")
+
+    key = "CRYPTOGRAPHY"
+    ciphertext = polyalphabetic.vigenere_encrypt(random_text(rng, 10_000_000), key)
+    start = time.perf_counter()
+    best = vigenere_solver.crack_vigenere(ciphertext)[0]
+    print(f"10M letters: key {best.key} ({'correct' if best.key == key else 'wrong'}) "
+          f"in {time.perf_counter() - start:.2f} s")
+
+if __name__ == "__main__":
+    main()
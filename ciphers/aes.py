@@ -1,85 +1,996 @@
 # This file implements AES using the professional pycryptodome library.
-# This ensures security and correctness. We will use GCM mode for AEAD.
+# This ensures security and correctness. GCM mode (AEAD) is the default;
+# CTR, CBC, SIV and OCB can be chosen per message.
 
 from Crypto.Cipher import AES
+from Crypto.Hash import SHA256
+from Crypto.Protocol.KDF import HKDF, PBKDF2, scrypt
 from Crypto.Random import get_random_bytes
+from Crypto.Util.Padding import pad, unpad
+from collections import OrderedDict
+from functools import lru_cache
+from typing import NamedTuple
 import base64
+import binascii
+import bz2
+import hashlib
+import hmac
+import itertools
 import json
+import lzma
+import struct
+import threading
+import time
+import zlib
 
 # AES GCM mode provides both confidentiality and integrity (authentication).
 # We need to store/send the ciphertext, the tag, and the nonce.
-# We will use Base64 encoding to make them into a single, printable string.
+# They are packed into one compact binary container:
+#
+#   magic (4) | version (1) | key size (1) | mode (1) | flags (1)
+#   | [KDF section] | [codec (1)] | nonce | ciphertext | tag (16)
+#
+# The nonce length depends on the mode (see MODE_NONCE_SIZES):
+#   GCM, OCB  - 12-byte nonce, AEAD tag.
+#   CTR       - 8-byte nonce + 64-bit block counter; seekable, since any
+#               block can be decrypted on its own.
+#   CBC       - 16-byte IV, PKCS#7 padded.
+#   SIV       - no nonce. Deterministic: the same key and plaintext always
+#               give the same container, so duplicates can be detected.
+#               Keys are stretched to double length with HKDF, as SIV needs.
+# CTR and CBC are not authenticated on their own, so they are sealed
+# encrypt-then-MAC with HMAC-SHA256 (truncated to 16 bytes) under a MAC key
+# derived from the AES key with HKDF.
+#
+# The KDF section is present when the key was derived from a passphrase
+# (FLAG_KDF), and records how to derive it again:
+#
+#   KDF id (1) | cost (4) | r (1) | p (1) | salt (16)
+#
+# The codec byte is present when the plaintext was compressed before
+# encryption (FLAG_COMPRESSED); see the Compression section below.
+#
+# The whole header is authenticated as associated data, so it cannot be
+# altered without the tag check failing.
+# For text output, one armor layer (Base64 or Base85) is added on top.
+# Older releases wrapped Base64 fields in JSON and Base64-encoded that again;
+# aes_decrypt still reads that legacy format.
 
-def aes_encrypt(plaintext: str, key_bytes: bytes) -> str:
+MAGIC = b'CTKA'
+FORMAT_VERSION = 3
+HEADER = struct.Struct('>4sBBBB')  # magic, version, key size, mode, flags
+KDF_SECTION = struct.Struct('>BIBB16s')  # KDF id, cost, r, p, salt
+FLAG_KDF = 0x01
+FLAG_COMPRESSED = 0x02
+KNOWN_FLAGS = FLAG_KDF | FLAG_COMPRESSED
+NONCE_SIZE = 12
+TAG_SIZE = 16
+ARMORS = ('base64', 'base85')
+MODE_IDS = {'GCM': 1, 'CTR': 2, 'CBC': 3, 'SIV': 4, 'OCB': 5}
+MODE_NAMES = {mode_id: name for name, mode_id in MODE_IDS.items()}
+AES_MODES = tuple(MODE_IDS)
+MODE_NONCE_SIZES = {'GCM': NONCE_SIZE, 'CTR': 8, 'CBC': 16, 'SIV': 0, 'OCB': NONCE_SIZE}
+
+def build_header(key_size: int, mode: str = 'GCM', kdf_params=None, salt: bytes = None,
+                 codec: str = None) -> bytes:
+    """
+    Build a container header, with a KDF section when a passphrase key is
+    used and a codec byte when the plaintext is compressed.
+    """
+    if mode not in MODE_IDS:
+        raise ValueError(f"Unknown AES mode '{mode}'. Choose one of {AES_MODES}.")
+    flags = 0
+    sections = b''
+    if kdf_params is not None:
+        flags |= FLAG_KDF
+        sections += KDF_SECTION.pack(KDF_IDS[kdf_params.kdf], kdf_params.cost, kdf_params.r, kdf_params.p, salt)
+    if codec is not None:
+        flags |= FLAG_COMPRESSED
+        sections += bytes([CODEC_IDS[codec]])
+    return HEADER.pack(MAGIC, FORMAT_VERSION, key_size, MODE_IDS[mode], flags) + sections
+
+def pack_container(header: bytes, nonce: bytes, ciphertext: bytes, tag: bytes) -> bytes:
+    """Frame the parts of an AES message into the binary container."""
+    return header + nonce + ciphertext + tag
+
+def unpack_container(blob: bytes) -> dict:
+    """
+    Split a binary container into its fields: 'header' (the authenticated
+    bytes), 'key_size', 'mode', 'kdf' (KDFParams or None), 'salt',
+    'codec' (None if not compressed), 'nonce', 'ciphertext' and 'tag'.
+    Raises ValueError if the data is not a container this version can read.
+    """
+    if len(blob) < 5 or blob[:4] != MAGIC:
+        raise ValueError("Data is not an AES container (bad magic).")
+    if blob[4] != FORMAT_VERSION:
+        raise ValueError(f"Unsupported AES container version {blob[4]}.")
+    if len(blob) < HEADER.size:
+        raise ValueError("Data is too short to be an AES container.")
+    fields = {'kdf': None, 'salt': None, 'codec': None}
+    _, _, fields['key_size'], mode_id, flags = HEADER.unpack_from(blob)
+    if mode_id not in MODE_NAMES:
+        raise ValueError(f"Unknown AES mode id {mode_id}.")
+    fields['mode'] = MODE_NAMES[mode_id]
+    header_size = HEADER.size
+    if flags & ~KNOWN_FLAGS:
+        raise ValueError(f"Unknown AES container flags {flags:#04x}.")
+    if flags & FLAG_KDF:
+        if len(blob) < header_size + KDF_SECTION.size:
+            raise ValueError("Data is too short to be an AES container.")
+        kdf_id, cost, r, p, fields['salt'] = KDF_SECTION.unpack_from(blob, header_size)
+        if kdf_id not in KDF_NAMES:
+            raise ValueError(f"Unknown key derivation function id {kdf_id}.")
+        fields['kdf'] = KDFParams(KDF_NAMES[kdf_id], cost, r, p)
+        header_size += KDF_SECTION.size
+    if flags & FLAG_COMPRESSED:
+        if len(blob) <= header_size:
+            raise ValueError("Data is too short to be an AES container.")
+        if blob[header_size] not in CODEC_NAMES:
+            raise ValueError(f"Unknown compression codec id {blob[header_size]}.")
+        fields['codec'] = CODEC_NAMES[blob[header_size]]
+        header_size += 1
+
+    nonce_end = header_size + MODE_NONCE_SIZES[fields['mode']]
+    if len(blob) < nonce_end + TAG_SIZE:
+        raise ValueError("Data is too short to be an AES container.")
+    fields.update(header=blob[:header_size], nonce=blob[header_size:nonce_end],
+                  ciphertext=blob[nonce_end:-TAG_SIZE], tag=blob[-TAG_SIZE:])
+    return fields
+
+@lru_cache(maxsize=128)
+def _subkey(key_bytes: bytes, purpose: bytes, size: int) -> bytes:
+    """Derive a key for one purpose (the HMAC key, the double-length SIV key)."""
+    return HKDF(key_bytes, size, b'', SHA256, context=b'CTKA ' + purpose)
+
+def _mac_tag(key_bytes: bytes, authenticated: bytes) -> bytes:
+    return hmac.new(_subkey(key_bytes, b'hmac', 32), authenticated, hashlib.sha256).digest()[:TAG_SIZE]
+
+def _aead_cipher(key_bytes: bytes, mode: str, nonce: bytes):
+    if mode == 'SIV':
+        return AES.new(_subkey(key_bytes, b'siv', 2 * len(key_bytes)), AES.MODE_SIV)
+    return AES.new(key_bytes, AES.MODE_GCM if mode == 'GCM' else AES.MODE_OCB, nonce=nonce)
+
+def _seal(key_bytes: bytes, header: bytes, data: bytes) -> bytes:
+    mode = MODE_NAMES[header[6]]
+    nonce = get_random_bytes(MODE_NONCE_SIZES[mode])
+    if mode == 'CTR':
+        ciphertext = AES.new(key_bytes, AES.MODE_CTR, nonce=nonce).encrypt(data)
+    elif mode == 'CBC':
+        ciphertext = AES.new(key_bytes, AES.MODE_CBC, iv=nonce).encrypt(pad(data, AES.block_size))
+    else:
+        cipher = _aead_cipher(key_bytes, mode, nonce)
+        cipher.update(header)
+        ciphertext, tag = cipher.encrypt_and_digest(data)
+        return pack_container(header, nonce, ciphertext, tag)
+    # Encrypt-then-MAC over everything before the tag
+    return pack_container(header, nonce, ciphertext, _mac_tag(key_bytes, header + nonce + ciphertext))
+
+def _open(key_bytes: bytes, fields: dict) -> bytes:
+    if fields['key_size'] != len(key_bytes):
+        raise ValueError(f"Container was encrypted with a {fields['key_size'] * 8}-bit key.")
+    mode, nonce, ciphertext = fields['mode'], fields['nonce'], fields['ciphertext']
+    if mode in ('CTR', 'CBC'):
+        # Check the MAC before touching the ciphertext
+        expected = _mac_tag(key_bytes, fields['header'] + nonce + ciphertext)
+        if not hmac.compare_digest(expected, fields['tag']):
+            raise ValueError("MAC check failed")
+        if mode == 'CTR':
+            data = AES.new(key_bytes, AES.MODE_CTR, nonce=nonce).decrypt(ciphertext)
+        else:
+            data = unpad(AES.new(key_bytes, AES.MODE_CBC, iv=nonce).decrypt(ciphertext), AES.block_size)
+    else:
+        cipher = _aead_cipher(key_bytes, mode, nonce)
+        cipher.update(fields['header'])
+        data = cipher.decrypt_and_verify(ciphertext, fields['tag'])
+    # Only authenticated data reaches the decompressor
+    return decompress(data, fields['codec']) if fields['codec'] else data
+
+def aes_encrypt_bytes(data: bytes, key_bytes: bytes, mode: str = 'GCM', compression: str = None) -> bytes:
+    """
+    Encrypts bytes with AES into a binary container.
+
+    Args:
+        data (bytes): The data to encrypt.
+        key_bytes (bytes): The encryption key (must be 16, 24, or 32 bytes).
+        mode (str): One of AES_MODES: 'GCM', 'CTR', 'CBC', 'SIV' or 'OCB'.
+        compression (str): None, or a codec from CODECS ('zlib', 'lzma', 'bz2')
+            to compress with first. Small or incompressible data is stored as is.
+
+    Returns:
+        bytes: The container (header, nonce, ciphertext and tag).
+    """
+    codec, data = compress_if_worthwhile(data, compression)
+    return _seal(key_bytes, build_header(len(key_bytes), mode, codec=codec), data)
+
+def aes_decrypt_bytes(blob: bytes, key_bytes: bytes) -> bytes:
+    """
+    Decrypts a binary container made by aes_encrypt_bytes, in any mode
+    (the mode is read from the header). Raises ValueError if the container is malformed or authentication fails.
+    """
+    fields = unpack_container(blob)
+    if fields['kdf'] is not None:
+        raise ValueError("Container was encrypted with a passphrase.")
+    return _open(key_bytes, fields)
+
+def armor_encode(blob: bytes, armor: str = 'base64') -> str:
+    """Wrap a binary container in a single Base64 or Base85 text layer."""
+    if armor == 'base64':
+        return base64.b64encode(blob).decode('ascii')
+    if armor == 'base85':
+        return base64.b85encode(blob).decode('ascii')
+    raise ValueError(f"Unknown armor '{armor}'. Choose one of {ARMORS}.")
+
+def armor_decode(text: str) -> bytes:
+    """
+    Remove the text armor from a container, detecting Base64 or Base85.
+    Returns the decoded bytes, which may also be a legacy JSON message.
     """
-    Encrypts text using AES-GCM mode.
-    
+    text = text.strip()
+    try:
+        blob = base64.b64decode(text, validate=True)
+        if blob.startswith(MAGIC) or blob.startswith(b'{'):
+            return blob
+    except binascii.Error:
+        pass
+    return base64.b85decode(text)
+
+def aes_encrypt(plaintext: str, key_bytes: bytes, armor: str = 'base64', mode: str = 'GCM',
+                compression: str = None) -> str:
+    """
+    Encrypts text using AES (GCM mode by default).
+
     Args:
         plaintext (str): The text to encrypt.
         key_bytes (bytes): The encryption key (must be 16, 24, or 32 bytes).
-        
+        armor (str): The text encoding of the container, 'base64' or 'base85'.
+        mode (str): One of AES_MODES: 'GCM', 'CTR', 'CBC', 'SIV' or 'OCB'.
+        compression (str): None, 'zlib', 'lzma' or 'bz2' (skipped when it would not help).
+
     Returns:
-        str: A Base64 encoded string containing the nonce, tag, and ciphertext.
+        str: The armored binary container (nonce, ciphertext and tag).
     """
     try:
-        # Convert plaintext to bytes
-        data = plaintext.encode('utf-8')
-        
-        # Create a new AES cipher object in GCM mode
-        cipher = AES.new(key_bytes, AES.MODE_GCM)
-        
-        # Encrypt the data
-        ciphertext, tag = cipher.encrypt_and_digest(data)
-        
-        # We need to store nonce, tag, and ciphertext to be able to decrypt.
-        # We'll pack them into a JSON object and then Base64 encode it.
-        json_fields = {
-            'nonce': base64.b64encode(cipher.nonce).decode('utf-8'),
-            'tag': base64.b64encode(tag).decode('utf-8'),
-            'ciphertext': base64.b64encode(ciphertext).decode('utf-8')
-        }
-        
-        # Encode the JSON object to Base64
-        encrypted_data = base64.b64encode(json.dumps(json_fields).encode('utf-8'))
-        
-        return encrypted_data.decode('utf-8')
-        
+        # Convert plaintext to bytes and encrypt it into a container
+        blob = aes_encrypt_bytes(plaintext.encode('utf-8'), key_bytes, mode, compression)
+        return armor_encode(blob, armor)
+
     except Exception as e:
         return f"Encryption Error: {e}"
 
-def aes_decrypt(base64_data: str, key_bytes: bytes) -> str:
+def _legacy_decrypt(json_data: bytes, key_bytes: bytes) -> bytes:
+    """Decrypt the old Base64(JSON(Base64 fields)) format."""
+    fields = json.loads(json_data.decode('utf-8'))
+
+    # Decode each part from Base64
+    nonce = base64.b64decode(fields['nonce'])
+    tag = base64.b64decode(fields['tag'])
+    ciphertext = base64.b64decode(fields['ciphertext'])
+
+    # Create the AES cipher object with the same key and nonce
+    cipher = AES.new(key_bytes, AES.MODE_GCM, nonce=nonce)
+
+    # Decrypt and verify the data (GCM automatically checks the tag)
+    return cipher.decrypt_and_verify(ciphertext, tag)
+
+def aes_decrypt(armored_data: str, key_bytes: bytes) -> str:
     """
-    Decrypts a Base64 encoded AES-GCM string.
-    
+    Decrypts an armored AES container (any mode), or a message in the legacy JSON format.
+
     Args:
-        base64_data (str): The Base64 encoded string from aes_encrypt.
+        armored_data (str): The string from aes_encrypt.
         key_bytes (bytes): The same key used for encryption.
-        
+
     Returns:
         str: The decrypted plaintext or an error message.
     """
     try:
-        # Decode the Base64 data to get the JSON string
-        json_data = base64.b64decode(base64_data).decode('utf-8')
-        
-        # Parse the JSON object
-        fields = json.loads(json_data)
-        
-        # Decode each part from Base64
-        nonce = base64.b64decode(fields['nonce'])
-        tag = base64.b64decode(fields['tag'])
-        ciphertext = base64.b64decode(fields['ciphertext'])
-        
-        # Create the AES cipher object with the same key and nonce
-        cipher = AES.new(key_bytes, AES.MODE_GCM, nonce=nonce)
-        
-        # Decrypt and verify the data (GCM automatically checks the tag)
-        decrypted_bytes = cipher.decrypt_and_verify(ciphertext, tag)
-        
+        blob = armor_decode(armored_data)
+        if blob.startswith(MAGIC):
+            decrypted_bytes = aes_decrypt_bytes(blob, key_bytes)
+        else:
+            decrypted_bytes = _legacy_decrypt(blob, key_bytes)
+
         # Decode bytes back to a string
         return decrypted_bytes.decode('utf-8')
-        
+
     except (ValueError, KeyError, json.JSONDecodeError):
         return "Decryption Error: Invalid data or key. (Authentication failed)"
     except Exception as e:
-        return f"Decryption Error: {e}"
\ No newline at end of file
+        return f"Decryption Error: {e}"
+
+# --- Compression ---
+# Text and JSON shrink a lot when compressed, and the ciphertext is as long
+# as the plaintext, so compressing first cuts storage and transfer. Small
+# inputs gain nothing (codec framing costs more than it saves) and random or
+# already-compressed data does not shrink, so a quick zlib probe on a few
+# samples decides first. The codec is recorded in the header and the data is
+# decompressed only after it has been authenticated.
+# Note: compression makes the ciphertext length depend on the content. Do not
+# compress data that mixes secrets with attacker-chosen text.
+
+CODEC_IDS = {'zlib': 1, 'lzma': 2, 'bz2': 3}
+CODEC_NAMES = {codec_id: name for name, codec_id in CODEC_IDS.items()}
+CODECS = tuple(CODEC_IDS)
+COMPRESS_MIN_SIZE = 256  # Smaller inputs are never compressed
+SAMPLE_SIZE = 4096  # Bytes per probe sample (start, middle and end)
+MAX_SAMPLE_RATIO = 0.9  # Compress only if the samples shrink below this
+
+def _compressor(codec: str):
+    if codec == 'zlib':
+        return zlib.compressobj(6)
+    if codec == 'lzma':
+        return lzma.LZMACompressor()
+    if codec == 'bz2':
+        return bz2.BZ2Compressor()
+    raise ValueError(f"Unknown compression codec '{codec}'. Choose one of {CODECS}.")
+
+def _decompressor(codec: str):
+    if codec == 'zlib':
+        return zlib.decompressobj()
+    if codec == 'lzma':
+        return lzma.LZMADecompressor()
+    if codec == 'bz2':
+        return bz2.BZ2Decompressor()
+    raise ValueError(f"Unknown compression codec '{codec}'. Choose one of {CODECS}.")
+
+def compress(data: bytes, codec: str) -> bytes:
+    """Compress bytes with one of CODECS."""
+    compressor = _compressor(codec)
+    return compressor.compress(data) + compressor.flush()
+
+def decompress(data: bytes, codec: str) -> bytes:
+    """Decompress bytes made by compress. Raises ValueError if they are corrupt or incomplete."""
+    decompressor = _decompressor(codec)
+    try:
+        output = decompressor.decompress(data)
+    except (zlib.error, lzma.LZMAError, OSError) as e:
+        raise ValueError(f"Compressed data is corrupt: {e}") from e
+    if not decompressor.eof:
+        raise ValueError("Compressed data is incomplete.")
+    return output
+
+def should_compress(data: bytes) -> bool:
+    """
+    Guess whether compressing `data` is worthwhile: it must be at least
+    COMPRESS_MIN_SIZE bytes, and fast zlib must shrink samples from its start,
+    middle and end below MAX_SAMPLE_RATIO of their size.
+    """
+    if len(data) < COMPRESS_MIN_SIZE:
+        return False
+    if len(data) <= 3 * SAMPLE_SIZE:
+        sample = bytes(data)
+    else:
+        middle = len(data) // 2 - SAMPLE_SIZE // 2
+        sample = bytes(data[:SAMPLE_SIZE]) + bytes(data[middle:middle + SAMPLE_SIZE]) + bytes(data[-SAMPLE_SIZE:])
+    return len(zlib.compress(sample, 1)) < MAX_SAMPLE_RATIO * len(sample)
+
+def compress_if_worthwhile(data: bytes, codec: str = None) -> tuple[str, bytes]:
+    """
+    Compress `data` with `codec` unless should_compress says no (or codec is
+    None), and unless the result would not actually be smaller.
+
+    Returns:
+        tuple[str, bytes]: The codec used (None if stored as is) and the data.
+    """
+    if codec is None:
+        return None, data
+    if codec not in CODEC_IDS:
+        raise ValueError(f"Unknown compression codec '{codec}'. Choose one of {CODECS}.")
+    if not should_compress(data):
+        return None, data
+    compressed = compress(data, codec)
+    if len(compressed) + 1 >= len(data):
+        return None, data
+    return codec, compressed
+
+# --- Passphrase Keys ---
+# A passphrase is stretched into an AES key with scrypt (or PBKDF2-SHA256).
+# The KDF, its cost parameters and a random salt go into the container header,
+# so decryption only needs the passphrase. Deriving a key is slow on purpose;
+# calibrate_kdf picks the cost for a target delay on this machine, and
+# derived keys are kept in a small LRU cache with a time limit so repeated
+# operations with the same passphrase and salt skip the derivation.
+
+class KDFParams(NamedTuple):
+    """Key derivation settings: 'scrypt' (cost = N, with r and p) or 'pbkdf2' (cost = iterations)."""
+    kdf: str
+    cost: int
+    r: int = 0
+    p: int = 0
+
+KDF_IDS = {'scrypt': 1, 'pbkdf2': 2}
+KDF_NAMES = {kdf_id: name for name, kdf_id in KDF_IDS.items()}
+SALT_SIZE = 16
+DEFAULT_KDF_PARAMS = KDFParams('scrypt', 2 ** 15, 8, 1)
+# Upper bounds accepted from a container, so a crafted header cannot demand
+# gigabytes of memory or hours of CPU time. scrypt's memory is 128 * r * N
+# bytes and its work is p times that, so p is capped and the work is bounded
+# as a whole (the same budget as the memory: N = 2**20 with r = 8 and p = 1).
+MAX_SCRYPT_MEMORY = 1 << 30
+MAX_SCRYPT_P = 16
+MAX_SCRYPT_WORK = 1 << 30
+MAX_PBKDF2_ITERATIONS = 10_000_000
+
+def _check_kdf_params(params: KDFParams) -> None:
+    if params.kdf == 'scrypt':
+        if params.cost < 2 or params.cost & (params.cost - 1) or params.r < 1 or params.p < 1:
+            raise ValueError("scrypt needs N to be a power of two, and r, p of at least 1.")
+        if 128 * params.r * params.cost > MAX_SCRYPT_MEMORY:
+            raise ValueError("scrypt parameters exceed the memory limit.")
+        if params.p > MAX_SCRYPT_P or 128 * params.r * params.cost * params.p > MAX_SCRYPT_WORK:
+            raise ValueError("scrypt parameters exceed the work limit.")
+    elif params.kdf == 'pbkdf2':
+        if not 1 <= params.cost <= MAX_PBKDF2_ITERATIONS:
+            raise ValueError("PBKDF2 iteration count is out of range.")
+    else:
+        raise ValueError(f"Unknown key derivation function '{params.kdf}'.")
+
+def _run_kdf(passphrase: str, salt: bytes, key_size: int, params: KDFParams) -> bytes:
+    if params.kdf == 'scrypt':
+        return scrypt(passphrase, salt, key_size, N=params.cost, r=params.r, p=params.p)
+    return PBKDF2(passphrase, salt, key_size, count=params.cost, hmac_hash_module=SHA256)
+
+class KeyCache:
+    """
+    A bounded LRU cache of keys whose entries also expire after `ttl` seconds.
+    Counts hits and misses, and the time spent serving each, so callers can
+    see whether the cache is paying for itself.
+    """
+
+    def __init__(self, maxsize: int = 64, ttl: float = 300.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.hit_seconds = 0.0
+        self.miss_seconds = 0.0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_create(self, lookup, create) -> bytes:
+        """Return the cached key for `lookup`, calling `create()` (and caching its result) on a miss."""
+        start = time.perf_counter()
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(lookup)
+            if entry is not None and entry[1] > now:
+                self._entries.move_to_end(lookup)
+                self.hits += 1
+                self.hit_seconds += time.perf_counter() - start
+                return entry[0]
+
+        key = create()
+        with self._lock:
+            self.misses += 1
+            self.miss_seconds += time.perf_counter() - start
+            self._entries[lookup] = (key, now + self.ttl)
+            self._entries.move_to_end(lookup)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return key
+
+    def stats(self) -> dict:
+        """Hits, misses, hit rate and the average latency (ms) of a hit and of a miss."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'avg_hit_ms': 1000 * self.hit_seconds / self.hits if self.hits else 0.0,
+                'avg_miss_ms': 1000 * self.miss_seconds / self.misses if self.misses else 0.0,
+                'size': len(self._entries),
+            }
+
+    def clear(self) -> None:
+        """Forget every cached key."""
+        with self._lock:
+            self._entries.clear()
+
+class DerivedKeyCache(KeyCache):
+    """
+    A KeyCache of passphrase-derived keys. Entries are looked up by a hash
+    of the passphrase, never the passphrase itself.
+    """
+
+    def get_or_derive(self, passphrase: str, salt: bytes, key_size: int, params: KDFParams) -> bytes:
+        """Return the cached key for these inputs, deriving (and caching) it if needed."""
+        lookup = (hashlib.sha256(passphrase.encode('utf-8')).digest(), bytes(salt), key_size, params)
+        return self.get_or_create(lookup, lambda: _run_kdf(passphrase, salt, key_size, params))
+
+DERIVED_KEY_CACHE = DerivedKeyCache()
+
+def derive_key(passphrase: str, salt: bytes, key_size: int = 32,
+               params: KDFParams = DEFAULT_KDF_PARAMS, cache: DerivedKeyCache = DERIVED_KEY_CACHE) -> bytes:
+    """
+    Derives an AES key from a passphrase.
+
+    Args:
+        passphrase (str): The passphrase.
+        salt (bytes): A random salt (stored alongside the ciphertext).
+        key_size (int): 16, 24 or 32 bytes.
+        params (KDFParams): The KDF and its cost parameters.
+        cache (DerivedKeyCache): Where to reuse keys from; None to always derive.
+
+    Returns:
+        bytes: The derived key.
+    """
+    _check_kdf_params(params)
+    if cache is None:
+        return _run_kdf(passphrase, salt, key_size, params)
+    return cache.get_or_derive(passphrase, salt, key_size, params)
+
+def calibrate_kdf(target_seconds: float = 0.25, kdf: str = 'scrypt', r: int = 8, p: int = 1) -> KDFParams:
+    """
+    Picks KDF cost parameters that take about `target_seconds` on this machine.
+    scrypt's N is rounded down to a power of two and capped by MAX_SCRYPT_MEMORY
+    and MAX_SCRYPT_WORK.
+
+    Returns:
+        KDFParams: The calibrated settings.
+    """
+    salt = get_random_bytes(SALT_SIZE)
+    if kdf == 'scrypt':
+        probe = KDFParams('scrypt', 2 ** 12, r, p)
+    elif kdf == 'pbkdf2':
+        probe = KDFParams('pbkdf2', 10_000)
+    else:
+        raise ValueError(f"Unknown key derivation function '{kdf}'.")
+
+    start = time.perf_counter()
+    _run_kdf('calibration', salt, 32, probe)
+    scale = target_seconds / (time.perf_counter() - start)
+
+    if kdf == 'pbkdf2':
+        return KDFParams('pbkdf2', min(max(1_000, int(probe.cost * scale)), MAX_PBKDF2_ITERATIONS))
+    cost = probe.cost
+    while (cost * 2 <= probe.cost * scale and 128 * r * cost * 2 <= MAX_SCRYPT_MEMORY
+           and 128 * r * cost * 2 * p <= MAX_SCRYPT_WORK):
+        cost *= 2
+    while cost > 2 ** 10 and cost > probe.cost * scale:
+        cost //= 2
+    return KDFParams('scrypt', cost, r, p)
+
+def aes_encrypt_passphrase_bytes(data: bytes, passphrase: str, key_size: int = 32,
+                                 params: KDFParams = DEFAULT_KDF_PARAMS, salt: bytes = None,
+                                 mode: str = 'GCM', compression: str = None) -> bytes:
+    """
+    Encrypts bytes with a key derived from a passphrase.
+    The KDF settings and salt are stored in the container header.
+    Pass the same `salt` to reuse a cached key across many encryptions.
+    """
+    salt = get_random_bytes(SALT_SIZE) if salt is None else salt
+    if len(salt) != SALT_SIZE:
+        raise ValueError(f"Salt must be {SALT_SIZE} bytes long.")
+    key_bytes = derive_key(passphrase, salt, key_size, params)
+    codec, data = compress_if_worthwhile(data, compression)
+    return _seal(key_bytes, build_header(key_size, mode, params, salt, codec), data)
+
+def aes_decrypt_passphrase_bytes(blob: bytes, passphrase: str) -> bytes:
+    """
+    Decrypts a container made by aes_encrypt_passphrase_bytes.
+    Raises ValueError if the container is malformed or authentication fails.
+    """
+    fields = unpack_container(blob)
+    if fields['kdf'] is None:
+        raise ValueError("Container was not encrypted with a passphrase.")
+    key_bytes = derive_key(passphrase, fields['salt'], fields['key_size'], fields['kdf'])
+    return _open(key_bytes, fields)
+
+def aes_encrypt_passphrase(plaintext: str, passphrase: str, key_size: int = 32, armor: str = 'base64',
+                           mode: str = 'GCM', compression: str = None) -> str:
+    """
+    Encrypts text using AES (GCM by default) with a key derived from a passphrase.
+
+    Returns:
+        str: The armored container, or an error message.
+    """
+    try:
+        blob = aes_encrypt_passphrase_bytes(plaintext.encode('utf-8'), passphrase, key_size,
+                                            mode=mode, compression=compression)
+        return armor_encode(blob, armor)
+    except Exception as e:
+        return f"Encryption Error: {e}"
+
+def aes_decrypt_passphrase(armored_data: str, passphrase: str) -> str:
+    """
+    Decrypts an armored container made by aes_encrypt_passphrase.
+
+    Returns:
+        str: The decrypted plaintext or an error message.
+    """
+    try:
+        return aes_decrypt_passphrase_bytes(armor_decode(armored_data), passphrase).decode('utf-8')
+    except ValueError:
+        return "Decryption Error: Invalid data or passphrase. (Authentication failed)"
+    except Exception as e:
+        return f"Decryption Error: {e}"
+
+# --- Streaming (Segmented) AES-GCM ---
+# Large inputs are split into fixed-size segments that are encrypted one at a
+# time, so memory use does not grow with the input (the STREAM construction).
+# Each segment gets its own GCM tag and its own nonce:
+#
+#   nonce = nonce prefix (7) | segment counter (4, big-endian) | final flag (1)
+#
+# The final flag is 1 only on the last segment, so dropping segments from the
+# end (or reordering them) makes authentication fail. The stream header is
+# authenticated with every segment:
+#
+#   magic (4) | version (1) | key size (1) | segment size (4) | nonce prefix (7)
+#   then for each segment: ciphertext (segment size, last may be shorter) | tag (16)
+#
+# A compressed stream has version 2 and one codec byte after the header (it is
+# part of the authenticated header). Its segments hold the compressed bytes,
+# so it can only be read in order, not by random access or in parallel.
+
+STREAM_MAGIC = b'CTKS'
+STREAM_VERSION = 1
+STREAM_VERSION_COMPRESSED = 2
+STREAM_HEADER = struct.Struct('>4sBBI7s')  # magic, version, key size, segment size, nonce prefix
+DEFAULT_SEGMENT_SIZE = 64 * 1024
+MAX_SEGMENTS = 1 << 32
+
+class _ChunkReader:
+    """A minimal file-like read() over an iterator of bytes chunks."""
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._buffer = bytearray()
+
+    def read(self, size):
+        while len(self._buffer) < size:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                break
+            self._buffer += chunk
+        data = bytes(self._buffer[:size])
+        del self._buffer[:size]
+        return data
+
+def as_reader(source):
+    """Accept a file-like object, a bytes-like object or an iterable of bytes chunks."""
+    if hasattr(source, 'read'):
+        return source
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return _ChunkReader([bytes(source)])
+    return _ChunkReader(source)
+
+def read_exact(reader, size):
+    """Read `size` bytes, or fewer only at the end of the input."""
+    data = reader.read(size)
+    while len(data) < size:
+        more = reader.read(size - len(data))
+        if not more:
+            break
+        data += more
+    return data
+
+def read_segments(reader, size):
+    """Yield (segment, is_last) pairs, reading one segment ahead to spot the last one."""
+    current = read_exact(reader, size)
+    while True:
+        following = read_exact(reader, size) if len(current) == size else b''
+        is_last = not following
+        yield current, is_last
+        if is_last:
+            return
+        current = following
+
+def segment_nonce(prefix: bytes, index: int, is_last: bool) -> bytes:
+    """Derive the 12-byte nonce of one stream segment."""
+    if index >= MAX_SEGMENTS:
+        raise ValueError("Stream has too many segments for a 32-bit counter.")
+    return prefix + struct.pack('>I?', index, is_last)
+
+def encrypt_segment(key_bytes, header, prefix, index, is_last, segment) -> bytes:
+    """Encrypt one stream segment, returning its ciphertext followed by its tag."""
+    cipher = AES.new(key_bytes, AES.MODE_GCM, nonce=segment_nonce(prefix, index, is_last))
+    cipher.update(header)
+    ciphertext, tag = cipher.encrypt_and_digest(segment)
+    return ciphertext + tag
+
+def decrypt_segment(key_bytes, header, prefix, index, is_last, sealed) -> bytes:
+    """Verify and decrypt one stream segment (ciphertext followed by tag)."""
+    if len(sealed) < TAG_SIZE:
+        raise ValueError("Stream segment is truncated.")
+    cipher = AES.new(key_bytes, AES.MODE_GCM, nonce=segment_nonce(prefix, index, is_last))
+    cipher.update(header)
+    return cipher.decrypt_and_verify(sealed[:-TAG_SIZE], sealed[-TAG_SIZE:])
+
+def parse_stream_header(header: bytes, allow_compressed: bool = False) -> tuple[int, int, bytes]:
+    """
+    Check a stream header and return (key size, segment size, nonce prefix).
+    Compressed streams are rejected unless `allow_compressed` is set; the
+    caller must then read the codec byte that follows.
+    """
+    if len(header) != STREAM_HEADER.size:
+        raise ValueError("Data is too short to be an AES stream.")
+    magic, version, key_size, segment_size, prefix = STREAM_HEADER.unpack(header)
+    if magic != STREAM_MAGIC:
+        raise ValueError("Data is not an AES stream (bad magic).")
+    if version == STREAM_VERSION_COMPRESSED and not allow_compressed:
+        raise ValueError("Compressed AES streams can only be read in order with aes_stream_decrypt.")
+    if version not in (STREAM_VERSION, STREAM_VERSION_COMPRESSED):
+        raise ValueError(f"Unsupported AES stream version {version}.")
+    if segment_size == 0:
+        raise ValueError("AES stream has an invalid segment size.")
+    return key_size, segment_size, prefix
+
+def _read_chunks(reader, size):
+    """Yield chunks of up to `size` bytes until the reader is exhausted."""
+    while True:
+        chunk = reader.read(size)
+        if not chunk:
+            return
+        yield chunk
+
+def _compress_chunks(chunks, codec):
+    compressor = _compressor(codec)
+    for chunk in chunks:
+        yield compressor.compress(chunk)
+    yield compressor.flush()
+
+def _decompress_chunks(chunks, codec, max_output):
+    """Decompress a sequence of chunks, yielding at most `max_output` bytes at a time."""
+    decompressor = _decompressor(codec)
+    try:
+        for chunk in chunks:
+            if codec == 'zlib':
+                while chunk:
+                    output = decompressor.decompress(chunk, max_output)
+                    chunk = decompressor.unconsumed_tail
+                    if output:
+                        yield output
+            else:
+                output = decompressor.decompress(chunk, max_output)
+                while True:
+                    if output:
+                        yield output
+                    if decompressor.eof or decompressor.needs_input:
+                        break
+                    output = decompressor.decompress(b'', max_output)
+        if codec == 'zlib':
+            output = decompressor.flush()
+            if output:
+                yield output
+    except (zlib.error, lzma.LZMAError, OSError, EOFError) as e:
+        raise ValueError(f"Compressed stream is corrupt: {e}") from e
+    if not decompressor.eof:
+        raise ValueError("Compressed stream is incomplete.")
+
+def aes_stream_encrypt(source, key_bytes: bytes, segment_size: int = DEFAULT_SEGMENT_SIZE,
+                       compression: str = None):
+    """
+    Encrypts a stream of bytes with segmented AES-GCM, in constant memory.
+
+    Args:
+        source: A file-like object, a bytes-like object or an iterable of bytes chunks.
+        key_bytes (bytes): The encryption key (must be 16, 24, or 32 bytes).
+        segment_size (int): Plaintext bytes per segment.
+        compression (str): None, or a codec from CODECS to compress with first.
+            The first segment's worth of input is sampled, and compression is
+            skipped if it is small or does not shrink.
+
+    Yields:
+        bytes: The stream header, then each encrypted segment with its tag.
+    """
+    reader = as_reader(source)
+    prefix = get_random_bytes(7)
+    version, codec_byte = STREAM_VERSION, b''
+    if compression is not None:
+        if compression not in CODEC_IDS:
+            raise ValueError(f"Unknown compression codec '{compression}'. Choose one of {CODECS}.")
+        first = read_exact(reader, max(segment_size, COMPRESS_MIN_SIZE))
+        chunks = itertools.chain([first], _read_chunks(reader, segment_size))
+        if should_compress(first):
+            version, codec_byte = STREAM_VERSION_COMPRESSED, bytes([CODEC_IDS[compression]])
+            chunks = _compress_chunks(chunks, compression)
+        reader = _ChunkReader(chunks)
+
+    header = STREAM_HEADER.pack(STREAM_MAGIC, version, len(key_bytes), segment_size, prefix) + codec_byte
+    yield header
+    for index, (segment, is_last) in enumerate(read_segments(reader, segment_size)):
+        yield encrypt_segment(key_bytes, header, prefix, index, is_last, segment)
+
+def aes_stream_decrypt(source, key_bytes: bytes):
+    """
+    Decrypts a stream made by aes_stream_encrypt, in constant memory.
+    Raises ValueError if any segment fails authentication or the stream is
+    truncated; plaintext already yielded before that point must be discarded.
+
+    Args:
+        source: A file-like object, a bytes-like object or an iterable of bytes chunks.
+        key_bytes (bytes): The same key used for encryption.
+
+    Yields:
+        bytes: The decrypted plaintext, one segment at a time.
+    """
+    reader = as_reader(source)
+    header = read_exact(reader, STREAM_HEADER.size)
+    key_size, segment_size, prefix = parse_stream_header(header, allow_compressed=True)
+    codec = None
+    if header[4] == STREAM_VERSION_COMPRESSED:
+        codec_byte = read_exact(reader, 1)
+        if not codec_byte or codec_byte[0] not in CODEC_NAMES:
+            raise ValueError("AES stream has an unknown compression codec.")
+        codec = CODEC_NAMES[codec_byte[0]]
+        header += codec_byte
+    if key_size != len(key_bytes):
+        raise ValueError(f"Stream was encrypted with a {key_size * 8}-bit key.")
+
+    segments = read_segments(reader, segment_size + TAG_SIZE)
+    plaintext = (decrypt_segment(key_bytes, header, prefix, index, is_last, sealed)
+                 for index, (sealed, is_last) in enumerate(segments))
+    if codec is None:
+        yield from plaintext
+    else:
+        yield from _decompress_chunks(plaintext, codec, segment_size)
+
+class AESStreamReader:
+    """
+    Random access to an encrypted stream stored in a seekable file.
+    Only the segments that cover the requested range are read and verified.
+    """
+
+    def __init__(self, fileobj, key_bytes: bytes):
+        self.fileobj = fileobj
+        self.key_bytes = key_bytes
+        fileobj.seek(0)
+        self.header = read_exact(fileobj, STREAM_HEADER.size)
+        key_size, self.segment_size, self.prefix = parse_stream_header(self.header)
+        if key_size != len(key_bytes):
+            raise ValueError(f"Stream was encrypted with a {key_size * 8}-bit key.")
+
+        body_size = fileobj.seek(0, 2) - STREAM_HEADER.size
+        sealed_size = self.segment_size + TAG_SIZE
+        self.segment_count = max(1, -(-body_size // sealed_size))
+        last_sealed = body_size - (self.segment_count - 1) * sealed_size
+        if last_sealed < TAG_SIZE:
+            raise ValueError("AES stream is truncated.")
+        self.plaintext_size = (self.segment_count - 1) * self.segment_size + last_sealed - TAG_SIZE
+
+    def read_segment(self, index: int) -> bytes:
+        """Verify and decrypt a single segment by its index."""
+        if not 0 <= index < self.segment_count:
+            raise IndexError("Segment index out of range.")
+        sealed_size = self.segment_size + TAG_SIZE
+        self.fileobj.seek(STREAM_HEADER.size + index * sealed_size)
+        sealed = read_exact(self.fileobj, sealed_size)
+        return decrypt_segment(self.key_bytes, self.header, self.prefix, index,
+                               index == self.segment_count - 1, sealed)
+
+    def read_at(self, offset: int, size: int) -> bytes:
+        """Return `size` plaintext bytes starting at plaintext `offset`."""
+        end = min(offset + size, self.plaintext_size)
+        if offset >= end:
+            return b''
+        first, last = offset // self.segment_size, (end - 1) // self.segment_size
+        data = b''.join(self.read_segment(i) for i in range(first, last + 1))
+        start = offset - first * self.segment_size
+        return data[start:start + end - offset]
+
+# --- Reusable Context for Many Small Messages ---
+# aes_encrypt validates the key, draws a random nonce from the OS and builds a
+# header for every message. AESContext does that work once per key and hands
+# out nonces from a counter, so a batch of records only pays for the
+# per-message GCM setup inside pycryptodome, which its public API does not
+# let us share between messages.
+
+class NonceGenerator:
+    """
+    Unique 12-byte GCM nonces: a random 8-byte prefix followed by a 32-bit
+    counter. When the counter runs out a new random prefix is drawn.
+
+    Every prefix a generator uses is recorded for the life of the process, so
+    two generators in one process never share one; passing a prefix that is
+    already in use raises ValueError. Across processes, 64 random bits make a
+    repeat unlikely until about 2**32 generators have been created.
+    """
+
+    PREFIX_SIZE = 8
+    COUNTER_LIMIT = 1 << 32
+    _prefixes_in_use = set()
+    _registry_lock = threading.Lock()
+
+    def __init__(self, prefix: bytes = None):
+        if prefix is not None and len(prefix) != self.PREFIX_SIZE:
+            raise ValueError(f"Nonce prefix must be {self.PREFIX_SIZE} bytes long.")
+        self._lock = threading.Lock()
+        self._claim_prefix(prefix)
+
+    def _claim_prefix(self, prefix: bytes = None) -> None:
+        """Switch to a prefix no other generator in this process has used (random if None)."""
+        with NonceGenerator._registry_lock:
+            if prefix is None:
+                prefix = get_random_bytes(self.PREFIX_SIZE)
+                while prefix in NonceGenerator._prefixes_in_use:
+                    prefix = get_random_bytes(self.PREFIX_SIZE)
+            elif prefix in NonceGenerator._prefixes_in_use:
+                raise ValueError("Nonce prefix is already in use; reusing it would repeat GCM nonces.")
+            NonceGenerator._prefixes_in_use.add(prefix)
+        self.prefix = prefix
+        self._prefix_value = int.from_bytes(prefix, 'big') << 32
+        self._counter = 0
+
+    def next(self) -> bytes:
+        """Return the next nonce."""
+        return self.take(1)[0]
+
+    def take(self, count: int) -> list[bytes]:
+        """Return the next `count` nonces."""
+        nonces = []
+        # The lock makes reading and advancing the counter one step, also without a GIL
+        with self._lock:
+            while len(nonces) < count:
+                if self._counter == self.COUNTER_LIMIT:
+                    self._claim_prefix()
+                n = min(count - len(nonces), self.COUNTER_LIMIT - self._counter)
+                start = self._prefix_value | self._counter
+                self._counter += n
+                nonces.extend((start + i).to_bytes(NONCE_SIZE, 'big') for i in range(n))
+        return nonces
+
+class AESContext:
+    """
+    Prepared AES-GCM state for encrypting many records under one key.
+    Records are sealed into the same binary container as aes_encrypt_bytes,
+    so aes_decrypt_bytes can open them and vice versa.
+    """
+
+    def __init__(self, key_bytes: bytes, nonces: NonceGenerator = None):
+        if len(key_bytes) not in (16, 24, 32):
+            raise ValueError("AES key must be 16, 24, or 32 bytes long.")
+        self.key_bytes = bytes(key_bytes)
+        self.header = build_header(len(key_bytes))
+        self.nonces = nonces or NonceGenerator()
+
+    def encrypt(self, data: bytes) -> bytes:
+        """Seal one record into a container."""
+        return self.encrypt_many([data])[0]
+
+    def decrypt(self, blob: bytes) -> bytes:
+        """Open one container. Raises ValueError if authentication fails."""
+        return self.decrypt_many([blob])[0]
+
+    def encrypt_many(self, records) -> list[bytes]:
+        """
+        Seal a list of records, one container per record.
+
+        Args:
+            records (list[bytes]): The plaintext records.
+
+        Returns:
+            list[bytes]: The containers, in the same order.
+        """
+        records = list(records)
+        key, header, new = self.key_bytes, self.header, AES.new
+        output = []
+        for data, nonce in zip(records, self.nonces.take(len(records))):
+            cipher = new(key, AES.MODE_GCM, nonce=nonce)
+            cipher.update(header)
+            ciphertext, tag = cipher.encrypt_and_digest(data)
+            output.append(header + nonce + ciphertext + tag)
+        return output
+
+    def decrypt_many(self, blobs) -> list[bytes]:
+        """
+        Open a list of containers made under this key.
+        Raises ValueError on the first container that is malformed or fails
+        authentication.
+
+        Returns:
+            list[bytes]: The plaintext records, in the same order.
+        """
+        key, header, new = self.key_bytes, self.header, AES.new
+        header_size, nonce_end = HEADER.size, HEADER.size + NONCE_SIZE
+        output = []
+        for blob in blobs:
+            if blob[:header_size] != header or len(blob) < nonce_end + TAG_SIZE:
+                # Not in this context's exact format (e.g. another mode or a KDF section): take the general path
+                output.append(aes_decrypt_bytes(blob, key))
+                continue
+            cipher = new(key, AES.MODE_GCM, nonce=blob[header_size:nonce_end])
+            cipher.update(header)
+            output.append(cipher.decrypt_and_verify(blob[nonce_end:-TAG_SIZE], blob[-TAG_SIZE:]))
+        return output
@@ -0,0 +1,257 @@
+# ciphers/aes_core.py
+# An in-repo AES block cipher in NumPy, so the rounds can be shown step by step.
+# ciphers/aes.py still uses pycryptodome for real encryption; this engine is
+# for the visualizer and for measuring how close NumPy gets to a C library.
+#
+# The state of each block is held as four 32-bit big-endian columns. One round
+# of SubBytes + ShiftRows + MixColumns is folded into four 256-entry T-tables,
+# so a round is 16 table lookups and XORs per block, done for every block at
+# once with NumPy gathers. The last round has no MixColumns and uses the S-box.
+# Decryption uses the "equivalent inverse cipher" from FIPS-197, which has the
+# same shape with inverse tables and transformed round keys.
+
+import sys
+
+import numpy as np
+
+BLOCK_SIZE = 16
+ROUNDS = {16: 10, 24: 12, 32: 14}
+CHUNK_BLOCKS = 16384  # Blocks per pass; keeps the working arrays in cache
+# Where each row's byte sits inside a native uint32 column (row 0 is the high byte)
+_ROW_BYTES = (3, 2, 1, 0) if sys.byteorder == 'little' else (0, 1, 2, 3)
+
+# --- Tables ---
+
+def _xtime(a: int) -> int:
+    """Multiply by x (i.e. by 2) in GF(2^8) with the AES polynomial."""
+    a <<= 1
+    return a ^ 0x11B if a & 0x100 else a
+
+def _gmul(a: int, b: int) -> int:
+    """Multiply two bytes in GF(2^8)."""
+    result = 0
+    while b:
+        if b & 1:
+            result ^= a
+        a = _xtime(a)
+        b >>= 1
+    return result
+
+def _build_sboxes():
+    """The S-box is the multiplicative inverse in GF(2^8) followed by an affine map."""
+    sbox = [0] * 256
+    for x in range(256):
+        inverse = next((y for y in range(1, 256) if _gmul(x, y) == 1), 0)
+        value = inverse
+        for shift in range(1, 5):
+            value ^= ((inverse << shift) | (inverse >> (8 - shift))) & 0xFF
+        sbox[x] = value ^ 0x63
+    inv_sbox = [0] * 256
+    for x, y in enumerate(sbox):
+        inv_sbox[y] = x
+    return sbox, inv_sbox
+
+def _build_t_tables(box, coefficients):
+    """
+    T[0][x] is the column that MixColumns (or InvMixColumns) makes from
+    box[x] in row 0; T[1..3] are the same column rotated by 8, 16, 24 bits.
+    """
+    tables = np.zeros((4, 256), dtype=np.uint32)
+    for x in range(256):
+        y = box[x]
+        column = 0
+        for c in coefficients:
+            column = (column << 8) | _gmul(y, c)
+        for i in range(4):
+            tables[i, x] = ((column >> (8 * i)) | (column << (32 - 8 * i))) & 0xFFFFFFFF
+    return tables
+
+_SBOX_LIST, _INV_SBOX_LIST = _build_sboxes()
+SBOX = np.array(_SBOX_LIST, dtype=np.uint8)
+INV_SBOX = np.array(_INV_SBOX_LIST, dtype=np.uint8)
+TE = _build_t_tables(_SBOX_LIST, (2, 1, 1, 3))
+TD = _build_t_tables(_INV_SBOX_LIST, (14, 9, 13, 11))
+_SBOX32 = SBOX.astype(np.uint32)
+_INV_SBOX32 = INV_SBOX.astype(np.uint32)
+
+# --- Key Schedule ---
+
+def expand_key(key_bytes: bytes) -> np.ndarray:
+    """
+    Expands a 16-, 24- or 32-byte key into the encryption round keys.
+
+    Returns:
+        np.ndarray: A (rounds + 1, 4) uint32 array, one row of columns per round.
+    """
+    if len(key_bytes) not in ROUNDS:
+        raise ValueError("AES key must be 16, 24, or 32 bytes long.")
+    nk = len(key_bytes) // 4
+    words = [int.from_bytes(key_bytes[4 * i:4 * i + 4], 'big') for i in range(nk)]
+    rcon = 1
+    for i in range(nk, 4 * (ROUNDS[len(key_bytes)] + 1)):
+        word = words[-1]
+        if i % nk == 0:
+            word = ((word << 8) | (word >> 24)) & 0xFFFFFFFF
+            word = int.from_bytes(bytes(_SBOX_LIST[b] for b in word.to_bytes(4, 'big')), 'big') ^ (rcon << 24)
+            rcon = _xtime(rcon)
+        elif nk > 6 and i % nk == 4:
+            word = int.from_bytes(bytes(_SBOX_LIST[b] for b in word.to_bytes(4, 'big')), 'big')
+        words.append(words[i - nk] ^ word)
+    return np.array(words, dtype=np.uint32).reshape(-1, 4)
+
+def decryption_round_keys(encrypt_keys: np.ndarray) -> np.ndarray:
+    """
+    The round keys for the equivalent inverse cipher: the encryption keys in
+    reverse order, with InvMixColumns applied to all but the first and last.
+    """
+    keys = encrypt_keys[::-1].copy()
+    middle = keys[1:-1]
+    # InvMixColumns(k) == TD lookups of SBOX[k], since TD undoes the S-box first
+    keys[1:-1] = (TD[0][SBOX[middle >> 24]] ^ TD[1][SBOX[(middle >> 16) & 0xFF]]
+                  ^ TD[2][SBOX[(middle >> 8) & 0xFF]] ^ TD[3][SBOX[middle & 0xFF]])
+    return keys
+
+# --- Round Trace ---
+
+def sub_bytes(state: np.ndarray) -> np.ndarray:
+    return SBOX[state]
+
+def shift_rows(state: np.ndarray) -> np.ndarray:
+    """Row r of the 4x4 state moves r places to the left."""
+    return np.array([np.roll(state[r], -r) for r in range(4)], dtype=np.uint8)
+
+def mix_columns(state: np.ndarray) -> np.ndarray:
+    """Multiply each column by the MixColumns matrix in GF(2^8)."""
+    matrix = ((2, 3, 1, 1), (1, 2, 3, 1), (1, 1, 2, 3), (3, 1, 1, 2))
+    mixed = np.zeros((4, 4), dtype=np.uint8)
+    for c in range(4):
+        for r in range(4):
+            value = 0
+            for k in range(4):
+                value ^= _gmul(int(state[k, c]), matrix[r][k])
+            mixed[r, c] = value
+    return mixed
+
+def words_to_state(words) -> np.ndarray:
+    """Four 32-bit columns to the 4x4 byte state (state[row, column])."""
+    return np.array(words, dtype='>u4').view(np.uint8).reshape(4, 4).T.copy()
+
+class AESRoundTrace:
+    """
+    Captures the state of one block through every encryption round.
+    The T-table engine fuses SubBytes, ShiftRows and MixColumns, so the
+    separate steps are recomputed here from the state entering each round;
+    the state after AddRoundKey is the engine's own value.
+    Each entry of `rounds` maps 'round', 'start', 'sub_bytes', 'shift_rows',
+    'mix_columns' (None in the last round), 'round_key' and 'end' to 4x4 states.
+    """
+
+    def __init__(self, block_index: int = 0):
+        self.block_index = block_index
+        self.rounds = []
+
+    def record_round(self, round_number: int, state_words, round_key_words, is_last: bool = False) -> None:
+        end = words_to_state(state_words)
+        round_key = words_to_state(round_key_words)
+        if round_number == 0:
+            self.rounds.append({'round': 0, 'start': end ^ round_key, 'sub_bytes': None, 'shift_rows': None,
+                                'mix_columns': None, 'round_key': round_key, 'end': end})
+            return
+        start = self.rounds[-1]['end']
+        substituted = sub_bytes(start)
+        shifted = shift_rows(substituted)
+        mixed = None if is_last else mix_columns(shifted)
+        self.rounds.append({'round': round_number, 'start': start, 'sub_bytes': substituted,
+                            'shift_rows': shifted, 'mix_columns': mixed, 'round_key': round_key, 'end': end})
+
+    def hex_rows(self) -> list[dict]:
+        """One row per round with every state as a 32-digit hex string, for display."""
+        steps = ('start', 'sub_bytes', 'shift_rows', 'mix_columns', 'round_key', 'end')
+        return [{'Round': r['round'],
+                 **{name: '' if r[name] is None else r[name].T.tobytes().hex() for name in steps}}
+                for r in self.rounds]
+
+# --- Block Engine ---
+
+def _as_words(blocks) -> np.ndarray:
+    """Bytes or a (n, 16) uint8 array to a (n, 4) uint32 array of columns."""
+    if isinstance(blocks, np.ndarray):
+        data = np.ascontiguousarray(blocks, dtype=np.uint8).reshape(-1)
+    else:
+        data = np.frombuffer(blocks, dtype=np.uint8)
+    if data.size % BLOCK_SIZE:
+        raise ValueError("Data must be a whole number of 16-byte blocks.")
+    return data.view('>u4').astype(np.uint32).reshape(-1, 4)
+
+def _rounds(state, round_keys, tables, box, shifts, trace=None, row=0):
+    """
+    Run every round on (n, 4) column words. `shifts` says which column feeds
+    rows 1-3 of each output column: 1, 2, 3 for encryption (ShiftRows) and
+    3, 2, 1 for decryption (InvShiftRows). If `trace` is given, the block at
+    `row` is reported to it after every round.
+    """
+    t0, t1, t2, t3 = tables
+    columns = [[(c + s) % 4 for c in range(4)] for s in shifts]
+    row0, row1, row2, row3 = _ROW_BYTES
+    state = state ^ round_keys[0]
+    if trace is not None:
+        trace.record_round(0, state[row], round_keys[0])
+    for r in range(1, len(round_keys)):
+        # Gather the row bytes straight from a byte view; the column lists do the (Inv)ShiftRows
+        view = state.view(np.uint8).reshape(-1, 4, 4)
+        a = view[:, :, row0]
+        b = view[:, columns[0], row1]
+        c = view[:, columns[1], row2]
+        d = view[:, columns[2], row3]
+        is_last = r == len(round_keys) - 1
+        if not is_last:
+            state = t0[a] ^ t1[b] ^ t2[c] ^ t3[d] ^ round_keys[r]
+        else:
+            state = (box[a] << 24 | box[b] << 16 | box[c] << 8 | box[d]) ^ round_keys[r]
+        if trace is not None:
+            trace.record_round(r, state[row], round_keys[r], is_last)
+    return state
+
+def _crypt(blocks, round_keys, tables, box, shifts, trace=None) -> np.ndarray:
+    words = _as_words(blocks)
+    output = np.empty_like(words)
+    for start in range(0, len(words), CHUNK_BLOCKS):
+        row = trace.block_index - start if trace is not None else -1
+        chunk_trace = trace if 0 <= row < CHUNK_BLOCKS else None
+        output[start:start + CHUNK_BLOCKS] = _rounds(words[start:start + CHUNK_BLOCKS],
+                                                     round_keys, tables, box, shifts, chunk_trace, row)
+    return output.astype('>u4').view(np.uint8).reshape(-1, BLOCK_SIZE)
+
+def encrypt_blocks(blocks, key_bytes: bytes, trace: AESRoundTrace = None) -> np.ndarray:
+    """
+    Encrypts whole 16-byte blocks (ECB, no padding) with the T-table engine.
+
+    Args:
+        blocks: Bytes (a multiple of 16 long) or a (n, 16) uint8 array.
+        key_bytes (bytes): The 16-, 24- or 32-byte key.
+        trace (AESRoundTrace): Optional; captures the rounds of one block.
+
+    Returns:
+        np.ndarray: The (n, 16) uint8 ciphertext blocks.
+    """
+    return _crypt(blocks, expand_key(key_bytes), TE, _SBOX32, (1, 2, 3), trace)
+
+def decrypt_blocks(blocks, key_bytes: bytes) -> np.ndarray:
+    """Decrypts whole 16-byte blocks made by encrypt_blocks."""
+    round_keys = decryption_round_keys(expand_key(key_bytes))
+    return _crypt(blocks, round_keys, TD, _INV_SBOX32, (3, 2, 1))
+
+def ctr_crypt(data: bytes, key_bytes: bytes, nonce: bytes, initial_value: int = 0) -> bytes:
+    """
+    CTR mode with an 8-byte nonce and a 64-bit big-endian block counter,
+    the same layout as pycryptodome's AES.MODE_CTR with an 8-byte nonce.
+    Encryption and decryption are the same operation.
+    """
+    if len(nonce) != 8:
+        raise ValueError("CTR nonce must be 8 bytes long.")
+    n_blocks = -(-len(data) // BLOCK_SIZE)
+    counters = np.empty((n_blocks, 2), dtype='>u8')
+    counters[:, 0] = int.from_bytes(nonce, 'big')
+    counters[:, 1] = np.arange(initial_value, initial_value + n_blocks, dtype=np.uint64)
+    keystream = encrypt_blocks(counters.view(np.uint8), key_bytes).reshape(-1)[:len(data)]
+    return (np.frombuffer(data, dtype=np.uint8) ^ keystream).tobytes()
@@ -0,0 +1,80 @@
+# ciphers/aes_parallel.py
+# Multi-core driver for the segmented (streaming) AES-GCM format in ciphers/aes.py.
+# Every segment is authenticated on its own, so segments can be encrypted or
+# decrypted on different cores. Results are written back in order through a
+# bounded reorder buffer, which also caps memory use at a few segments per worker.
+# The output is byte-for-byte the same format as aes_stream_encrypt.
+
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from Crypto.Random import get_random_bytes
+
+from ciphers import aes
+
+def _make_pool(workers, use_processes):
+    # pycryptodome releases the GIL while it encrypts, so threads already scale;
+    # processes avoid the GIL entirely at the cost of copying each segment
+    return ProcessPoolExecutor(workers) if use_processes else ThreadPoolExecutor(workers)
+
+def _ordered_results(pool, tasks, max_pending):
+    """
+    Submit (function, args) tasks and yield their results in submission order.
+    At most `max_pending` tasks are in flight or waiting to be written.
+    """
+    pending = deque()
+    for func, args in tasks:
+        pending.append(pool.submit(func, *args))
+        if len(pending) >= max_pending:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+def aes_parallel_encrypt(source, key_bytes: bytes, segment_size: int = aes.DEFAULT_SEGMENT_SIZE,
+                         workers: int = None, use_processes: bool = False):
+    """
+    Encrypts a stream with segmented AES-GCM, spreading segments across workers.
+
+    Args:
+        source: A file-like object, a bytes-like object or an iterable of bytes chunks.
+        key_bytes (bytes): The encryption key (must be 16, 24, or 32 bytes).
+        segment_size (int): Plaintext bytes per segment.
+        workers (int): Number of threads (or processes); defaults to the CPU count.
+        use_processes (bool): Use a process pool instead of a thread pool.
+
+    Yields:
+        bytes: The stream header, then each encrypted segment in order.
+    """
+    workers = workers or os.cpu_count() or 1
+    prefix = get_random_bytes(7)
+    header = aes.STREAM_HEADER.pack(aes.STREAM_MAGIC, aes.STREAM_VERSION, len(key_bytes), segment_size, prefix)
+    yield header
+
+    segments = aes.read_segments(aes.as_reader(source), segment_size)
+    tasks = ((aes.encrypt_segment, (key_bytes, header, prefix, index, is_last, segment))
+             for index, (segment, is_last) in enumerate(segments))
+    with _make_pool(workers, use_processes) as pool:
+        yield from _ordered_results(pool, tasks, workers * 4)
+
+def aes_parallel_decrypt(source, key_bytes: bytes, workers: int = None, use_processes: bool = False):
+    """
+    Decrypts a stream made by aes_stream_encrypt or aes_parallel_encrypt,
+    spreading segments across workers. Raises ValueError if any segment
+    fails authentication.
+
+    Yields:
+        bytes: The decrypted plaintext, one segment at a time, in order.
+    """
+    workers = workers or os.cpu_count() or 1
+    reader = aes.as_reader(source)
+    header = aes.read_exact(reader, aes.STREAM_HEADER.size)
+    key_size, segment_size, prefix = aes.parse_stream_header(header)
+    if key_size != len(key_bytes):
+        raise ValueError(f"Stream was encrypted with a {key_size * 8}-bit key.")
+
+    segments = aes.read_segments(reader, segment_size + aes.TAG_SIZE)
+    tasks = ((aes.decrypt_segment, (key_bytes, header, prefix, index, is_last, sealed))
+             for index, (sealed, is_last) in enumerate(segments))
+    with _make_pool(workers, use_processes) as pool:
+        yield from _ordered_results(pool, tasks, workers * 4)
@@ -1,6 +1,12 @@
 # A from-scratch implementation of the DES algorithm for educational purposes.
 # This code operates on 8-character (64-bit) ASCII blocks.
 
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import cached_property, lru_cache
+
+import numpy as np
+
 # --- DES Constants (Permutation Tables) ---
 
 # Initial Permutation (IP)
@@ -201,10 +207,521 @@ def f_function(right_half, round_key):
     final_32_bits = permute(s_box_output, P_BOX)
     return final_32_bits
 
-def des_process(input_text, key_text, mode='encrypt'):
+# --- Integer Engine ---
+# The functions above follow the textbook description bit by bit, which makes
+# them easy to read but slow: every step allocates new lists of 0/1 ints.
+# The engine below computes exactly the same cipher on Python integers.
+# Each permutation is split into one lookup table per input byte, and each
+# S-box is fused with the P-box into a single "SP" table of 32-bit words,
+# so one round becomes a few table lookups, shifts and XORs.
+
+def _bits_to_int(bits):
+    """Convert a list of bits (most significant first) to an integer."""
+    value = 0
+    for bit in bits:
+        value = (value << 1) | bit
+    return value
+
+def _int_to_bits(value, width):
+    """Convert an integer to a list of `width` bits (most significant first)."""
+    return [(value >> (width - 1 - i)) & 1 for i in range(width)]
+
+def _build_byte_tables(table, in_width):
+    """
+    Split a permutation table into per-byte lookup tables.
+    Entry [i][v] is the output word produced when input byte i has value v
+    and every other input bit is zero, so a full permutation is the OR of
+    one lookup per input byte.
+    """
+    tables = []
+    for i in range(in_width // 8):
+        byte_table = []
+        for value in range(256):
+            bits = [0] * in_width
+            bits[i * 8:(i + 1) * 8] = _int_to_bits(value, 8)
+            byte_table.append(_bits_to_int(permute(bits, table)))
+        tables.append(tuple(byte_table))
+    return tuple(tables)
+
+def _build_sp_tables():
+    """
+    Fuse each S-box with the P-box.
+    Entry [i][v] is the 32-bit P-box output produced by S-box i receiving the
+    6-bit input v (with every other S-box output zero).
+    """
+    tables = []
+    for i, s_box in enumerate(S_BOXES):
+        sp_table = []
+        for value in range(64):
+            row = ((value >> 4) & 2) | (value & 1)
+            col = (value >> 1) & 0xF
+            bits = [0] * 32
+            bits[i * 4:(i + 1) * 4] = _int_to_bits(s_box[row][col], 4)
+            sp_table.append(_bits_to_int(permute(bits, P_BOX)))
+        tables.append(tuple(sp_table))
+    return tuple(tables)
+
+IP_TABLES = _build_byte_tables(IP, 64)
+FP_TABLES = _build_byte_tables(FP, 64)
+E_TABLES = _build_byte_tables(E_BOX, 32)
+SP_TABLES = _build_sp_tables()
+
+def generate_round_keys_int(key_bytes: bytes) -> list[int]:
+    """Generate the 16 round keys for an 8-byte key as 48-bit integers."""
+    key_bits = _int_to_bits(int.from_bytes(key_bytes, 'big'), 64)
+    return [_bits_to_int(key) for key in generate_round_keys(key_bits)]
+
+class DESKeySchedule:
+    """
+    The 16 round keys of one DES key, computed once and shared.
+    Use DESKeySchedule.for_key() to reuse schedules from the LRU cache.
+    """
+
+    def __init__(self, key: bytes):
+        if len(key) != 8:
+            raise ValueError("Key must be exactly 8 bytes long (64 bits).")
+        self.key = bytes(key)
+        self.encrypt_keys = tuple(generate_round_keys_int(self.key))
+        # For decryption, the round keys are used in reverse order
+        self.decrypt_keys = self.encrypt_keys[::-1]
+
+    @classmethod
+    def for_key(cls, key: bytes) -> 'DESKeySchedule':
+        """Return the (possibly cached) schedule for an 8-byte key."""
+        return _cached_key_schedule(bytes(key))
+
+    def round_keys(self, mode: str = 'encrypt') -> tuple[int, ...]:
+        """The round keys in the order needed for 'encrypt' or 'decrypt'."""
+        return self.decrypt_keys if mode == 'decrypt' else self.encrypt_keys
+
+    @cached_property
+    def hex_keys(self) -> tuple[str, ...]:
+        """The round keys in original order as 12-digit hex strings, for display."""
+        # A tuple, since the schedule (and so this value) is shared through the LRU cache
+        return tuple(f'{key:012x}' for key in self.encrypt_keys)  # 48 bits = 12 hex chars
+
+@lru_cache(maxsize=128)
+def _cached_key_schedule(key: bytes) -> DESKeySchedule:
+    return DESKeySchedule(key)
+
+class TripleDESKeySchedule:
+    """
+    Triple-DES (EDE) round keys: encrypt with K1, decrypt with K2, encrypt with K3.
+    A 16-byte key is EDE2 (K3 = K1); a 24-byte key is EDE3.
+    The 48 round keys form one flat sequence, and decryption is simply that
+    sequence reversed, so every DES engine and mode runs Triple-DES unchanged.
+    """
+
+    def __init__(self, key: bytes):
+        if len(key) not in (16, 24):
+            raise ValueError("Triple-DES key must be 16 (EDE2) or 24 (EDE3) bytes long.")
+        self.key = bytes(key)
+        k1, k2, k3 = self.key[:8], self.key[8:16], self.key[16:24] or self.key[:8]
+        self.encrypt_keys = (DESKeySchedule.for_key(k1).encrypt_keys +
+                             DESKeySchedule.for_key(k2).decrypt_keys +
+                             DESKeySchedule.for_key(k3).encrypt_keys)
+        self.decrypt_keys = self.encrypt_keys[::-1]
+
+    @classmethod
+    def for_key(cls, key: bytes) -> 'TripleDESKeySchedule':
+        """Return the (possibly cached) schedule for a 16- or 24-byte key."""
+        return _cached_triple_key_schedule(bytes(key))
+
+    def round_keys(self, mode: str = 'encrypt') -> tuple[int, ...]:
+        """The round keys in the order needed for 'encrypt' or 'decrypt'."""
+        return self.decrypt_keys if mode == 'decrypt' else self.encrypt_keys
+
+@lru_cache(maxsize=128)
+def _cached_triple_key_schedule(key: bytes) -> TripleDESKeySchedule:
+    return TripleDESKeySchedule(key)
+
+def des_crypt_block(block: int, round_keys) -> int:
+    """
+    Run one 64-bit block (as an integer) through IP, the 16 Feistel rounds
+    and FP. Pass the round keys in reverse order to decrypt.
+    More than 16 round keys are applied as consecutive DES stages.
+    """
+    ip0, ip1, ip2, ip3, ip4, ip5, ip6, ip7 = IP_TABLES
+    e0, e1, e2, e3 = E_TABLES
+    sp0, sp1, sp2, sp3, sp4, sp5, sp6, sp7 = SP_TABLES
+
+    # 1. Initial Permutation (IP)
+    block = (ip0[block >> 56] | ip1[(block >> 48) & 0xFF] |
+             ip2[(block >> 40) & 0xFF] | ip3[(block >> 32) & 0xFF] |
+             ip4[(block >> 24) & 0xFF] | ip5[(block >> 16) & 0xFF] |
+             ip6[(block >> 8) & 0xFF] | ip7[block & 0xFF])
+    left = block >> 32
+    right = block & 0xFFFFFFFF
+
+    # 2. 16 Rounds per stage: expansion, key mixing, then the fused S-box/P-box lookups
+    for stage in range(0, len(round_keys), 16):
+        for round_key in round_keys[stage:stage + 16]:
+            x = (e0[right >> 24] | e1[(right >> 16) & 0xFF] |
+                 e2[(right >> 8) & 0xFF] | e3[right & 0xFF]) ^ round_key
+            left, right = right, left ^ (
+                sp0[x >> 42] | sp1[(x >> 36) & 0x3F] | sp2[(x >> 30) & 0x3F] |
+                sp3[(x >> 24) & 0x3F] | sp4[(x >> 18) & 0x3F] |
+                sp5[(x >> 12) & 0x3F] | sp6[(x >> 6) & 0x3F] | sp7[x & 0x3F])
+        # Final Swap. FP followed by the next stage's IP is the identity,
+        # so chained stages (Triple-DES) only need this swap in between.
+        left, right = right, left
+
+    # 3. Final Permutation (FP)
+    block = (left << 32) | right
+    fp0, fp1, fp2, fp3, fp4, fp5, fp6, fp7 = FP_TABLES
+    return (fp0[block >> 56] | fp1[(block >> 48) & 0xFF] |
+            fp2[(block >> 40) & 0xFF] | fp3[(block >> 32) & 0xFF] |
+            fp4[(block >> 24) & 0xFF] | fp5[(block >> 16) & 0xFF] |
+            fp6[(block >> 8) & 0xFF] | fp7[block & 0xFF])
+
+def des_crypt_bytes(data: bytes, round_keys) -> bytes:
+    """
+    Encrypt or decrypt a byte string block by block (ECB, no padding).
+    Large inputs are handed to the vectorized NumPy engine.
+    """
+    if len(data) % 8 != 0:
+        raise ValueError("Data length must be a multiple of 8 bytes.")
+    if len(data) // 8 >= VECTOR_MIN_BLOCKS:
+        blocks = np.frombuffer(data, dtype='>u8').astype(np.uint64)
+        return des_crypt_array(blocks, round_keys).astype('>u8').tobytes()
+    output = bytearray(len(data))
+    for i in range(0, len(data), 8):
+        block = int.from_bytes(data[i:i + 8], 'big')
+        output[i:i + 8] = des_crypt_block(block, round_keys).to_bytes(8, 'big')
+    return bytes(output)
+
+# --- Vectorized NumPy Engine ---
+# The same table-driven rounds, applied to a whole array of blocks at once:
+# every table lookup becomes a NumPy gather over all blocks, so the Python
+# loop runs 16 times per call instead of 16 times per block.
+# Below VECTOR_MIN_BLOCKS the fixed cost of the array operations is larger
+# than the work saved (see benchmarks/des_vectorized.py for the crossover).
+
+VECTOR_MIN_BLOCKS = 32
+VECTOR_CHUNK_BLOCKS = 8192  # Keeps the temporary arrays small enough to stay in cache
+
+IP_ARRAYS = np.array(IP_TABLES, dtype=np.uint64)
+FP_ARRAYS = np.array(FP_TABLES, dtype=np.uint64)
+E_ARRAYS = np.array(E_TABLES, dtype=np.int64)
+SP_ARRAYS = np.array(SP_TABLES, dtype=np.int64)
+PC1_ARRAYS = np.array(_build_byte_tables(PC_1, 64), dtype=np.int64)
+PC2_ARRAYS = np.array(_build_byte_tables(PC_2, 56), dtype=np.int64)
+
+def _permute_array(blocks, tables):
+    """Apply a 64-bit byte-wise permutation table set to an array of blocks."""
+    columns = blocks.astype('>u8').view(np.uint8).reshape(-1, 8)
+    result = tables[0][columns[:, 0]]
+    for i in range(1, 8):
+        result |= tables[i][columns[:, i]]
+    return result
+
+def des_crypt_array(blocks: np.ndarray, round_keys) -> np.ndarray:
+    """
+    Encrypt or decrypt an (n_blocks,) uint64 array in one pass.
+    `round_keys` holds 16 keys per stage, either one integer per round (shared
+    by every block) or one (n_blocks,) array per round (a different key per block).
+    """
+    blocks = np.asarray(blocks, dtype=np.uint64)
+    if len(blocks) > VECTOR_CHUNK_BLOCKS and np.ndim(round_keys) == 1:
+        return np.concatenate([des_crypt_array(blocks[i:i + VECTOR_CHUNK_BLOCKS], round_keys)
+                               for i in range(0, len(blocks), VECTOR_CHUNK_BLOCKS)])
+
+    e0, e1, e2, e3 = E_ARRAYS
+    sp0, sp1, sp2, sp3, sp4, sp5, sp6, sp7 = SP_ARRAYS
+
+    block = _permute_array(blocks, IP_ARRAYS)
+    # Halves and round keys fit in 48 bits, so the rounds run on int64,
+    # which NumPy can use directly as gather indices
+    left = (block >> np.uint64(32)).astype(np.int64)
+    right = (block & np.uint64(0xFFFFFFFF)).astype(np.int64)
+
+    for stage in range(0, len(round_keys), 16):
+        for round_key in round_keys[stage:stage + 16]:
+            x = (e0[right >> 24] | e1[(right >> 16) & 0xFF] |
+                 e2[(right >> 8) & 0xFF] | e3[right & 0xFF]) ^ round_key
+            left, right = right, left ^ (
+                sp0[x >> 42] | sp1[(x >> 36) & 0x3F] | sp2[(x >> 30) & 0x3F] |
+                sp3[(x >> 24) & 0x3F] | sp4[(x >> 18) & 0x3F] |
+                sp5[(x >> 12) & 0x3F] | sp6[(x >> 6) & 0x3F] | sp7[x & 0x3F])
+        left, right = right, left
+
+    block = (left.astype(np.uint64) << np.uint64(32)) | right.astype(np.uint64)
+    return _permute_array(block, FP_ARRAYS)
+
+def generate_round_keys_array(keys: np.ndarray) -> np.ndarray:
+    """
+    Generate the round keys for many 64-bit keys at once.
+    Returns a (16, n_keys) int64 array, ready to pass to des_crypt_array
+    so that each block is processed under its own key.
+    """
+    keys = np.asarray(keys, dtype=np.uint64)
+    cd = _permute_array(keys, PC1_ARRAYS)
+    c = cd >> 28
+    d = cd & 0xFFFFFFF
+    round_keys = np.empty((16, len(keys)), dtype=np.int64)
+    for i, shift in enumerate(SHIFT_SCHEDULE):
+        c = ((c << shift) | (c >> (28 - shift))) & 0xFFFFFFF
+        d = ((d << shift) | (d >> (28 - shift))) & 0xFFFFFFF
+        cd = (c << 28) | d
+        round_keys[i] = (PC2_ARRAYS[0][cd >> 48] | PC2_ARRAYS[1][(cd >> 40) & 0xFF] |
+                         PC2_ARRAYS[2][(cd >> 32) & 0xFF] | PC2_ARRAYS[3][(cd >> 24) & 0xFF] |
+                         PC2_ARRAYS[4][(cd >> 16) & 0xFF] | PC2_ARRAYS[5][(cd >> 8) & 0xFF] |
+                         PC2_ARRAYS[6][cd & 0xFF])
+    return round_keys
+
+# --- Modes of Operation (bytes in, bytes out) ---
+# des_process works on text and pads with spaces. The functions below work on
+# raw bytes with PKCS#7 padding, so any payload round-trips exactly.
+# The IV (CBC) or nonce (CTR) is generated randomly unless one is given, and
+# is always written in front of the ciphertext so decryption can read it back.
+
+BLOCK_SIZE = 8
+DES_MODES = ('ECB', 'CBC', 'CTR')
+CTR_NONCE_SIZE = 4  # The other 4 bytes of each counter block hold the counter
+
+def pkcs7_pad(data: bytes, block_size: int = BLOCK_SIZE) -> bytes:
+    """Append PKCS#7 padding (1 to block_size bytes, each equal to the pad length)."""
+    padding_len = block_size - len(data) % block_size
+    return data + bytes([padding_len]) * padding_len
+
+def pkcs7_unpad(data: bytes, block_size: int = BLOCK_SIZE) -> bytes:
+    """Remove PKCS#7 padding, raising ValueError if it is malformed."""
+    if not data or len(data) % block_size != 0:
+        raise ValueError("Padded data length must be a non-zero multiple of the block size.")
+    padding_len = data[-1]
+    if not 1 <= padding_len <= block_size or data[-padding_len:] != bytes([padding_len]) * padding_len:
+        raise ValueError("Invalid PKCS#7 padding.")
+    return data[:-padding_len]
+
+def _cbc_encrypt(data, round_keys, iv):
+    output = bytearray(len(data))
+    previous = int.from_bytes(iv, 'big')
+    for i in range(0, len(data), 8):
+        previous = des_crypt_block(int.from_bytes(data[i:i + 8], 'big') ^ previous, round_keys)
+        output[i:i + 8] = previous.to_bytes(8, 'big')
+    return bytes(output)
+
+def _cbc_decrypt(data, round_keys, iv):
+    output = bytearray(len(data))
+    previous = int.from_bytes(iv, 'big')
+    for i in range(0, len(data), 8):
+        block = int.from_bytes(data[i:i + 8], 'big')
+        output[i:i + 8] = (des_crypt_block(block, round_keys) ^ previous).to_bytes(8, 'big')
+        previous = block
+    return bytes(output)
+
+def ctr_keystream(round_keys, nonce: bytes, counter: int, n_blocks: int) -> np.ndarray:
+    """The CTR keystream of `n_blocks` blocks starting at block `counter`, as a uint8 array."""
+    prefix = int.from_bytes(nonce, 'big') << 32
+    counters = np.uint64(prefix | counter) + np.arange(n_blocks, dtype=np.uint64)
+    return des_crypt_array(counters, round_keys).astype('>u8').view(np.uint8)
+
+def _ctr_xor(data, round_keys, nonce, counter):
+    """
+    XOR `data` with the CTR keystream starting at block number `counter`.
+    Every keystream block depends only on its own counter value, so any
+    8-byte aligned slice of the message can be processed on its own.
+    """
+    prefix = int.from_bytes(nonce, 'big') << 32
+    n_blocks = (len(data) + 7) // 8
+    if n_blocks >= VECTOR_MIN_BLOCKS:
+        keystream = ctr_keystream(round_keys, nonce, counter, n_blocks)
+        result = np.frombuffer(data, dtype=np.uint8) ^ keystream[:len(data)]
+        return result.tobytes()
+    keystream = b''.join(
+        des_crypt_block(prefix | (counter + i), round_keys).to_bytes(8, 'big')
+        for i in range(n_blocks))[:len(data)]
+    result = int.from_bytes(data, 'big') ^ int.from_bytes(keystream, 'big')
+    return result.to_bytes(len(data), 'big')
+
+def _ctr_parallel(data, round_keys, nonce, workers):
+    """Split CTR work into block-aligned chunks and run them on a process pool."""
+    if len(data) // 8 >= 1 << 32:
+        raise ValueError("CTR mode supports at most 2**32 blocks per nonce.")
+    if workers <= 1 or len(data) < 64 * 1024:
+        return _ctr_xor(data, round_keys, nonce, 0)
+
+    chunk_size = -(-len(data) // (workers * 8)) * 8  # Ceiling, aligned to the block size
+    offsets = range(0, len(data), chunk_size)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        parts = pool.map(_ctr_xor,
+                         [data[o:o + chunk_size] for o in offsets],
+                         [round_keys] * len(offsets),
+                         [nonce] * len(offsets),
+                         [o // 8 for o in offsets])
+        return b''.join(parts)
+
+def _encrypt_with(schedule, data, mode, iv, workers):
+    round_keys = schedule.encrypt_keys
+    if mode == 'ECB':
+        return des_crypt_bytes(pkcs7_pad(data), round_keys)
+    if mode == 'CBC':
+        iv = os.urandom(BLOCK_SIZE) if iv is None else iv
+        if len(iv) != BLOCK_SIZE:
+            raise ValueError("CBC mode needs an 8-byte IV.")
+        return iv + _cbc_encrypt(pkcs7_pad(data), round_keys, iv)
+    if mode == 'CTR':
+        nonce = os.urandom(CTR_NONCE_SIZE) if iv is None else iv
+        if len(nonce) != CTR_NONCE_SIZE:
+            raise ValueError("CTR mode needs a 4-byte nonce.")
+        return nonce + _ctr_parallel(data, round_keys, nonce, workers)
+    raise ValueError(f"Unknown DES mode '{mode}'. Choose one of {DES_MODES}.")
+
+def _decrypt_with(schedule, data, mode, workers):
+    if mode == 'ECB':
+        return pkcs7_unpad(des_crypt_bytes(data, schedule.decrypt_keys))
+    if mode == 'CBC':
+        iv, body = data[:BLOCK_SIZE], data[BLOCK_SIZE:]
+        if len(iv) != BLOCK_SIZE or len(body) % BLOCK_SIZE != 0:
+            raise ValueError("CBC ciphertext must be an 8-byte IV plus whole blocks.")
+        return pkcs7_unpad(_cbc_decrypt(body, schedule.decrypt_keys, iv))
+    if mode == 'CTR':
+        nonce, body = data[:CTR_NONCE_SIZE], data[CTR_NONCE_SIZE:]
+        if len(nonce) != CTR_NONCE_SIZE:
+            raise ValueError("CTR ciphertext must start with a 4-byte nonce.")
+        # CTR decryption is the same keystream XOR as encryption
+        return _ctr_parallel(body, schedule.encrypt_keys, nonce, workers)
+    raise ValueError(f"Unknown DES mode '{mode}'. Choose one of {DES_MODES}.")
+
+def key_schedule_for(key: bytes):
+    """The cached DES (8-byte key) or Triple-DES (16- or 24-byte key) schedule."""
+    if len(key) == 8:
+        return DESKeySchedule.for_key(key)
+    return TripleDESKeySchedule.for_key(key)
+
+def des_encrypt(data: bytes, key: bytes, mode: str = 'CBC', iv: bytes = None, workers: int = 1) -> bytes:
+    """
+    Encrypts bytes with DES in ECB, CBC or CTR mode.
+    
+    Args:
+        data (bytes): The plaintext.
+        key (bytes): The 8-byte key.
+        mode (str): 'ECB', 'CBC' or 'CTR'. ECB and CBC use PKCS#7 padding.
+        iv (bytes): Optional 8-byte IV (CBC) or 4-byte nonce (CTR); random if omitted.
+        workers (int): Number of processes for CTR mode (ignored for ECB and CBC).
+        
+    Returns:
+        bytes: The IV/nonce (if any) followed by the ciphertext.
+    """
+    return _encrypt_with(DESKeySchedule.for_key(key), data, mode, iv, workers)
+
+def des_decrypt(data: bytes, key: bytes, mode: str = 'CBC', workers: int = 1) -> bytes:
+    """
+    Decrypts bytes produced by des_encrypt with the same key and mode.
+    
+    Returns:
+        bytes: The original plaintext. Raises ValueError on bad length or padding.
+    """
+    return _decrypt_with(DESKeySchedule.for_key(key), data, mode, workers)
+
+def triple_des_encrypt(data: bytes, key: bytes, mode: str = 'CBC', iv: bytes = None, workers: int = 1) -> bytes:
+    """
+    Encrypts bytes with Triple-DES (EDE) in ECB, CBC or CTR mode.
+    The data stays a 64-bit integer through all three stages, with a
+    single IP at the start and a single FP at the end.
+    
+    Args:
+        data (bytes): The plaintext.
+        key (bytes): 16 bytes (EDE2, K1|K2) or 24 bytes (EDE3, K1|K2|K3).
+        mode (str): 'ECB', 'CBC' or 'CTR'. ECB and CBC use PKCS#7 padding.
+        iv (bytes): Optional 8-byte IV (CBC) or 4-byte nonce (CTR); random if omitted.
+        workers (int): Number of processes for CTR mode (ignored for ECB and CBC).
+        
+    Returns:
+        bytes: The IV/nonce (if any) followed by the ciphertext.
+    """
+    return _encrypt_with(TripleDESKeySchedule.for_key(key), data, mode, iv, workers)
+
+def triple_des_decrypt(data: bytes, key: bytes, mode: str = 'CBC', workers: int = 1) -> bytes:
+    """
+    Decrypts bytes produced by triple_des_encrypt with the same key and mode.
+    
+    Returns:
+        bytes: The original plaintext. Raises ValueError on bad length or padding.
+    """
+    return _decrypt_with(TripleDESKeySchedule.for_key(key), data, mode, workers)
+
+# --- Round Tracing ---
+# Tracing runs on its own copy of the round loop, so the engines above stay
+# free of any "is tracing on?" checks. des_process only takes this path for
+# the blocks a tracer asks for; every other block uses the fast engine.
+
+class DESTracer:
+    """
+    Receives the internals of each DES round from des_process.
+    Subclass it and override record_round; `max_blocks` limits how many
+    leading blocks are traced (None traces every block).
+    """
+
+    def __init__(self, max_blocks: int = None):
+        self.max_blocks = max_blocks
+
+    def record_round(self, block_index: int, round_number: int, values: dict) -> None:
+        """Called once per round with the round's inputs, intermediates and outputs."""
+
+class DESTraceRecorder(DESTracer):
+    """A tracer that keeps every recorded round, grouped by block."""
+
+    def __init__(self, max_blocks: int = None):
+        super().__init__(max_blocks)
+        self.blocks = []
+
+    def record_round(self, block_index, round_number, values):
+        while len(self.blocks) <= block_index:
+            self.blocks.append([])
+        self.blocks[block_index].append(dict(values, round=round_number))
+
+    def hex_rows(self, block_index: int = 0) -> list[dict]:
+        """The rounds of one block with every value formatted as hex, for display."""
+        widths = {'L': 8, 'R': 8, 'round_key': 12, 'expanded': 12, 'xored': 12, 'sbox_output': 8, 'f_output': 8}
+        return [{'Round': r['round'], **{name: f'{r[name]:0{width}x}' for name, width in widths.items()}}
+                for r in self.blocks[block_index]]
+
+def _des_crypt_block_traced(block, round_keys, tracer, block_index):
+    """des_crypt_block for a single DES stage, reporting every round to `tracer`."""
+    permuted = 0
+    for i, table in enumerate(IP_TABLES):
+        permuted |= table[(block >> (56 - 8 * i)) & 0xFF]
+    left = permuted >> 32
+    right = permuted & 0xFFFFFFFF
+
+    for j, round_key in enumerate(round_keys):
+        expanded = 0
+        for i, table in enumerate(E_TABLES):
+            expanded |= table[(right >> (24 - 8 * i)) & 0xFF]
+        xored = expanded ^ round_key
+
+        sbox_output = 0
+        f_output = 0
+        for i, s_box in enumerate(S_BOXES):
+            chunk = (xored >> (42 - 6 * i)) & 0x3F
+            row = ((chunk >> 4) & 2) | (chunk & 1)
+            col = (chunk >> 1) & 0xF
+            sbox_output = (sbox_output << 4) | s_box[row][col]
+            f_output |= SP_TABLES[i][chunk]
+
+        left, right = right, left ^ f_output
+        tracer.record_round(block_index, j + 1, {
+            'L': left, 'R': right, 'round_key': round_key, 'expanded': expanded,
+            'xored': xored, 'sbox_output': sbox_output, 'f_output': f_output,
+        })
+
+    block = (right << 32) | left
+    output = 0
+    for i, table in enumerate(FP_TABLES):
+        output |= table[(block >> (56 - 8 * i)) & 0xFF]
+    return output
+
+# --- Main Entry Point ---
+
+def des_process(input_text, key_text, mode='encrypt', engine='integer', tracer=None):
     """
     The main function to encrypt or decrypt a string using DES.
     Pads text with spaces to fit 8-character (64-bit) blocks.
+    `engine` selects the fast 'integer' engine (default) or the original
+    'bits' pipeline; both produce identical output.
+    An optional DESTracer receives the per-round internals of the leading
+    `tracer.max_blocks` blocks (integer engine only).
     """
     
     # --- Input Validation and Preparation ---
@@ -212,7 +729,7 @@ def des_process(input_text, key_text, mode='encrypt'):
         return "Error: Key must be exactly 8 ASCII characters long (64 bits).", []
     
     try:
-        key_bits = text_to_bits(key_text)
+        schedule = DESKeySchedule.for_key(key_text.encode('latin-1'))
     except Exception as e:
         return f"Error processing key. Ensure it is 8 ASCII characters. {e}", []
 
@@ -222,21 +739,42 @@ def des_process(input_text, key_text, mode='encrypt'):
         input_text += ' ' * padding_len
     
     try:
-        input_bits = text_to_bits(input_text)
+        input_bytes = input_text.encode('latin-1')
     except Exception as e:
         return f"Error processing input text. Ensure it is ASCII. {e}", []
 
-    if len(input_bits) % 64 != 0:
+    if len(input_bytes) % 8 != 0:
         return "Error: Padded text is not a multiple of 64 bits.", []
         
-    # --- Key Generation ---
-    round_keys = generate_round_keys(key_bits)
+    # --- Key Generation and Main Process ---
+    if engine == 'bits':
+        round_keys = generate_round_keys(text_to_bits(key_text))
+        # For decryption, the round keys are used in reverse order
+        if mode == 'decrypt':
+            round_keys.reverse()
+        output_text = bits_to_text(_des_process_bits(text_to_bits(input_text), round_keys))
+    elif tracer is not None:
+        round_keys = schedule.round_keys(mode)
+        n_traced = len(input_bytes) // 8
+        if tracer.max_blocks is not None:
+            n_traced = min(n_traced, tracer.max_blocks)
+        traced = b''.join(
+            _des_crypt_block_traced(int.from_bytes(input_bytes[i * 8:i * 8 + 8], 'big'),
+                                    round_keys, tracer, i).to_bytes(8, 'big')
+            for i in range(n_traced))
+        output_text = (traced + des_crypt_bytes(input_bytes[n_traced * 8:], round_keys)).decode('latin-1')
+    else:
+        output_text = des_crypt_bytes(input_bytes, schedule.round_keys(mode)).decode('latin-1')
     
-    # For decryption, the round keys are used in reverse order
+    # For decryption, remove the space padding
     if mode == 'decrypt':
-        round_keys.reverse()
-    
-    # --- Main Process (Block by Block) ---
+        output_text = output_text.rstrip(' ')
+
+    # Round keys for display, formatted once per cached schedule; callers get their own list
+    return output_text, list(schedule.hex_keys)
+
+def _des_process_bits(input_bits, round_keys):
+    """The original bit-list pipeline: process a list of bits block by block."""
     output_bits = []
     
     for i in range(0, len(input_bits), 64):
@@ -270,17 +808,4 @@ def des_process(input_text, key_text, mode='encrypt'):
         final_block = permute(block, FP)
         output_bits.extend(final_block)
         
-    # --- Final Conversion ---
-    output_text = bits_to_text(output_bits)
-    
-    # For decryption, remove the space padding
-    if mode == 'decrypt':
-        output_text = output_text.rstrip(' ')
-
-    # Also prepare round keys for display
-    hex_keys = []
-    for key in generate_round_keys(key_bits): # Get original order for display
-        key_str = "".join(map(str, key))
-        hex_keys.append(f'{int(key_str, 2):012x}') # 48 bits = 12 hex chars
-
-    return output_text, hex_keys
\ No newline at end of file
+    return output_bits
@@ -0,0 +1,117 @@
+# ciphers/des_keysearch.py
+# Known-plaintext key search over a reduced DES keyspace, for training exercises.
+# Only the low `free_bits` effective key bits are unknown; the rest are fixed by
+# a base key. The keyspace is split into batches that run on a process pool,
+# and each batch tests all of its keys at once with the vectorized DES engine.
+
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+
+from ciphers import des
+
+DEFAULT_BATCH_SIZE = 1 << 14
+
+def expand_key_index(index: np.ndarray, base_key: int) -> np.ndarray:
+    """
+    Turn candidate numbers into 64-bit DES keys.
+    DES ignores the lowest bit of every key byte (the parity bit), so each
+    byte holds 7 bits of the candidate number above its parity bit. This way
+    no two candidates in the search describe the same effective key.
+    """
+    index = np.asarray(index, dtype=np.uint64)
+    keys = np.full(index.shape, base_key, dtype=np.uint64)
+    for byte in range(8):
+        keys |= ((index >> np.uint64(7 * byte)) & np.uint64(0x7F)) << np.uint64(8 * byte + 1)
+    return keys
+
+def _clear_free_bits(base_key: int, free_bits: int) -> int:
+    """Zero the key bits that the search enumerates (and every parity bit)."""
+    free_mask = int(expand_key_index(np.array([(1 << free_bits) - 1]), 0)[0])
+    return base_key & ~free_mask & ~0x0101010101010101
+
+def _search_batch(plain_block: int, cipher_block: int, base_key: int, start: int, count: int) -> list[int]:
+    """Test `count` candidates starting at `start`; return the matching key numbers."""
+    index = np.arange(start, start + count, dtype=np.uint64)
+    keys = expand_key_index(index, base_key)
+    round_keys = des.generate_round_keys_array(keys)
+    blocks = np.full(count, plain_block, dtype=np.uint64)
+    matches = np.nonzero(des.des_crypt_array(blocks, round_keys) == np.uint64(cipher_block))[0]
+    return [int(keys[i]) for i in matches]
+
+def search_key(plaintext: bytes, ciphertext: bytes, base_key: bytes, free_bits: int,
+               workers: int = None, batch_size: int = DEFAULT_BATCH_SIZE) -> dict:
+    """
+    Searches for the DES key that encrypts `plaintext` to `ciphertext`.
+
+    Args:
+        plaintext (bytes): One known 8-byte plaintext block.
+        ciphertext (bytes): The matching 8-byte ciphertext block (ECB).
+        base_key (bytes): An 8-byte key supplying the fixed (known) key bits.
+        free_bits (int): Number of unknown effective key bits to enumerate (at most 56).
+        workers (int): Number of processes; defaults to the number of CPU cores.
+        batch_size (int): Keys tested per task. Smaller batches stop sooner after a match.
+
+    Returns:
+        dict: The found key (bytes or None), keys tested, elapsed seconds,
+              keys per second and keys per second per core.
+    """
+    if len(plaintext) != 8 or len(ciphertext) != 8 or len(base_key) != 8:
+        raise ValueError("Plaintext, ciphertext and base key must each be 8 bytes.")
+    if not 1 <= free_bits <= 56:
+        raise ValueError("free_bits must be between 1 and 56.")
+    workers = workers or os.cpu_count() or 1
+
+    plain_block = int.from_bytes(plaintext, 'big')
+    cipher_block = int.from_bytes(ciphertext, 'big')
+    base = _clear_free_bits(int.from_bytes(base_key, 'big'), free_bits)
+    total = 1 << free_bits
+    batches = ((start, min(batch_size, total - start)) for start in range(0, total, batch_size))
+
+    found = None
+    keys_tested = 0
+    start_time = time.perf_counter()
+    if workers == 1:
+        for start, count in batches:
+            matches = _search_batch(plain_block, cipher_block, base, start, count)
+            keys_tested += count
+            if matches:
+                found = matches[0]
+                break
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            # Keep only a few batches queued per worker, so a match stops the search quickly
+            pending = {}
+            batch_iter = iter(batches)
+            for start, count in batch_iter:
+                pending[pool.submit(_search_batch, plain_block, cipher_block, base, start, count)] = count
+                if len(pending) >= workers * 2:
+                    break
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    keys_tested += pending.pop(future)
+                    matches = future.result()
+                    if matches and found is None:
+                        found = matches[0]
+                if found is not None:
+                    for future in pending:
+                        future.cancel()
+                    break
+                for start, count in batch_iter:
+                    pending[pool.submit(_search_batch, plain_block, cipher_block, base, start, count)] = count
+                    if len(pending) >= workers * 2:
+                        break
+    elapsed = time.perf_counter() - start_time
+
+    keys_per_second = keys_tested / elapsed if elapsed else 0.0
+    return {
+        'key': found.to_bytes(8, 'big') if found is not None else None,
+        'keys_tested': keys_tested,
+        'seconds': elapsed,
+        'workers': workers,
+        'keys_per_second': keys_per_second,
+        'keys_per_second_per_core': keys_per_second / workers,
+    }
@@ -0,0 +1,266 @@
+# ciphers/envelope.py
+# Envelope encryption on top of ciphers/aes.py.
+# Every object is encrypted under its own random data key. The data key is
+# wrapped (encrypted) under a master key from a local keystore file, and the
+# wrapped key is stored in front of the object's AES container:
+#
+#   magic (4) | version (1) | wrap algorithm (1) | master key id (8)
+#   | wrapped key length (2) | wrapped data key | AES container
+#
+# Wrapping uses AES-KW (RFC 3394) or AES-GCM with the fields before the
+# wrapped key as associated data. Unwrapped data keys are kept in an LRU/TTL
+# KeyCache, so objects that are read often skip the unwrap, and the cache's
+# counters show the hit rate and latency.
+
+import base64
+import json
+import os
+import struct
+
+from Crypto.Cipher import AES
+from Crypto.Random import get_random_bytes
+
+from ciphers import aes
+
+ENVELOPE_MAGIC = b'CTKE'
+ENVELOPE_VERSION = 1
+ENVELOPE_HEADER = struct.Struct('>4sBB8s')  # magic, version, wrap id, key id
+WRAPPED_LENGTH = struct.Struct('>H')
+WRAP_IDS = {'KW': 1, 'GCM': 2}
+WRAP_NAMES = {wrap_id: name for name, wrap_id in WRAP_IDS.items()}
+KEY_ID_SIZE = 8
+KEYSTORE_FORMAT = 'ctk-keystore'
+
+# --- Key Wrapping ---
+
+_KW_IV = 0xA6A6A6A6A6A6A6A6
+
+def _rfc3394_wrap(kek: bytes, key: bytes) -> bytes:
+    # Used only when pycryptodome predates AES.MODE_KW
+    ecb = AES.new(kek, AES.MODE_ECB)
+    blocks = [key[i:i + 8] for i in range(0, len(key), 8)]
+    a = _KW_IV
+    for j in range(6):
+        for i, block in enumerate(blocks):
+            b = ecb.encrypt(a.to_bytes(8, 'big') + block)
+            a = int.from_bytes(b[:8], 'big') ^ (len(blocks) * j + i + 1)
+            blocks[i] = b[8:]
+    return a.to_bytes(8, 'big') + b''.join(blocks)
+
+def _rfc3394_unwrap(kek: bytes, wrapped: bytes) -> bytes:
+    ecb = AES.new(kek, AES.MODE_ECB)
+    a = int.from_bytes(wrapped[:8], 'big')
+    blocks = [wrapped[i:i + 8] for i in range(8, len(wrapped), 8)]
+    for j in reversed(range(6)):
+        for i in reversed(range(len(blocks))):
+            b = ecb.decrypt((a ^ (len(blocks) * j + i + 1)).to_bytes(8, 'big') + blocks[i])
+            a = int.from_bytes(b[:8], 'big')
+            blocks[i] = b[8:]
+    if a != _KW_IV:
+        raise ValueError("Key unwrap failed (integrity check).")
+    return b''.join(blocks)
+
+def wrap_key(master_key: bytes, data_key: bytes, wrap: str = 'KW', associated_data: bytes = b'') -> bytes:
+    """
+    Wraps a data key under a master key.
+
+    Args:
+        master_key (bytes): The 16-, 24- or 32-byte key-encryption key.
+        data_key (bytes): The key to wrap (16, 24 or 32 bytes).
+        wrap (str): 'KW' (AES key wrap, RFC 3394) or 'GCM'.
+        associated_data (bytes): Authenticated along with the key (GCM only).
+
+    Returns:
+        bytes: The wrapped key.
+    """
+    if wrap == 'KW':
+        if hasattr(AES, 'MODE_KW'):
+            return AES.new(master_key, AES.MODE_KW).seal(data_key)
+        return _rfc3394_wrap(master_key, data_key)
+    if wrap == 'GCM':
+        nonce = get_random_bytes(aes.NONCE_SIZE)
+        cipher = AES.new(master_key, AES.MODE_GCM, nonce=nonce)
+        cipher.update(associated_data)
+        ciphertext, tag = cipher.encrypt_and_digest(data_key)
+        return nonce + ciphertext + tag
+    raise ValueError(f"Unknown wrap algorithm '{wrap}'. Choose 'KW' or 'GCM'.")
+
+def unwrap_key(master_key: bytes, wrapped: bytes, wrap: str = 'KW', associated_data: bytes = b'') -> bytes:
+    """
+    Unwraps a key made by wrap_key. Raises ValueError if the master key is
+    wrong or the wrapped key was altered.
+    """
+    if wrap == 'KW':
+        if len(wrapped) < 24 or len(wrapped) % 8:
+            raise ValueError("Wrapped key has an invalid length.")
+        if hasattr(AES, 'MODE_KW'):
+            return AES.new(master_key, AES.MODE_KW).unseal(wrapped)
+        return _rfc3394_unwrap(master_key, wrapped)
+    if wrap == 'GCM':
+        if len(wrapped) < aes.NONCE_SIZE + aes.TAG_SIZE:
+            raise ValueError("Wrapped key has an invalid length.")
+        cipher = AES.new(master_key, AES.MODE_GCM, nonce=wrapped[:aes.NONCE_SIZE])
+        cipher.update(associated_data)
+        return cipher.decrypt_and_verify(wrapped[aes.NONCE_SIZE:-aes.TAG_SIZE], wrapped[-aes.TAG_SIZE:])
+    raise ValueError(f"Unknown wrap algorithm '{wrap}'. Choose 'KW' or 'GCM'.")
+
+# --- Local Keystore ---
+
+class KeyStore:
+    """
+    Master keys in a local JSON file: {'format', 'version', 'active', 'keys'},
+    where 'keys' maps hex key ids to Base64 keys. New data keys are wrapped
+    under the active key; older keys stay so existing objects can be read.
+    With a passphrase, the file is sealed with aes_encrypt_passphrase_bytes.
+    """
+
+    def __init__(self, path, keys: dict, active: str, passphrase: str = None):
+        self.path = path
+        self.keys = keys
+        self.active = active
+        self.passphrase = passphrase
+
+    @classmethod
+    def create(cls, path, key_size: int = 32, passphrase: str = None) -> 'KeyStore':
+        """Create a keystore file with one new master key. Refuses to overwrite a file."""
+        if os.path.exists(path):
+            raise ValueError(f"Keystore '{path}' already exists.")
+        store = cls(path, {}, None, passphrase)
+        store.rotate(key_size)
+        return store
+
+    @classmethod
+    def load(cls, path, passphrase: str = None) -> 'KeyStore':
+        """Read a keystore file. Raises ValueError if it is malformed or the passphrase is wrong."""
+        with open(path, 'rb') as f:
+            raw = f.read()
+        if raw.startswith(aes.MAGIC):
+            if passphrase is None:
+                raise ValueError("Keystore is sealed with a passphrase.")
+            raw = aes.aes_decrypt_passphrase_bytes(raw, passphrase)
+        document = json.loads(raw.decode('utf-8'))
+        if document.get('format') != KEYSTORE_FORMAT or document.get('version') != 1:
+            raise ValueError("File is not a version 1 keystore.")
+        keys = {key_id: base64.b64decode(key) for key_id, key in document['keys'].items()}
+        return cls(path, keys, document['active'], passphrase)
+
+    def save(self) -> None:
+        """Write the keystore atomically, readable only by the owner."""
+        document = {
+            'format': KEYSTORE_FORMAT,
+            'version': 1,
+            'active': self.active,
+            'keys': {key_id: base64.b64encode(key).decode('ascii') for key_id, key in self.keys.items()},
+        }
+        raw = json.dumps(document, indent=2).encode('utf-8')
+        if self.passphrase is not None:
+            raw = aes.aes_encrypt_passphrase_bytes(raw, self.passphrase)
+        temp_path = f"{self.path}.tmp"
+        fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(raw)
+        os.replace(temp_path, self.path)
+
+    def rotate(self, key_size: int = 32) -> str:
+        """Add a new master key, make it the active one, save, and return its id."""
+        if key_size not in (16, 24, 32):
+            raise ValueError("Master key must be 16, 24, or 32 bytes long.")
+        key_id = get_random_bytes(KEY_ID_SIZE).hex()
+        self.keys[key_id] = get_random_bytes(key_size)
+        self.active = key_id
+        self.save()
+        return key_id
+
+    def master_key(self, key_id: str) -> bytes:
+        """Return a master key by id. Raises ValueError if the keystore does not have it."""
+        if key_id not in self.keys:
+            raise ValueError(f"Master key '{key_id}' is not in the keystore.")
+        return self.keys[key_id]
+
+# --- Envelope Encryption ---
+
+class EnvelopeCipher:
+    """
+    Encrypts objects under per-object data keys wrapped by the keystore's
+    active master key. Unwrapped data keys are cached in `cache`
+    (see KeyCache.stats() for the hit rate and latency counters).
+    """
+
+    def __init__(self, keystore: KeyStore, wrap: str = 'KW', cache: aes.KeyCache = None):
+        if wrap not in WRAP_IDS:
+            raise ValueError(f"Unknown wrap algorithm '{wrap}'. Choose 'KW' or 'GCM'.")
+        self.keystore = keystore
+        self.wrap = wrap
+        self.cache = cache if cache is not None else aes.KeyCache(maxsize=1024, ttl=300.0)
+
+    def generate_data_key(self, key_size: int = 32) -> tuple[bytes, bytes]:
+        """
+        Make a new data key and wrap it under the active master key.
+
+        Returns:
+            tuple[bytes, bytes]: The plaintext data key, and the key header
+            (everything in an envelope before the AES container).
+        """
+        data_key = get_random_bytes(key_size)
+        return data_key, self._key_header(data_key)
+
+    def _key_header(self, data_key: bytes) -> bytes:
+        key_id = self.keystore.active
+        header = ENVELOPE_HEADER.pack(ENVELOPE_MAGIC, ENVELOPE_VERSION, WRAP_IDS[self.wrap], bytes.fromhex(key_id))
+        wrapped = wrap_key(self.keystore.master_key(key_id), data_key, self.wrap, header)
+        return header + WRAPPED_LENGTH.pack(len(wrapped)) + wrapped
+
+    def open_key_header(self, blob: bytes) -> tuple[bytes, int]:
+        """
+        Unwrap the data key of an envelope, from the cache when possible.
+
+        Returns:
+            tuple[bytes, int]: The data key and where the AES container starts.
+        """
+        wrapped_start = ENVELOPE_HEADER.size + WRAPPED_LENGTH.size
+        if len(blob) < wrapped_start or blob[:4] != ENVELOPE_MAGIC:
+            raise ValueError("Data is not an envelope (bad magic).")
+        _, version, wrap_id, key_id = ENVELOPE_HEADER.unpack_from(blob)
+        wrapped_size, = WRAPPED_LENGTH.unpack_from(blob, ENVELOPE_HEADER.size)
+        if version != ENVELOPE_VERSION:
+            raise ValueError(f"Unsupported envelope version {version}.")
+        if wrap_id not in WRAP_NAMES:
+            raise ValueError(f"Unknown wrap algorithm id {wrap_id}.")
+        container_start = wrapped_start + wrapped_size
+        if len(blob) < container_start:
+            raise ValueError("Envelope is truncated.")
+        header = bytes(blob[:container_start])
+        master_key = self.keystore.master_key(key_id.hex())
+        # The whole key header is the cache lookup, so a changed byte is never a hit
+        data_key = self.cache.get_or_create(
+            header, lambda: unwrap_key(master_key, header[wrapped_start:], WRAP_NAMES[wrap_id],
+                                       header[:ENVELOPE_HEADER.size]))
+        return data_key, container_start
+
+    def encrypt(self, data: bytes, key_size: int = 32, mode: str = 'GCM') -> bytes:
+        """
+        Encrypts one object under a new data key.
+
+        Args:
+            data (bytes): The object.
+            key_size (int): Data key size, 16, 24 or 32 bytes.
+            mode (str): AES mode for the object (see aes.AES_MODES).
+
+        Returns:
+            bytes: The envelope (key header followed by the AES container).
+        """
+        data_key, key_header = self.generate_data_key(key_size)
+        return key_header + aes.aes_encrypt_bytes(data, data_key, mode)
+
+    def decrypt(self, blob: bytes) -> bytes:
+        """Decrypts an envelope. Raises ValueError if unwrapping or authentication fails."""
+        data_key, container_start = self.open_key_header(blob)
+        return aes.aes_decrypt_bytes(blob[container_start:], data_key)
+
+    def rewrap(self, blob: bytes) -> bytes:
+        """
+        Re-wrap an envelope's data key under the active master key (after a
+        rotation). The AES container is copied unchanged.
+        """
+        data_key, container_start = self.open_key_header(blob)
+        return self._key_header(data_key) + blob[container_start:]
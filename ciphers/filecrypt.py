@@ -0,0 +1,302 @@
+# ciphers/filecrypt.py
+# File-level encryption through memory maps.
+# The input file is mapped read-only and encrypted straight from memoryview
+# slices into an output file that is sized up front and mapped for writing,
+# so the data is never decoded to text or copied into intermediate strings.
+# Pages that have been processed are handed back to the OS as the work moves
+# through the file, which keeps peak memory flat regardless of file size.
+#
+# AES files use the segmented stream format from ciphers/aes.py, so they can
+# also be read with aes_stream_decrypt or AESStreamReader. DES files use the
+# same layout as des_encrypt (nonce or nothing, then the ciphertext).
+# Byte-level Caesar/Affine files are the input with every byte substituted.
+# The output must be a different file from the input (ValueError otherwise).
+
+import mmap
+import os
+from contextlib import contextmanager
+
+import numpy as np
+from Crypto.Cipher import AES
+from Crypto.Random import get_random_bytes
+
+from ciphers import aes, des, substitution
+
+WINDOW_SIZE = 8 * 1024 * 1024  # Bytes processed between page releases
+
+def _check_paths(src_path, dst_path):
+    """
+    Raise ValueError if both paths name the same file: the output is sized
+    (truncated) before the input is read, which would destroy the input.
+    """
+    if os.path.exists(dst_path) and os.path.samefile(src_path, dst_path):
+        raise ValueError("The output file must not be the input file.")
+
+@contextmanager
+def _map_input(path):
+    """Map a file read-only; an empty file gives an empty buffer."""
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            yield memoryview(b'')
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            yield mm
+
+@contextmanager
+def _map_output(path, size):
+    """Create a file of exactly `size` bytes and map it for writing."""
+    with open(path, 'w+b') as f:
+        f.truncate(size)
+        if size == 0:
+            yield memoryview(bytearray())
+            return
+        with mmap.mmap(f.fileno(), size, access=mmap.ACCESS_WRITE) as mm:
+            yield mm
+
+def _release(buffer, start, end, flush):
+    """
+    Drop the mapped pages fully inside [start, end), so they no longer count
+    towards this process's memory. Written pages are flushed to the file first.
+    """
+    if not isinstance(buffer, mmap.mmap) or not hasattr(mmap, 'MADV_DONTNEED'):
+        return
+    start = -(-start // mmap.PAGESIZE) * mmap.PAGESIZE
+    end = end // mmap.PAGESIZE * mmap.PAGESIZE
+    if end > start:
+        if flush:
+            buffer.flush(start, end - start)
+        buffer.madvise(mmap.MADV_DONTNEED, start, end - start)
+
+class _PageReleaser:
+    """Releases the processed pages of an input and an output mapping every WINDOW_SIZE bytes."""
+
+    def __init__(self, src, dst):
+        self.src, self.dst = src, dst
+        self.src_done = self.dst_done = 0
+
+    def advance(self, src_position, dst_position):
+        if src_position - self.src_done < WINDOW_SIZE:
+            return
+        _release(self.src, self.src_done, src_position, flush=False)
+        _release(self.dst, self.dst_done, dst_position, flush=True)
+        self.src_done, self.dst_done = src_position, dst_position
+
+# --- AES ---
+
+def aes_encrypt_file(src_path, dst_path, key_bytes: bytes, segment_size: int = aes.DEFAULT_SEGMENT_SIZE) -> int:
+    """
+    Encrypts a file into the segmented AES-GCM stream format via memory maps.
+
+    Args:
+        src_path: The file to encrypt.
+        dst_path: The file to write (created or overwritten).
+        key_bytes (bytes): The encryption key (must be 16, 24, or 32 bytes).
+        segment_size (int): Plaintext bytes per segment.
+
+    Returns:
+        int: The size of the encrypted file in bytes.
+    """
+    _check_paths(src_path, dst_path)
+    prefix = get_random_bytes(7)
+    header = aes.STREAM_HEADER.pack(aes.STREAM_MAGIC, aes.STREAM_VERSION, len(key_bytes), segment_size, prefix)
+    with _map_input(src_path) as src:
+        size = len(src)
+        n_segments = max(1, -(-size // segment_size))
+        out_size = len(header) + size + n_segments * aes.TAG_SIZE
+        with _map_output(dst_path, out_size) as dst, memoryview(src) as src_view, memoryview(dst) as dst_view:
+            dst_view[:len(header)] = header
+            releaser = _PageReleaser(src, dst)
+            position = len(header)
+            for index in range(n_segments):
+                start = index * segment_size
+                end = min(start + segment_size, size)
+                cipher = AES.new(key_bytes, AES.MODE_GCM,
+                                 nonce=aes.segment_nonce(prefix, index, index == n_segments - 1))
+                cipher.update(header)
+                cipher.encrypt(src_view[start:end], output=dst_view[position:position + end - start])
+                position += end - start
+                dst_view[position:position + aes.TAG_SIZE] = cipher.digest()
+                position += aes.TAG_SIZE
+                releaser.advance(end, position)
+    return out_size
+
+def aes_decrypt_file(src_path, dst_path, key_bytes: bytes) -> int:
+    """
+    Decrypts a segmented AES-GCM stream file via memory maps.
+    If any segment fails authentication the output file is removed and
+    ValueError is raised.
+
+    Returns:
+        int: The size of the decrypted file in bytes.
+    """
+    _check_paths(src_path, dst_path)
+    with _map_input(src_path) as src:
+        header = bytes(src[:aes.STREAM_HEADER.size])
+        key_size, segment_size, prefix = aes.parse_stream_header(header)
+        if key_size != len(key_bytes):
+            raise ValueError(f"Stream was encrypted with a {key_size * 8}-bit key.")
+        sealed_size = segment_size + aes.TAG_SIZE
+        body_size = len(src) - len(header)
+        n_segments = max(1, -(-body_size // sealed_size))
+        out_size = body_size - n_segments * aes.TAG_SIZE
+        if out_size < 0 or body_size - (n_segments - 1) * sealed_size < aes.TAG_SIZE:
+            raise ValueError("AES stream is truncated.")
+        try:
+            with _map_output(dst_path, out_size) as dst, memoryview(src) as src_view, memoryview(dst) as dst_view:
+                releaser = _PageReleaser(src, dst)
+                for index in range(n_segments):
+                    start = len(header) + index * sealed_size
+                    end = min(start + sealed_size, len(src))
+                    out_start = index * segment_size
+                    out_end = out_start + end - start - aes.TAG_SIZE
+                    cipher = AES.new(key_bytes, AES.MODE_GCM,
+                                     nonce=aes.segment_nonce(prefix, index, index == n_segments - 1))
+                    cipher.update(header)
+                    cipher.decrypt(src_view[start:end - aes.TAG_SIZE], output=dst_view[out_start:out_end])
+                    # The tag is copied out so no view of the map outlives a failed check
+                    cipher.verify(bytes(src_view[end - aes.TAG_SIZE:end]))
+                    releaser.advance(end, out_end)
+        except ValueError:
+            os.remove(dst_path)
+            raise
+    return out_size
+
+# --- DES / Triple-DES ---
+
+def des_encrypt_file(src_path, dst_path, key: bytes, mode: str = 'CTR') -> int:
+    """
+    Encrypts a file with DES (8-byte key) or Triple-DES (16- or 24-byte key)
+    via memory maps, using the vectorized DES engine.
+    The output has the same layout as des_encrypt, so des_decrypt can read it.
+
+    Args:
+        src_path: The file to encrypt.
+        dst_path: The file to write (created or overwritten).
+        key (bytes): The 8-, 16- or 24-byte key.
+        mode (str): 'CTR' or 'ECB' (PKCS#7 padded). CBC cannot be vectorized
+            on the encrypt side and is only offered by des_encrypt.
+
+    Returns:
+        int: The size of the encrypted file in bytes.
+    """
+    _check_paths(src_path, dst_path)
+    if mode not in ('CTR', 'ECB'):
+        raise ValueError("File encryption supports the 'CTR' and 'ECB' modes.")
+    round_keys = des.key_schedule_for(key).encrypt_keys
+    chunk = des.VECTOR_CHUNK_BLOCKS * des.BLOCK_SIZE
+    nonce = os.urandom(des.CTR_NONCE_SIZE) if mode == 'CTR' else b''
+    with _map_input(src_path) as src:
+        size = len(src)
+        if mode == 'CTR' and size // 8 >= 1 << 32:
+            raise ValueError("CTR mode supports at most 2**32 blocks per nonce.")
+        out_size = len(nonce) + size if mode == 'CTR' else (size // 8 + 1) * 8
+
+        with _map_output(dst_path, out_size) as dst:
+            _des_encrypt_arrays(np.frombuffer(src, dtype=np.uint8), np.frombuffer(dst, dtype=np.uint8),
+                                round_keys, mode, nonce, _PageReleaser(src, dst), chunk)
+    return out_size
+
+def _des_encrypt_arrays(src, dst, round_keys, mode, nonce, releaser, chunk):
+    # Kept separate so the NumPy views of the maps are gone before the maps close
+    if mode == 'CTR':
+        dst[:len(nonce)] = np.frombuffer(nonce, dtype=np.uint8)
+        body = dst[len(nonce):]
+        for start in range(0, len(src), chunk):
+            end = min(start + chunk, len(src))
+            keystream = des.ctr_keystream(round_keys, nonce, start // 8, -(-(end - start) // 8))
+            np.bitwise_xor(src[start:end], keystream[:end - start], out=body[start:end])
+            releaser.advance(end, len(nonce) + end)
+    else:
+        full = len(src) // 8 * 8
+        for start in range(0, full, chunk):
+            end = min(start + chunk, full)
+            blocks = src[start:end].view('>u8').astype(np.uint64)
+            dst[start:end] = des.des_crypt_array(blocks, round_keys).astype('>u8').view(np.uint8)
+            releaser.advance(end, end)
+        last = des.pkcs7_pad(src[full:].tobytes())
+        dst[full:] = np.frombuffer(des.des_crypt_bytes(last, round_keys), dtype=np.uint8)
+
+def des_decrypt_file(src_path, dst_path, key: bytes, mode: str = 'CTR') -> int:
+    """
+    Decrypts a file made by des_encrypt_file (or by des_encrypt with the
+    same mode) via memory maps. Raises ValueError on bad length or padding.
+
+    Returns:
+        int: The size of the decrypted file in bytes.
+    """
+    _check_paths(src_path, dst_path)
+    if mode not in ('CTR', 'ECB'):
+        raise ValueError("File decryption supports the 'CTR' and 'ECB' modes.")
+    schedule = des.key_schedule_for(key)
+    chunk = des.VECTOR_CHUNK_BLOCKS * des.BLOCK_SIZE
+    with _map_input(src_path) as src:
+        if mode == 'CTR':
+            if len(src) < des.CTR_NONCE_SIZE:
+                raise ValueError("CTR ciphertext must start with a 4-byte nonce.")
+            nonce = bytes(src[:des.CTR_NONCE_SIZE])
+            out_size = len(src) - des.CTR_NONCE_SIZE
+        else:
+            if len(src) == 0 or len(src) % 8 != 0:
+                raise ValueError("ECB ciphertext must be a non-zero number of whole blocks.")
+            nonce = b''
+            out_size = len(src)
+
+        with _map_output(dst_path, out_size) as dst:
+            _des_decrypt_arrays(np.frombuffer(src, dtype=np.uint8), np.frombuffer(dst, dtype=np.uint8),
+                                schedule, mode, nonce, _PageReleaser(src, dst), chunk)
+            padding = bytes(dst[out_size - 8:]) if mode == 'ECB' else b''
+
+    if mode == 'ECB':
+        # Check the padding, then cut it off the end of the (now unmapped) file
+        try:
+            out_size -= len(padding) - len(des.pkcs7_unpad(padding))
+        except ValueError:
+            os.remove(dst_path)
+            raise
+        with open(dst_path, 'r+b') as f:
+            f.truncate(out_size)
+    return out_size
+
+def _des_decrypt_arrays(src, dst, schedule, mode, nonce, releaser, chunk):
+    body = src[len(nonce):]
+    for start in range(0, len(dst), chunk):
+        end = min(start + chunk, len(dst))
+        if mode == 'CTR':
+            keystream = des.ctr_keystream(schedule.encrypt_keys, nonce, start // 8, -(-(end - start) // 8))
+            np.bitwise_xor(body[start:end], keystream[:end - start], out=dst[start:end])
+        else:
+            blocks = body[start:end].view('>u8').astype(np.uint64)
+            dst[start:end] = des.des_crypt_array(blocks, schedule.decrypt_keys).astype('>u8').view(np.uint8)
+        releaser.advance(len(nonce) + end, end)
+
+# --- Byte Caesar / Affine ---
+
+def byte_affine_file(src_path, dst_path, a: int, b: int, decrypt: bool = False) -> int:
+    """
+    Encrypts (or decrypts) a file with the mod-256 Affine cipher via memory maps.
+    A Caesar shift is the same with a = 1.
+
+    Args:
+        src_path: The file to read.
+        dst_path: The file to write (created or overwritten).
+        a (int): The multiplicative key (must be odd).
+        b (int): The additive key.
+        decrypt (bool): Apply the inverse table instead.
+
+    Returns:
+        int: The size of the output file in bytes.
+    """
+    _check_paths(src_path, dst_path)
+    tables = substitution.byte_affine_tables(a % 256, b % 256)
+    table = tables.decrypt if decrypt else tables.encrypt
+    chunk = substitution.BYTE_CHUNK_SIZE
+    with _map_input(src_path) as src:
+        size = len(src)
+        with _map_output(dst_path, size) as dst, memoryview(src) as src_view, memoryview(dst) as dst_view:
+            releaser = _PageReleaser(src, dst)
+            for start in range(0, size, chunk):
+                end = min(start + chunk, size)
+                dst_view[start:end] = src_view[start:end].tobytes().translate(table)
+                releaser.advance(end, end)
+    return size
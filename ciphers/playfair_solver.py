@@ -0,0 +1,269 @@
+# ciphers/playfair_solver.py
+# Ciphertext-only key recovery for the Playfair cipher in ciphers/polyalphabetic.py,
+# by simulated annealing over 5x5 key squares.
+#
+# A candidate square is scored by decrypting the ciphertext with the position
+# tables of the digraph engine (PLAYFAIR_POSITION_DECRYPT: the rules only
+# depend on where letters sit in the square, so a new square costs two small
+# gathers rather than a table build) and summing the log-probabilities of
+# every quadgram of the result. Each step makes a small change to the square
+# (mostly swapping two letters) and keeps it if the score improves, or with a
+# probability that shrinks as the temperature falls.
+#
+# Independent restarts run on a process pool. The workers share the best
+# square found so far: later restarts may start from it, and every worker
+# stops once it reaches the target score.
+
+import math
+import multiprocessing
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from ciphers.polyalphabetic import (PLAYFAIR_ALPHABET, PLAYFAIR_POSITION_DECRYPT, build_playfair_tables,
+                                    split_digraphs, text_to_indices)
+from utils import ALPHABET
+
+QUADGRAMS = 26 ** 4
+DEFAULT_ITERATIONS = 150000  # Steps per restart
+SYNC_INTERVAL = 1000  # Steps between checks of the shared best square
+SMOOTHING_PRIOR = 10000.0  # Pseudo-counts given to the lower-order estimate at each level
+_PLAYFAIR_TO_ALPHABET = np.array([ALPHABET.index(letter) for letter in PLAYFAIR_ALPHABET])
+
+# --- Quadgram Scoring ---
+
+class QuadgramScorer:
+    """
+    Log10-probabilities of the 26**4 quadgrams (AAAA = 0, AAAB = 1, ...).
+
+    Counts are smoothed towards a Markov estimate built from the trigram,
+    bigram and letter counts (each level smoothed the same way), with a fixed
+    number of pseudo-counts per level. Large count tables are barely changed,
+    while a small training text still gives unseen quadgrams graded scores,
+    which the search needs to make progress from a random square.
+    """
+
+    def __init__(self, counts: np.ndarray, prior: float = SMOOTHING_PRIOR):
+        counts = np.asarray(counts, dtype=np.float64)
+        if counts.shape != (QUADGRAMS,):
+            raise ValueError(f"Quadgram counts must have {QUADGRAMS} entries.")
+        c4 = counts.reshape(26, 26, 26, 26)
+        c1, c2, c3 = c4.sum(axis=(1, 2, 3)), c4.sum(axis=(2, 3)), c4.sum(axis=3)
+        p1 = (c1 + 1) / (c1.sum() + 26)
+        p2 = _smooth(c2, p1[:, None] * p1[None, :], prior)
+        p3 = _smooth(c3, p2[:, :, None] * p2[None, :, :] / p1[None, :, None], prior)
+        p4 = _smooth(c4, p3[..., None] * p3[None] / p2[None, :, :, None], prior)
+        self.log_probs = np.log10(p4).ravel().astype(np.float32)
+
+    @classmethod
+    def from_text(cls, text: str) -> 'QuadgramScorer':
+        """Count the quadgrams of a training text (non-letters are ignored)."""
+        letters = text_to_indices(text)
+        return cls(np.bincount(quadgram_codes(letters), minlength=QUADGRAMS))
+
+    @classmethod
+    def from_file(cls, path) -> 'QuadgramScorer':
+        """Read quadgram counts from a text file of 'TION 13168375' lines."""
+        counts = np.zeros(QUADGRAMS)
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) != 2:
+                    continue
+                quadgram, count = parts
+                codes = quadgram_codes(text_to_indices(quadgram))
+                if len(quadgram) != 4 or len(codes) != 1:
+                    raise ValueError(f"Invalid quadgram line: {line.strip()!r}")
+                counts[codes[0]] += float(count)
+        return cls(counts)
+
+    def score(self, letters: np.ndarray) -> float:
+        """The total log10-probability of the quadgrams of letter indices 0-25."""
+        return float(self.log_probs[quadgram_codes(letters)].sum())
+
+def _smooth(counts: np.ndarray, estimate: np.ndarray, prior: float) -> np.ndarray:
+    """Dirichlet smoothing: (counts + prior * estimate) / (total + prior), with the estimate normalized."""
+    estimate = estimate / estimate.sum()
+    return (counts + prior * estimate) / (counts.sum() + prior)
+
+def quadgram_codes(letters: np.ndarray) -> np.ndarray:
+    """The code (26**3 * a + 26**2 * b + 26 * c + d) of every quadgram of letter indices 0-25."""
+    letters = np.asarray(letters, dtype=np.int64)
+    if len(letters) < 4:
+        return np.zeros(0, dtype=np.int64)
+    return ((letters[:-3] * 26 + letters[1:-2]) * 26 + letters[2:-1]) * 26 + letters[3:]
+
+# --- Simulated Annealing ---
+
+def _decrypt_indices(square: np.ndarray, first: np.ndarray, second: np.ndarray) -> np.ndarray:
+    """Decrypt ciphertext digraphs (Playfair indices 0-24) with a square; letter indices 0-25."""
+    position = np.empty(25, dtype=np.int64)
+    position[square] = np.arange(25)
+    out = PLAYFAIR_POSITION_DECRYPT[position[first] * 25 + position[second]]
+    return _PLAYFAIR_TO_ALPHABET[square][out].ravel()
+
+def _mutate(square: np.ndarray, rng: random.Random) -> np.ndarray:
+    """A copy of the square with one small change, mostly a swap of two letters."""
+    candidate = square.copy()
+    choice = rng.random()
+    if choice < 0.9:
+        i, j = rng.sample(range(25), 2)
+        candidate[i], candidate[j] = square[j], square[i]
+        return candidate
+    grid = candidate.reshape(5, 5)
+    i, j = rng.sample(range(5), 2)
+    if choice < 0.94:
+        grid[[i, j]] = grid[[j, i]]
+    elif choice < 0.98:
+        grid[:, [i, j]] = grid[:, [j, i]]
+    else:
+        # Reflections and the transpose give equivalent or near-equivalent keys
+        grid[:] = (grid[::-1], grid[:, ::-1], grid.T)[rng.randrange(3)]
+    return candidate
+
+def anneal(first: np.ndarray, second: np.ndarray, scorer: QuadgramScorer, start: np.ndarray,
+           iterations: int, start_temperature: float, rng: random.Random, shared=None) -> tuple:
+    """
+    One simulated-annealing run, cooling linearly from start_temperature to 0.
+
+    Args:
+        first, second (np.ndarray): The ciphertext digraphs as Playfair indices 0-24.
+        scorer (QuadgramScorer): Scores candidate plaintexts.
+        start (np.ndarray): The starting square, Playfair indices row by row.
+        iterations (int): Number of steps.
+        start_temperature (float): In log10-probability units.
+        rng (random.Random): Source of randomness.
+        shared: Optional (score Value, square Array, target) best-so-far shared
+            between processes; the run stops early once the target is reached.
+
+    Returns:
+        tuple: (best square, best score, steps taken).
+    """
+    square = start.copy()
+    score = scorer.score(_decrypt_indices(square, first, second))
+    best_square, best_score = square, score
+    for step in range(1, iterations + 1):
+        temperature = start_temperature * (1 - step / iterations)
+        candidate = _mutate(square, rng)
+        candidate_score = scorer.score(_decrypt_indices(candidate, first, second))
+        delta = candidate_score - score
+        if delta >= 0 or (temperature > 0 and rng.random() < math.exp(delta / temperature)):
+            square, score = candidate, candidate_score
+            if score > best_score:
+                best_square, best_score = square, score
+        if shared is not None and step % SYNC_INTERVAL == 0 and _publish(shared, best_square, best_score):
+            return best_square, best_score, step
+    if shared is not None:
+        _publish(shared, best_square, best_score)
+    return best_square, best_score, iterations
+
+def _publish(shared, square: np.ndarray, score: float) -> bool:
+    """Offer a square as the shared best; returns True once the target score is reached."""
+    best_score, best_square, target = shared
+    with best_score.get_lock():
+        if score > best_score.value:
+            best_score.value = score
+            best_square[:] = square.tolist()
+        return target is not None and best_score.value >= target
+
+def _shared_start(shared):
+    best_score, best_square, _ = shared
+    with best_score.get_lock():
+        if best_score.value == -math.inf:
+            return None
+        return np.array(best_square[:], dtype=np.int64)
+
+# --- Restarts on a Process Pool ---
+
+_worker_state = {}
+
+def _init_worker(first, second, scorer, shared):
+    _worker_state.update(first=first, second=second, scorer=scorer, shared=shared)
+
+def _restart(seed: int, iterations: int, start_temperature: float, reuse_best: bool) -> tuple:
+    state = _worker_state
+    best_score, _, target = state['shared']
+    if target is not None and best_score.value >= target:
+        return _shared_start(state['shared']), best_score.value, 0
+    rng = random.Random(seed)
+    start = _shared_start(state['shared']) if reuse_best else None
+    if start is None:
+        start = np.array(rng.sample(range(25), 25), dtype=np.int64)
+    else:
+        # Reheat the best square only partly, so the run refines it rather than scrambling it
+        start_temperature /= 3
+    square, score, steps = anneal(state['first'], state['second'], state['scorer'], start,
+                                  iterations, start_temperature, rng, state['shared'])
+    return square, score, steps
+
+def crack_playfair(ciphertext: str, scorer: QuadgramScorer, restarts: int = 8,
+                   iterations: int = DEFAULT_ITERATIONS, start_temperature: float = None,
+                   target_score: float = None, workers: int = None, seed: int = None) -> dict:
+    """
+    Recovers a Playfair key square from ciphertext alone.
+
+    Args:
+        ciphertext (str): The ciphertext; non-letters are ignored.
+        scorer (QuadgramScorer): Quadgram statistics of the expected plaintext language.
+        restarts (int): Number of independent annealing runs.
+        iterations (int): Steps per run.
+        start_temperature (float): Initial temperature in log10 units; by
+            default it grows with the ciphertext length.
+        target_score (float): Stop every run once a square scores at least
+            this much per quadgram (e.g. a little below the scorer's score of
+            typical plaintext). None runs everything to completion.
+        workers (int): Number of processes; defaults to the number of CPU cores.
+        seed (int): Seeds the restarts. The result is reproducible only with
+            workers=1; with more workers, restarts reuse whichever best square
+            the others have shared so far, which depends on scheduling.
+
+    Returns:
+        dict: The key square (25 letters), the plaintext (with its padding
+              X's), the score per quadgram, restarts and steps run, elapsed
+              seconds, steps per second and steps per second per core.
+    """
+    codes = split_digraphs(ciphertext).astype(np.int64)
+    if len(codes) < 2:
+        raise ValueError("Ciphertext is too short to analyse.")
+    first, second = np.divmod(codes, 25)
+    quadgrams = 2 * len(codes) - 3
+    if start_temperature is None:
+        # Score changes grow with the text, since each letter occurs more often
+        start_temperature = max(5.0, 2 * len(codes) / 30)
+    workers = workers or os.cpu_count() or 1
+    target = target_score * quadgrams if target_score is not None else None
+    shared = (multiprocessing.Value('d', -math.inf), multiprocessing.Array('b', 25), target)
+    seeds = random.Random(seed).sample(range(1 << 30), restarts)
+    # The first round of restarts starts from random squares; later ones half of the time from the best so far
+    reuse = [i >= workers and i % 2 == 1 for i in range(restarts)]
+
+    start_time = time.perf_counter()
+    if workers == 1:
+        _init_worker(first, second, scorer, shared)
+        results = [_restart(s, iterations, start_temperature, r) for s, r in zip(seeds, reuse)]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(first, second, scorer, shared)) as pool:
+            results = list(pool.map(_restart, seeds, [iterations] * restarts,
+                                    [start_temperature] * restarts, reuse))
+    elapsed = time.perf_counter() - start_time
+
+    square, score, _ = max(results, key=lambda result: result[1])
+    key = ''.join(PLAYFAIR_ALPHABET[i] for i in square)
+    plaintext = build_playfair_tables(key).decrypt.view(np.uint16).ravel()[codes].tobytes().decode('ascii')
+    steps = sum(result[2] for result in results)
+    steps_per_second = steps / elapsed if elapsed else 0.0
+    return {
+        'key': key,
+        'plaintext': plaintext,
+        'score': score / quadgrams,
+        'restarts': restarts,
+        'iterations': steps,
+        'seconds': elapsed,
+        'workers': workers,
+        'iterations_per_second': steps_per_second,
+        'iterations_per_second_per_core': steps_per_second / workers,
+    }
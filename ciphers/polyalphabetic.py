@@ -1,9 +1,63 @@
-# This file implements the Vigenere, Playfair, and Hill ciphers.
+# This file implements the Vigenere (with Beaufort and Autokey), Playfair, and Hill ciphers.
+
+from functools import lru_cache
+from typing import NamedTuple
 
 import numpy as np
+from ciphers.substitution import NON_LETTER_BYTES, caesar_tables
 from utils import normalize_text, ALPHABET, mod_inverse
 
+_UPPERCASE_BYTES = caesar_tables(0).encrypt_bytes  # The identity map: upper-cases ASCII letters
+
 # --- Vigenere Cipher ---
+# Text and key are converted once to uint8 arrays of letter indices (0-25).
+# The key is added to the text a key-length-multiple block at a time, and
+# the result is reduced mod 26 with min(x, x - 26): for x < 26 the unsigned
+# subtraction wraps around to a larger value, so no division is needed.
+
+KEY_BLOCK_SIZE = 4096  # Letters per row when the key is broadcast over the text
+
+def text_to_indices(text: str) -> np.ndarray:
+    """The letters of `text` (after normalize_text) as a writable uint8 array of indices 0-25."""
+    if not text.isascii():
+        text = normalize_text(text)
+    return bytes_to_indices(text.encode('ascii'))
+
+def bytes_to_indices(data) -> np.ndarray:
+    """The ASCII letters of a bytes-like object as a writable uint8 array of indices 0-25."""
+    letters = bytes(data).translate(_UPPERCASE_BYTES, NON_LETTER_BYTES)
+    return np.frombuffer(letters, dtype=np.uint8) - np.uint8(ord('A'))
+
+def indices_to_text(indices: np.ndarray) -> str:
+    """The inverse of text_to_indices. Modifies `indices` in place."""
+    indices += np.uint8(ord('A'))
+    return str(indices.data, 'ascii')
+
+def _mod26(indices: np.ndarray) -> None:
+    # Values are below 52, so one conditional subtraction reduces them
+    np.minimum(indices, indices - np.uint8(26), out=indices)
+
+def add_key(indices: np.ndarray, key: np.ndarray, offset: int = 0) -> None:
+    """
+    Adds a repeating key to letter indices in place, mod 26.
+
+    Args:
+        indices (np.ndarray): uint8 letter indices (0-25).
+        key (np.ndarray): uint8 key letter indices (0-25), at least one.
+        offset (int): The key position of the first letter.
+    """
+    m = len(key)
+    key = np.roll(key, -(offset % m))
+    block = np.tile(key, max(1, KEY_BLOCK_SIZE // m))
+    full = len(indices) - len(indices) % len(block)
+    indices[:full].reshape(-1, len(block))[:] += block
+    indices[full:] += block[:len(indices) - full]
+    _mod26(indices)
+
+def _one_shot(stream_class, text: str, key: str, decrypt: bool) -> str:
+    if len(text_to_indices(key)) == 0:
+        return "Error: Key must contain at least one letter."
+    return stream_class(key, decrypt).update(text)
 
 def vigenere_encrypt(plaintext: str, key: str) -> str:
     """
@@ -14,22 +68,9 @@ def vigenere_encrypt(plaintext: str, key: str) -> str:
         key (str): The keyword for shifting.
         
     Returns:
-        str: The encrypted ciphertext.
+        str: The encrypted ciphertext, or an error message if the key has no letters.
     """
-    normalized_text = normalize_text(plaintext)
-    normalized_key = normalize_text(key)
-    ciphertext = ""
-    key_index = 0
-    for char in normalized_text:
-        p_index = ALPHABET.index(char)
-        k_index = ALPHABET.index(normalized_key[key_index])
-        
-        encrypted_index = (p_index + k_index) % 26
-        ciphertext += ALPHABET[encrypted_index]
-        
-        key_index = (key_index + 1) % len(normalized_key)
-        
-    return ciphertext
+    return _one_shot(VigenereStream, plaintext, key, decrypt=False)
 
 def vigenere_decrypt(ciphertext: str, key: str) -> str:
     """
@@ -40,30 +81,152 @@ def vigenere_decrypt(ciphertext: str, key: str) -> str:
         key (str): The keyword used for encryption.
         
     Returns:
-        str: The decrypted plaintext.
-    """
-    normalized_text = normalize_text(ciphertext)
-    normalized_key = normalize_text(key)
-    plaintext = ""
-    key_index = 0
-    for char in normalized_text:
-        c_index = ALPHABET.index(char)
-        k_index = ALPHABET.index(normalized_key[key_index])
-        
-        decrypted_index = (c_index - k_index + 26) % 26
-        plaintext += ALPHABET[decrypted_index]
-        
-        key_index = (key_index + 1) % len(normalized_key)
-        
-    return plaintext
+        str: The decrypted plaintext, or an error message if the key has no letters.
+    """
+    return _one_shot(VigenereStream, ciphertext, key, decrypt=True)
+
+def beaufort_encrypt(plaintext: str, key: str) -> str:
+    """
+    Encrypts text using the Beaufort cipher: C = (K - P) mod 26.
+    Beaufort is its own inverse, so this also decrypts.
+
+    Returns:
+        str: The ciphertext, or an error message if the key has no letters.
+    """
+    return _one_shot(BeaufortStream, plaintext, key, decrypt=False)
+
+def beaufort_decrypt(ciphertext: str, key: str) -> str:
+    """Decrypts text from a Beaufort cipher (the same operation as encryption)."""
+    return _one_shot(BeaufortStream, ciphertext, key, decrypt=True)
+
+def autokey_encrypt(plaintext: str, key: str) -> str:
+    """
+    Encrypts text using the Autokey cipher: a Vigenere cipher whose key is
+    the keyword followed by the plaintext itself.
+
+    Returns:
+        str: The ciphertext, or an error message if the key has no letters.
+    """
+    return _one_shot(AutokeyStream, plaintext, key, decrypt=False)
+
+def autokey_decrypt(ciphertext: str, key: str) -> str:
+    """Decrypts text from an Autokey cipher with the same keyword."""
+    return _one_shot(AutokeyStream, ciphertext, key, decrypt=True)
+
+# --- Streaming (Vigenere, Beaufort, Autokey) ---
+# A stream object keeps the key position between update() calls, so text can
+# be processed chunk by chunk in constant memory with the same result as the
+# one-shot functions above. The variants share update() and differ only in
+# how a chunk of letter indices is transformed.
+
+STREAM_CHUNK_SIZE = 1024 * 1024  # Characters (or bytes) read per chunk by process()
+AUTOKEY_BLOCK_SIZE = 64 * 1024  # Letters per cumulative sum in Autokey decryption
+
+class VigenereStream:
+    """
+    Encrypts or decrypts with the Vigenere cipher one chunk at a time.
+
+    Chunks may be str (non-letters are dropped as by normalize_text) or
+    bytes-like (only ASCII letters are kept). update() returns the same type.
+    Raises ValueError if the key has no letters.
+    """
+
+    def __init__(self, key: str, decrypt: bool = False):
+        self.key = text_to_indices(key)
+        if len(self.key) == 0:
+            raise ValueError("Key must contain at least one letter.")
+        self.decrypt = decrypt
+        self.position = 0  # Letters processed so far
+        # Subtracting k is adding 26 - k, which keeps the uint8 values non-negative
+        self._shifts = (26 - self.key) % 26 if decrypt else self.key
+
+    def _transform(self, indices: np.ndarray) -> None:
+        add_key(indices, self._shifts, self.position)
+
+    def update(self, chunk):
+        """Encrypt or decrypt the next chunk, continuing from where the last one ended."""
+        if isinstance(chunk, str):
+            indices = text_to_indices(chunk)
+        else:
+            indices = bytes_to_indices(chunk)
+        self._transform(indices)
+        self.position += len(indices)
+        if isinstance(chunk, str):
+            return indices_to_text(indices)
+        indices += np.uint8(ord('A'))
+        return indices.tobytes()
+
+    def process(self, source, chunk_size: int = STREAM_CHUNK_SIZE):
+        """
+        Encrypt or decrypt a whole source in constant memory.
+
+        Args:
+            source: A file object (text or binary) or an iterable of str or bytes chunks.
+            chunk_size (int): How much to read from a file object at a time.
+
+        Yields:
+            The output of update() for each chunk.
+        """
+        chunks = source
+        if hasattr(source, 'read'):
+            chunks = iter(lambda: source.read(chunk_size), source.read(0))
+        for chunk in chunks:
+            yield self.update(chunk)
+
+class BeaufortStream(VigenereStream):
+    """Beaufort cipher, C = (K - P) mod 26, one chunk at a time. Encryption and decryption are the same."""
+
+    def _transform(self, indices: np.ndarray) -> None:
+        # 26 - P is in 1..26, so adding K stays below 52 for the mod-26 reduction
+        np.subtract(np.uint8(26), indices, out=indices)
+        add_key(indices, self.key, self.position)
+
+class AutokeyStream(VigenereStream):
+    """
+    Autokey cipher one chunk at a time. The key is the keyword followed by
+    the plaintext, so only the last len(keyword) plaintext letters are kept
+    between chunks.
+    """
+
+    def __init__(self, key: str, decrypt: bool = False):
+        super().__init__(key, decrypt)
+        self._pending = self.key.copy()  # The key letters for the next len(keyword) letters
+
+    def _transform(self, indices: np.ndarray) -> None:
+        m, n = len(self._pending), len(indices)
+        if not self.decrypt:
+            keystream = np.concatenate([self._pending, indices])
+            indices += keystream[:n]
+            _mod26(indices)
+            self._pending = keystream[n:n + m]
+            return
+        # Row r of the plaintext (m letters) is row r of the ciphertext minus
+        # row r - 1 of the plaintext, so it is an alternating sum of the
+        # ciphertext rows: one cumulative sum instead of a loop over letters.
+        # Blocks keep the int32 sums and temporaries small.
+        block = max(1, AUTOKEY_BLOCK_SIZE // m) * m
+        for start in range(0, n, block):
+            self._decrypt_block(indices[start:start + block])
+
+    def _decrypt_block(self, indices: np.ndarray) -> None:
+        m, n = len(self._pending), len(indices)
+        rows = -(-n // m)
+        cipher = np.zeros(rows * m, dtype=np.int32)
+        cipher[:n] = indices
+        cipher = cipher.reshape(rows, m)
+        signs = np.where(np.arange(rows) % 2 == 0, 1, -1).astype(np.int32)[:, None]
+        plain = signs * (np.cumsum(signs * cipher, axis=0) - self._pending)
+        indices[:] = np.mod(plain, 26).ravel()[:n]
+        self._pending = np.concatenate([self._pending, indices])[n:n + m]
 
 # --- Playfair Cipher ---
 
 def generate_playfair_matrix(key: str) -> list[list[str]]:
     """
     Generates the 5x5 Playfair key matrix. 'J' is treated as 'I'.
+    Non-ASCII letters are dropped from the key, as split_digraphs drops them from the text.
     """
-    key = normalize_text(key).replace('J', 'I')
+    key = _playfair_key(key)
     matrix_chars = []
     
     # Add unique characters from the key
@@ -87,43 +250,108 @@ def find_char_coords(matrix: list[list[str]], char: str) -> tuple[int, int]:
             return r, row_list.index(char)
     return -1, -1 # Should not happen with valid input
 
+# Each key is compiled into 625-entry digraph tables (indexed by
+# 25 * first + second, letters numbered 0-24 without J) that hold the two
+# output letters, kept in an LRU cache keyed by the keyword. The tables are
+# built from fixed tables of square positions, so compiling a key is a few
+# gathers. Text is split into digraphs with array operations (see
+# split_digraphs) and every digraph is looked up at once with a NumPy gather.
+
+PLAYFAIR_ALPHABET = ALPHABET.replace('J', '')
+
+# Uppercase ASCII letter (byte value) -> 0-24, J (never looked up) sharing I's number
+_PLAYFAIR_INDEX = np.zeros(256, dtype=np.uint16)
+_PLAYFAIR_INDEX[np.frombuffer(ALPHABET.encode('ascii'), dtype=np.uint8)] = [
+    PLAYFAIR_ALPHABET.index(letter if letter != 'J' else 'I') for letter in ALPHABET]
+
+def letter_to_playfair_indices(letters: np.ndarray) -> np.ndarray:
+    """Map uppercase ASCII letters (a uint8 array, no J) to 0-24."""
+    return _PLAYFAIR_INDEX[letters]
+
+def _position_table(shift: int) -> np.ndarray:
+    """
+    For every pair of square positions (25 * first + second, positions
+    numbered row by row), the two output positions. The rules only depend on
+    where the letters are, so this is the same for every key.
+    """
+    r1, c1 = np.divmod(np.arange(625) // 25, 5)
+    r2, c2 = np.divmod(np.arange(625) % 25, 5)
+    same_row, same_col = r1 == r2, (c1 == c2) & (r1 != r2)
+    # Same row: move along the row; same column: move down it; else swap columns
+    out1 = np.where(same_row, r1 * 5 + (c1 + shift) % 5,
+                    np.where(same_col, (r1 + shift) % 5 * 5 + c1, r1 * 5 + c2))
+    out2 = np.where(same_row, r2 * 5 + (c2 + shift) % 5,
+                    np.where(same_col, (r2 + shift) % 5 * 5 + c2, r2 * 5 + c1))
+    return np.stack([out1, out2], axis=1)
+
+PLAYFAIR_POSITION_ENCRYPT = _position_table(1)
+PLAYFAIR_POSITION_DECRYPT = _position_table(-1)
+
+class PlayfairTables(NamedTuple):
+    """The digraph tables for one key square: (625, 2) uint8 arrays of ASCII letters."""
+    square: str  # The 25 letters of the key square, row by row
+    encrypt: np.ndarray
+    decrypt: np.ndarray
+
+def build_playfair_tables(square: str) -> PlayfairTables:
+    """Compile a key square (25 letters, row by row, no J) into digraph tables."""
+    letters = np.frombuffer(square.encode('ascii'), dtype=np.uint8)
+    position = np.empty(25, dtype=np.int64)
+    position[letter_to_playfair_indices(letters)] = np.arange(25)
+    # The square positions of every letter pair, in digraph-code order
+    pairs = (position[:, None] * 25 + position[None, :]).ravel()
+    return PlayfairTables(square, letters[PLAYFAIR_POSITION_ENCRYPT[pairs]],
+                          letters[PLAYFAIR_POSITION_DECRYPT[pairs]])
+
+@lru_cache(maxsize=256)
+def _playfair_tables(normalized_key: str) -> PlayfairTables:
+    return build_playfair_tables(''.join(''.join(row) for row in generate_playfair_matrix(normalized_key)))
+
+def _playfair_key(key: str) -> str:
+    """The keyword's ASCII letters, upper-cased, with J as I."""
+    return ''.join(c for c in normalize_text(key) if c.isascii()).replace('J', 'I')
+
+def playfair_tables(key: str) -> PlayfairTables:
+    """The cached digraph tables for a keyword."""
+    return _playfair_tables(_playfair_key(key))
+
+def split_digraphs(text: str) -> np.ndarray:
+    """
+    Split text into Playfair digraph codes (25 * first + second), the same
+    way as the classic loop: J becomes I, a doubled letter gets an X after
+    its first letter, and an odd last letter gets an X.
+
+    The loop is sequential, but the places that get an X can be found at
+    once: of all positions j where letter j equals letter j + 1, the loop
+    stops at the first one of each run of positions with the same parity
+    (after skipping a leading run of odd positions, as pairs start at 0).
+    """
+    if text.isascii():
+        letters = text.encode('ascii').translate(_UPPERCASE_BYTES, NON_LETTER_BYTES)
+    else:
+        letters = normalize_text(text).encode('utf-8').translate(None, NON_LETTER_BYTES)
+    letters = np.frombuffer(letters.replace(b'J', b'I'), dtype=np.uint8)
+    doubles = np.flatnonzero(letters[:-1] == letters[1:])
+    parity = doubles % 2
+    first_of_run = np.ones(len(doubles), dtype=bool)
+    first_of_run[1:] = parity[1:] != parity[:-1]
+    inserts = doubles[first_of_run]
+    if len(inserts) and inserts[0] % 2:
+        inserts = inserts[1:]
+    letters = np.insert(letters, inserts + 1, ord('X'))
+    if len(letters) % 2:
+        letters = np.append(letters, np.uint8(ord('X')))
+    indices = letter_to_playfair_indices(letters)
+    return indices[0::2] * np.uint16(25) + indices[1::2]
+
 def playfair_process(text: str, key: str, mode: str = 'encrypt') -> str:
     """
     A helper function to handle both encryption and decryption for Playfair.
     """
-    matrix = generate_playfair_matrix(key)
-    text = normalize_text(text).replace('J', 'I')
-    
-    # Create digraphs (pairs of letters)
-    digraphs = []
-    i = 0
-    while i < len(text):
-        char1 = text[i]
-        if i + 1 == len(text) or char1 == text[i+1]:
-            digraphs.append(char1 + 'X')
-            i += 1
-        else:
-            digraphs.append(char1 + text[i+1])
-            i += 2
-
-    result = ""
-    shift = 1 if mode == 'encrypt' else -1
-    
-    for pair in digraphs:
-        r1, c1 = find_char_coords(matrix, pair[0])
-        r2, c2 = find_char_coords(matrix, pair[1])
-        
-        if r1 == r2:  # Same row
-            result += matrix[r1][(c1 + shift) % 5]
-            result += matrix[r2][(c2 + shift) % 5]
-        elif c1 == c2:  # Same column
-            result += matrix[(r1 + shift) % 5][c1]
-            result += matrix[(r2 + shift) % 5][c2]
-        else:  # Rectangle
-            result += matrix[r1][c2]
-            result += matrix[r2][c1]
-            
-    return result
+    tables = playfair_tables(key)
+    table = tables.encrypt if mode == 'encrypt' else tables.decrypt
+    # Viewing each row's two letters as one uint16 makes the gather one-dimensional
+    return table.view(np.uint16).ravel()[split_digraphs(text)].tobytes().decode('ascii')
 
 # --- Hill Cipher ---
 
@@ -1,102 +1,200 @@
 
+from functools import lru_cache
 from math import gcd
-from utils import normalize_text, ALPHABET, mod_inverse
+from typing import NamedTuple
+from utils import normalize_text, ALPHABET
+
+# --- Translate Tables ---
+# Caesar and Affine are fixed maps of the 26 letters, so each key is compiled
+# once into translate tables and kept in an LRU cache (there are only 312
+# affine keys, Caesar shifts included). ASCII text goes through one
+# bytes.translate call that upper-cases, substitutes and drops non-letters in
+# the same pass; other text is normalized first and uses str.translate.
+
+LOWERCASE = ALPHABET.lower()
+# Every byte that is not an ASCII letter; bytes.translate deletes these
+NON_LETTER_BYTES = bytes(c for c in range(256) if not chr(c).isascii() or not chr(c).isalpha())
+
+class TranslateTables(NamedTuple):
+    """The tables for one key: str tables for uppercase text, 256-byte tables for ASCII."""
+    encrypt_str: dict
+    encrypt_bytes: bytes
+    decrypt_str: dict
+    decrypt_bytes: bytes
+
+def _build_tables(cipher_alphabet: str) -> TranslateTables:
+    identity = bytes(range(256))
+    encrypt_bytes = identity.translate(bytes.maketrans((ALPHABET + LOWERCASE).encode(),
+                                                       (cipher_alphabet * 2).encode()))
+    decrypt_bytes = identity.translate(bytes.maketrans((cipher_alphabet + cipher_alphabet.lower()).encode(),
+                                                       (ALPHABET * 2).encode()))
+    return TranslateTables(str.maketrans(ALPHABET, cipher_alphabet), encrypt_bytes,
+                           str.maketrans(cipher_alphabet, ALPHABET), decrypt_bytes)
+
+@lru_cache(maxsize=512)
+def affine_tables(a: int, b: int) -> TranslateTables:
+    """The cached tables for E(x) = (ax + b) mod 26. 'a' must be coprime with 26."""
+    return _build_tables(''.join(ALPHABET[(a * x + b) % 26] for x in range(26)))
+
+def caesar_tables(shift: int) -> TranslateTables:
+    """The cached tables for a Caesar shift (an affine map with a = 1)."""
+    return affine_tables(1, shift % 26)
+
+def _translate(text: str, str_table: dict, bytes_table: bytes) -> str:
+    """Normalize `text` (as normalize_text does) and substitute with one table."""
+    if text.isascii():
+        return text.encode('ascii').translate(bytes_table, NON_LETTER_BYTES).decode('ascii')
+    return normalize_text(text).translate(str_table)
 
 # --- Caesar Cipher ---
 
 def caesar_encrypt(plaintext: str, shift: int) -> str:
     """
     Encrypts text using the Caesar cipher.
-    
+
     Args:
         plaintext (str): The text to encrypt.
         shift (int): The number of positions to shift letters.
-        
+
     Returns:
         str: The encrypted ciphertext.
     """
-    normalized_text = normalize_text(plaintext)
-    ciphertext = ""
-    for char in normalized_text:
-        try:
-            index = ALPHABET.index(char)
-            shifted_index = (index + shift) % 26
-            ciphertext += ALPHABET[shifted_index]
-        except ValueError:
-            # This case should ideally not be reached due to normalization
-            ciphertext += char
-    return ciphertext
+    tables = caesar_tables(shift)
+    return _translate(plaintext, tables.encrypt_str, tables.encrypt_bytes)
 
 def caesar_decrypt(ciphertext: str, shift: int) -> str:
     """
     Decrypts text from a Caesar cipher.
-    
+
     Args:
         ciphertext (str): The text to decrypt.
         shift (int): The same shift value used for encryption.
-        
+
     Returns:
         str: The decrypted plaintext.
     """
-    # Decryption is just encryption with a negative shift.
-    return caesar_encrypt(ciphertext, -shift)
+    # Decryption uses the inverse table of the same key
+    tables = caesar_tables(shift)
+    return _translate(ciphertext, tables.decrypt_str, tables.decrypt_bytes)
+
 
 # --- Affine Cipher ---
 
 def affine_encrypt(plaintext: str, a: int, b: int) -> str:
     """
     Encrypts text using the Affine cipher: E(x) = (ax + b) mod 26.
-    
+
     Args:
         plaintext (str): The text to encrypt.
         a (int): The multiplicative key (must be coprime with 26).
         b (int): The additive key (the shift).
-        
+
     Returns:
         str: The encrypted ciphertext, or an error message if 'a' is invalid.
     """
     if gcd(a, 26) != 1:
         return "Error: Key 'a' must be coprime with 26."
-        
-    normalized_text = normalize_text(plaintext)
-    ciphertext = ""
-    for char in normalized_text:
-        try:
-            x = ALPHABET.index(char)
-            encrypted_index = (a * x + b) % 26
-            ciphertext += ALPHABET[encrypted_index]
-        except ValueError:
-            ciphertext += char
-    return ciphertext
+
+    tables = affine_tables(a % 26, b % 26)
+    return _translate(plaintext, tables.encrypt_str, tables.encrypt_bytes)
 
 def affine_decrypt(ciphertext: str, a: int, b: int) -> str:
     """
     Decrypts text from an Affine cipher: D(y) = a_inv * (y - b) mod 26.
-    
+
     Args:
         ciphertext (str): The text to decrypt.
         a (int): The same multiplicative key used for encryption.
         b (int): The same additive key used for encryption.
-        
+
     Returns:
         str: The decrypted plaintext, or an error message if decryption is not possible.
     """
     if gcd(a, 26) != 1:
         return "Error: Key 'a' must be coprime with 26 to be decrypted."
-    
-    a_inv = mod_inverse(a, 26)
-    if a_inv is None:
-        # This case should be caught by the gcd check above, but it's good practice
-        return "Error: Modular inverse does not exist for key 'a'."
-
-    normalized_text = normalize_text(ciphertext)
-    plaintext = ""
-    for char in normalized_text:
-        try:
-            y = ALPHABET.index(char)
-            # We add 26 to handle potential negative results from (y - b)
-            decrypted_index = (a_inv * (y - b + 26)) % 26
-            plaintext += ALPHABET[decrypted_index]
-        except ValueError:
-            plaintext += char
-    return plaintext
+
+    # The inverse table maps each cipher letter back, so a_inv is never needed explicitly
+    tables = affine_tables(a % 26, b % 26)
+    return _translate(ciphertext, tables.decrypt_str, tables.decrypt_bytes)
+
+
+# --- Byte Ciphers (mod 256) ---
+# Caesar and Affine over all 256 byte values, for binary data:
+# E(x) = (ax + b) mod 256, where 'a' must be odd to be invertible.
+# Each key is a 256-byte table, so bytes.translate does the work at close to
+# memory speed. Other buffers (bytearray, memoryview, mmap) are processed in
+# chunks small enough to stay in the CPU cache, so a mapped file never has to
+# be copied into memory as a whole.
+
+BYTE_CHUNK_SIZE = 64 * 1024
+
+class ByteTables(NamedTuple):
+    """The 256-byte translate tables for one byte-level key."""
+    encrypt: bytes
+    decrypt: bytes
+
+@lru_cache(maxsize=512)
+def byte_affine_tables(a: int, b: int) -> ByteTables:
+    """The cached tables for E(x) = (ax + b) mod 256. Raises ValueError if 'a' is even."""
+    if a % 2 == 0:
+        raise ValueError("Key 'a' must be odd (coprime with 256).")
+    encrypt = bytes((a * x + b) % 256 for x in range(256))
+    decrypt = bytearray(256)
+    for x, y in enumerate(encrypt):
+        decrypt[y] = x
+    return ByteTables(encrypt, bytes(decrypt))
+
+def byte_caesar_tables(shift: int) -> ByteTables:
+    """The cached tables for a byte-level Caesar shift."""
+    return byte_affine_tables(1, shift % 256)
+
+def translate_bytes(data, table: bytes) -> bytes:
+    """Apply a 256-byte table to any bytes-like object, returning new bytes."""
+    if isinstance(data, bytes):
+        return data.translate(table)
+    with memoryview(data) as view:
+        view = view.cast('B')
+        return b''.join(view[i:i + BYTE_CHUNK_SIZE].tobytes().translate(table)
+                        for i in range(0, len(view), BYTE_CHUNK_SIZE))
+
+def translate_in_place(buffer, table: bytes) -> None:
+    """Apply a 256-byte table to a writable buffer (bytearray, writable mmap, ...) in place."""
+    with memoryview(buffer) as view:
+        view = view.cast('B')
+        for i in range(0, len(view), BYTE_CHUNK_SIZE):
+            view[i:i + BYTE_CHUNK_SIZE] = view[i:i + BYTE_CHUNK_SIZE].tobytes().translate(table)
+
+def byte_caesar_encrypt(data, shift: int) -> bytes:
+    """
+    Encrypts bytes with a Caesar shift mod 256.
+
+    Args:
+        data: Any bytes-like object (bytes, bytearray, memoryview, mmap).
+        shift (int): The number added to every byte.
+
+    Returns:
+        bytes: The encrypted bytes.
+    """
+    return translate_bytes(data, byte_caesar_tables(shift).encrypt)
+
+def byte_caesar_decrypt(data, shift: int) -> bytes:
+    """Decrypts bytes from byte_caesar_encrypt with the same shift."""
+    return translate_bytes(data, byte_caesar_tables(shift).decrypt)
+
+def byte_affine_encrypt(data, a: int, b: int) -> bytes:
+    """
+    Encrypts bytes with the Affine cipher mod 256: E(x) = (ax + b) mod 256.
+
+    Args:
+        data: Any bytes-like object (bytes, bytearray, memoryview, mmap).
+        a (int): The multiplicative key (must be odd).
+        b (int): The additive key.
+
+    Returns:
+        bytes: The encrypted bytes. Raises ValueError if 'a' is even.
+    """
+    return translate_bytes(data, byte_affine_tables(a % 256, b % 256).encrypt)
+
+def byte_affine_decrypt(data, a: int, b: int) -> bytes:
+    """Decrypts bytes from byte_affine_encrypt with the same key."""
+    return translate_bytes(data, byte_affine_tables(a % 256, b % 256).decrypt)
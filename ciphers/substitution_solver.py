@@ -0,0 +1,102 @@
+# ciphers/substitution_solver.py
+# Brute-force solver for the Caesar and Affine ciphers in ciphers/substitution.py.
+# Letters are counted once per ciphertext with a single NumPy bincount over the
+# whole batch. Every candidate key only permutes which English frequency each
+# cipher letter is compared with, so scoring all 26 shifts (or all 312 affine
+# keys) for every ciphertext is one matrix product:
+#
+#   log-likelihood  = counts @ log(E[plain_index]).T                (higher is better)
+#   chi-squared     = (counts ** 2) @ (1 / E[plain_index]).T / N - N  (lower is better)
+#
+# where plain_index[k, c] is the plaintext letter that key k maps cipher letter c to.
+
+from math import gcd
+
+import numpy as np
+
+from ciphers.substitution import NON_LETTER_BYTES, caesar_tables
+from utils import ENGLISH_FREQUENCIES, mod_inverse, normalize_text
+
+CAESAR_KEYS = [(1, b) for b in range(26)]
+AFFINE_KEYS = [(a, b) for a in range(1, 26) if gcd(a, 26) == 1 for b in range(26)]
+METHODS = ('loglik', 'chi2')
+
+_UPPERCASE_BYTES = caesar_tables(0).encrypt_bytes  # The identity map: upper-cases ASCII letters
+
+def letter_indices(text: str) -> np.ndarray:
+    """The letters of `text` (after normalize_text) as indices 0-25."""
+    if not text.isascii():
+        text = normalize_text(text)
+    letters = text.encode('utf-8').translate(_UPPERCASE_BYTES, NON_LETTER_BYTES)
+    return np.frombuffer(letters, dtype=np.uint8) - ord('A')
+
+def letter_counts(ciphertexts) -> np.ndarray:
+    """
+    Count the letters of a batch of ciphertexts with one bincount.
+
+    Args:
+        ciphertexts: A list of strings, or a 2-D integer array with one row of
+            letter indices (0-25) per ciphertext.
+
+    Returns:
+        np.ndarray: A (n, 26) array of letter counts.
+    """
+    if isinstance(ciphertexts, np.ndarray):
+        letters = ciphertexts.astype(np.int64)
+        if letters.ndim != 2:
+            raise ValueError("A ciphertext array must be 2-D (one row per ciphertext).")
+        rows = np.repeat(np.arange(len(letters)), letters.shape[1])
+        flat = letters.ravel()
+    else:
+        arrays = [letter_indices(text) for text in ciphertexts]
+        rows = np.repeat(np.arange(len(arrays)), [len(a) for a in arrays])
+        flat = np.concatenate(arrays).astype(np.int64) if arrays else np.zeros(0, dtype=np.int64)
+    n = len(ciphertexts)
+    return np.bincount(rows * 26 + flat, minlength=n * 26).reshape(n, 26)
+
+def plain_index(keys) -> np.ndarray:
+    """A (len(keys), 26) array: the plaintext letter each (a, b) key gives for each cipher letter."""
+    cipher_letters = np.arange(26)
+    return np.array([(mod_inverse(a, 26) * (cipher_letters - b)) % 26 for a, b in keys])
+
+def score_keys(counts: np.ndarray, keys, method: str = 'loglik') -> np.ndarray:
+    """
+    Score every key against every ciphertext's letter counts.
+
+    Args:
+        counts (np.ndarray): (n, 26) letter counts from letter_counts.
+        keys (list): (a, b) pairs, e.g. CAESAR_KEYS or AFFINE_KEYS.
+        method (str): 'loglik' (mean log-likelihood per letter, higher is
+            better) or 'chi2' (chi-squared statistic, lower is better).
+
+    Returns:
+        np.ndarray: A (n, len(keys)) array of scores.
+    """
+    expected = ENGLISH_FREQUENCIES[plain_index(keys)]
+    totals = np.maximum(counts.sum(axis=1, keepdims=True), 1)
+    if method == 'loglik':
+        return counts @ np.log(expected).T / totals
+    if method == 'chi2':
+        return (counts.astype(np.float64) ** 2) @ (1 / expected).T / totals - totals
+    raise ValueError(f"Unknown scoring method '{method}'. Choose one of {METHODS}.")
+
+def rank_keys(ciphertexts, keys, top: int = 5, method: str = 'loglik') -> list[list[tuple]]:
+    """
+    Rank candidate keys for each ciphertext in a batch.
+
+    Returns:
+        list[list[tuple]]: For each ciphertext, the best `top` ((a, b), score) pairs, best first.
+    """
+    scores = score_keys(letter_counts(ciphertexts), keys, method)
+    order = np.argsort(-scores if method == 'loglik' else scores, axis=1, kind='stable')[:, :top]
+    return [[(keys[k], float(row_scores[k])) for k in row_order]
+            for row_order, row_scores in zip(order, scores)]
+
+def rank_caesar_keys(ciphertexts, top: int = 5, method: str = 'loglik') -> list[list[tuple]]:
+    """Rank all 26 Caesar shifts for each ciphertext: lists of (shift, score), best first."""
+    return [[(b, score) for (_, b), score in ranked]
+            for ranked in rank_keys(ciphertexts, CAESAR_KEYS, top, method)]
+
+def rank_affine_keys(ciphertexts, top: int = 5, method: str = 'loglik') -> list[list[tuple]]:
+    """Rank all 312 affine keys for each ciphertext: lists of ((a, b), score), best first."""
+    return rank_keys(ciphertexts, AFFINE_KEYS, top, method)
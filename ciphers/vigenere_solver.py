@@ -0,0 +1,199 @@
+# ciphers/vigenere_solver.py
+# Ciphertext-only key recovery for the Vigenere cipher in ciphers/polyalphabetic.py.
+#
+# 1. Key length. Two estimates of how often letters a distance d apart are
+#    equal, which is about 0.066 in English and 1/26 = 0.038 for random text:
+#    - the index of coincidence of the columns (letters i % m), from one
+#      bincount per candidate length m;
+#    - the autocorrelation of the text (the Kasiski effect: repeats line up
+#      at multiples of the key length), for every shift at once with FFTs.
+#    Both are high for the key length and its multiples, so the smallest of
+#    the strongest lengths are tried first.
+# 2. Key. Each column is a Caesar cipher, solved with the chi-squared shift
+#    scoring from ciphers/substitution_solver.py.
+# Candidate lengths (and ciphertexts in a batch) are solved on a process pool
+# once the batch is large enough to pay for starting one, and keys that
+# repeat a shorter key are folded into one solution.
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import NamedTuple
+
+import numpy as np
+
+from ciphers.polyalphabetic import text_to_indices
+from ciphers.substitution_solver import CAESAR_KEYS, score_keys
+from utils import ALPHABET, ENGLISH_FREQUENCIES
+
+RANDOM_IC = 1 / 26
+ANALYSIS_LETTERS = 1 << 16  # Letters used to estimate the key length
+COUNT_CHUNK = 1 << 20  # Letters counted per bincount when solving columns
+STRONG_FRACTION = 0.8  # Share of the best length's excess over random that counts as strong
+PARALLEL_MIN_LETTERS = 1 << 20  # Smaller batches are solved in-process by default
+
+class KeyLengthCandidate(NamedTuple):
+    """A candidate key length and its coincidence estimates."""
+    length: int
+    ic: float  # Mean index of coincidence of the columns
+    autocorrelation: float  # Mean coincidence rate at shifts that are multiples of the length
+
+    @property
+    def score(self) -> float:
+        return (self.ic + self.autocorrelation) / 2
+
+class VigenereSolution(NamedTuple):
+    """
+    A recovered key and its score (higher is better): the mean log-likelihood
+    per letter of the decryption, less ln(letters) / letters per key letter.
+    The penalty stops longer keys winning only because they fit the text more
+    closely, as every extra key letter does.
+    """
+    key: str
+    key_length: int
+    score: float
+
+# --- Key Length ---
+
+def column_counts(indices: np.ndarray, length: int) -> np.ndarray:
+    """Count the letters of each column (position % length): a (length, 26) array."""
+    counts = np.zeros(length * 26, dtype=np.int64)
+    # Chunks start on a multiple of `length`, so every chunk has the same column offsets
+    rows = max(1, min(COUNT_CHUNK // length, -(-len(indices) // length)))
+    offsets = np.tile(np.arange(length, dtype=np.int64) * 26, rows)
+    chunk = rows * length
+    for start in range(0, len(indices), chunk):
+        letters = indices[start:start + chunk].astype(np.int64)
+        letters += offsets[:len(letters)]
+        counts += np.bincount(letters, minlength=length * 26)
+    return counts.reshape(length, 26)
+
+def index_of_coincidence(indices: np.ndarray, max_key_length: int) -> np.ndarray:
+    """The mean column index of coincidence for key lengths 1..max_key_length (index 0 is length 1)."""
+    result = np.zeros(max_key_length)
+    for length in range(1, max_key_length + 1):
+        counts = column_counts(indices, length)
+        totals = counts.sum(axis=1)
+        valid = totals > 1
+        pairs = (counts * (counts - 1)).sum(axis=1)
+        result[length - 1] = np.mean(pairs[valid] / (totals[valid] * (totals[valid] - 1))) if valid.any() else 0.0
+    return result
+
+def autocorrelation(indices: np.ndarray, max_shift: int) -> np.ndarray:
+    """
+    The fraction of positions whose letter reappears s places later, for
+    s = 0..max_shift, from an FFT correlation of each letter's positions.
+    """
+    n = len(indices)
+    # Padding by max_shift keeps the shifts we read free of circular wrap-around
+    size = 1 << int(n + max_shift - 1).bit_length()
+    positions = indices[None, :] == np.arange(26, dtype=np.uint8)[:, None]
+    spectra = np.fft.rfft(positions, size, axis=1)
+    power = (spectra.real ** 2 + spectra.imag ** 2).sum(axis=0)
+    matches = np.fft.irfft(power, size)[:max_shift + 1]
+    overlaps = np.maximum(n - np.arange(max_shift + 1), 1)
+    return np.round(matches) / overlaps
+
+def rank_key_lengths(indices: np.ndarray, max_key_length: int = 40) -> list[KeyLengthCandidate]:
+    """
+    Rank key lengths for a ciphertext, most likely first.
+
+    Args:
+        indices (np.ndarray): Ciphertext letter indices (see text_to_indices).
+            Only the first ANALYSIS_LETTERS letters are used.
+        max_key_length (int): The longest key length considered.
+
+    Returns:
+        list[KeyLengthCandidate]: The strong lengths (close to the best score)
+        shortest first, then the rest by score.
+    """
+    sample = indices[:ANALYSIS_LETTERS]
+    max_key_length = max(1, min(max_key_length, len(sample) // 2))
+    ic = index_of_coincidence(sample, max_key_length)
+    max_shift = min(len(sample) - 1, 4 * max_key_length)
+    rates = autocorrelation(sample, max_shift)
+    candidates = []
+    for length in range(1, max_key_length + 1):
+        shifts = np.arange(length, max_shift + 1, length)
+        rate = float(rates[shifts].mean()) if len(shifts) else float(ic[length - 1])
+        candidates.append(KeyLengthCandidate(length, float(ic[length - 1]), rate))
+    best = max(candidate.score for candidate in candidates)
+    threshold = RANDOM_IC + STRONG_FRACTION * (best - RANDOM_IC)
+    strong = [c for c in candidates if c.score >= threshold]
+    rest = sorted((c for c in candidates if c.score < threshold), key=lambda c: -c.score)
+    return strong + rest
+
+# --- Key Recovery ---
+
+def _minimal_period(key: np.ndarray) -> np.ndarray:
+    """Shorten a key that is a shorter key repeated (e.g. ABCABC -> ABC)."""
+    for period in range(1, len(key)):
+        if len(key) % period == 0 and np.array_equal(key, np.resize(key[:period], len(key))):
+            return key[:period]
+    return key
+
+def solve_key(indices: np.ndarray, length: int) -> VigenereSolution:
+    """Recover the key of a given length, column by column, with chi-squared shift scoring."""
+    counts = column_counts(indices, length)
+    shifts = np.argmin(score_keys(counts, CAESAR_KEYS, 'chi2'), axis=1)
+    # Row c of the decrypted counts is column c rotated back by its shift
+    plain_counts = counts[np.arange(length)[:, None], (np.arange(26) + shifts[:, None]) % 26].sum(axis=0)
+    letters = max(int(plain_counts.sum()), 2)
+    key = _minimal_period(shifts)
+    score = float(plain_counts @ np.log(ENGLISH_FREQUENCIES) - len(key) * np.log(letters)) / letters
+    return VigenereSolution(''.join(ALPHABET[k] for k in key), len(key), score)
+
+_worker_texts = []
+
+def _init_worker(texts):
+    _worker_texts[:] = texts
+
+def _solve_task(number: int, length: int) -> VigenereSolution:
+    return solve_key(_worker_texts[number], length)
+
+def crack_vigenere_batch(ciphertexts, max_key_length: int = 40, candidates: int = 5,
+                         workers: int = None) -> list[list[VigenereSolution]]:
+    """
+    Recover Vigenere keys for a batch of ciphertexts.
+
+    Args:
+        ciphertexts (list): The ciphertexts (str); non-letters are ignored.
+        max_key_length (int): The longest key length considered.
+        candidates (int): How many of the top key lengths to solve per ciphertext.
+        workers (int): Number of processes; defaults to the number of CPU
+            cores, or 1 (no pool) if the batch has fewer than
+            PARALLEL_MIN_LETTERS letters.
+
+    Returns:
+        list[list[VigenereSolution]]: For each ciphertext, its distinct
+        solutions, best first (empty if it has fewer than two letters).
+    """
+    texts = [text_to_indices(text) for text in ciphertexts]
+    if workers is None:
+        # Starting a pool costs more than solving a few app-sized ciphertexts
+        workers = (os.cpu_count() or 1) if sum(map(len, texts)) >= PARALLEL_MIN_LETTERS else 1
+    tasks = []
+    for number, indices in enumerate(texts):
+        if len(indices) < 2:
+            continue
+        for candidate in rank_key_lengths(indices, max_key_length)[:candidates]:
+            tasks.append((number, candidate.length))
+
+    if workers == 1:
+        solved = [solve_key(texts[number], length) for number, length in tasks]
+    else:
+        # The letters go to each worker once, rather than once per candidate length
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(texts,)) as pool:
+            solved = list(pool.map(_solve_task, [t[0] for t in tasks], [t[1] for t in tasks]))
+
+    results = [{} for _ in texts]
+    for (number, _), solution in zip(tasks, solved):
+        # Multiples of the key length fold into the same key; keep its best score
+        known = results[number].get(solution.key)
+        if known is None or solution.score > known.score:
+            results[number][solution.key] = solution
+    return [sorted(found.values(), key=lambda s: -s.score) for found in results]
+
+def crack_vigenere(ciphertext: str, max_key_length: int = 40, candidates: int = 5,
+                   workers: int = None) -> list[VigenereSolution]:
+    """Recover the key of one ciphertext; the distinct solutions, best first."""
+    return crack_vigenere_batch([ciphertext], max_key_length, candidates, workers)[0]
@@ -0,0 +1,57 @@
+# tests/test_aes.py
+# Run from the project root with:  python -m pytest
+
+import pytest
+
+from ciphers import aes
+
+# --- NonceGenerator ---
+
+def test_nonce_prefix_cannot_be_shared():
+    prefix = b'\x01' * aes.NonceGenerator.PREFIX_SIZE
+    aes.NonceGenerator(prefix)
+    with pytest.raises(ValueError):
+        aes.NonceGenerator(prefix)
+
+def test_nonce_counter_exhaustion_moves_to_a_new_prefix(monkeypatch):
+    monkeypatch.setattr(aes.NonceGenerator, 'COUNTER_LIMIT', 3)
+    first_prefix = b'\x02' * aes.NonceGenerator.PREFIX_SIZE
+    nonces = aes.NonceGenerator(first_prefix)
+    context = aes.AESContext(b'k' * 16, nonces)
+    records = [bytes([i]) for i in range(5)]
+    blobs = context.encrypt_many(records[:2]) + [context.encrypt(record) for record in records[2:]]
+    used = [aes.unpack_container(blob)['nonce'] for blob in blobs]
+    assert len(set(used)) == len(used)
+    assert [nonce[:aes.NonceGenerator.PREFIX_SIZE] == first_prefix for nonce in used] == [True] * 3 + [False] * 2
+    assert nonces.prefix != first_prefix
+    assert context.decrypt_many(blobs) == records
+
+def test_context_records_round_trip():
+    context = aes.AESContext(b'k' * 16)
+    blobs = context.encrypt_many([b'first', b'second'])
+    assert context.decrypt_many(blobs) == [b'first', b'second']
+    assert aes.aes_decrypt_bytes(blobs[1], b'k' * 16) == b'second'
+
+# --- Passphrase Keys ---
+
+def _crafted_passphrase_container(params):
+    header = aes.build_header(32, 'GCM', params, b'\x00' * aes.SALT_SIZE)
+    return aes.pack_container(header, b'\x00' * aes.NONCE_SIZE, b'data', b'\x00' * aes.TAG_SIZE)
+
+@pytest.mark.parametrize('params', [
+    aes.KDFParams('scrypt', 2 ** 20, 8, 255),  # p above MAX_SCRYPT_P
+    aes.KDFParams('scrypt', 2 ** 20, 8, 2),  # Within the memory limit, over the work limit
+    aes.KDFParams('scrypt', 2 ** 21, 8, 1),  # Over the memory limit
+    aes.KDFParams('pbkdf2', aes.MAX_PBKDF2_ITERATIONS + 1),
+])
+def test_crafted_kdf_costs_are_rejected_before_deriving(params, monkeypatch):
+    def fail(*args):
+        raise AssertionError("the key was derived")
+    monkeypatch.setattr(aes, '_run_kdf', fail)
+    with pytest.raises(ValueError):
+        aes.aes_decrypt_passphrase_bytes(_crafted_passphrase_container(params), 'passphrase')
+
+def test_passphrase_round_trip_with_cheap_params():
+    params = aes.KDFParams('scrypt', 2 ** 10, 8, 2)
+    blob = aes.aes_encrypt_passphrase_bytes(b'secret', 'passphrase', params=params)
+    assert aes.aes_decrypt_passphrase_bytes(blob, 'passphrase') == b'secret'
@@ -88,6 +88,15 @@ from math import gcd  # <-- THIS IS THE NEWLY ADDED IMPORT
 # Alphabet constant used by multiple ciphers
 ALPHABET = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
 
+# Relative frequency of each letter A-Z in English text (normalized to sum
+# to 1), used to score candidate decryptions
+ENGLISH_FREQUENCIES = np.array([
+    0.08167, 0.01492, 0.02782, 0.04253, 0.12702, 0.02228, 0.02015, 0.06094, 0.06966,
+    0.00153, 0.00772, 0.04025, 0.02406, 0.06749, 0.07507, 0.01929, 0.00095, 0.05987,
+    0.06327, 0.09056, 0.02758, 0.00978, 0.02360, 0.00150, 0.01974, 0.00074,
+])
+ENGLISH_FREQUENCIES = ENGLISH_FREQUENCIES / ENGLISH_FREQUENCIES.sum()
+
 def normalize_text(text: str) -> str:
     """
     Removes all non-alphabetic characters from a string and converts it to uppercase.